@@ -62,37 +62,37 @@ router.post('/process', upload.single('file'), async (req, res) => {
       });
     }
 
-    const batchSize = 10;
+    const batchSize = parseInt(process.env.BATCH_CHUNK_SIZE) || 500;
     const results = [];
 
     for (let i = 0; i < addresses.length; i += batchSize) {
       const batch = addresses.slice(i, i + batchSize);
 
-      const batchResults = await Promise.allSettled(
-        batch.map(async (item) => {
-          try {
-            const result = await mlService.matchAddress(item.address, {
-              top_k: parseInt(top_k),
-              include_digipin: true
-            });
-
-            return {
-              ...item.original,
-              matched_data: result.matches && result.matches.length > 0 ? result.matches : null,
-              status: result.matches && result.matches.length > 0 ? 'success' : 'no_match'
-            };
-          } catch (error) {
-            return {
-              ...item.original,
-              matched_data: null,
-              status: 'error',
-              error: error.message
-            };
+      try {
+        const response = await mlService.matchAddresses(
+          batch.map(item => item.address),
+          {
+            top_k: parseInt(top_k),
+            include_digipin: true
           }
-        })
-      );
+        );
 
-      results.push(...batchResults.map(r => r.status === 'fulfilled' ? r.value : r.reason));
+        results.push(...batch.map((item, j) => {
+          const result = response.results[j];
+          return {
+            ...item.original,
+            matched_data: result.matches && result.matches.length > 0 ? result.matches : null,
+            status: result.matches && result.matches.length > 0 ? 'success' : 'no_match'
+          };
+        }));
+      } catch (error) {
+        results.push(...batch.map(item => ({
+          ...item.original,
+          matched_data: null,
+          status: 'error',
+          error: error.message
+        })));
+      }
     }
 
     const summary = {
@@ -117,4 +117,123 @@ router.post('/process', upload.single('file'), async (req, res) => {
   }
 });
 
+// Raw body types forwarded to the ML service. application/json is not one of
+// them: express.json() has already consumed that body before this route runs.
+const STREAM_CONTENT_TYPES = ['text/csv', 'application/x-ndjson', 'text/plain'];
+
+router.post('/stream', async (req, res) => {
+  const contentType = req.headers['content-type'] || 'text/csv';
+  const mediaType = contentType.split(';')[0].trim().toLowerCase();
+
+  if (!STREAM_CONTENT_TYPES.includes(mediaType)) {
+    return res.status(415).json({
+      success: false,
+      error: 'Send the file as a raw text/csv, application/x-ndjson or text/plain body.'
+    });
+  }
+
+  try {
+    const results = await mlService.matchStream(req, {
+      top_k: parseInt(req.query.top_k) || 1,
+      include_digipin: req.query.include_digipin !== 'false',
+      column: req.query.column || 'address',
+      contentType: contentType
+    });
+
+    res.status(200);
+    res.setHeader('Content-Type', 'application/x-ndjson');
+
+    // Forward each NDJSON chunk as soon as the ML service produces it
+    results.on('data', (chunk) => {
+      res.write(chunk);
+      if (typeof res.flush === 'function') {
+        res.flush();
+      }
+    });
+    results.on('end', () => res.end());
+    results.on('error', (error) => {
+      console.error('Batch stream error:', error);
+      res.end(JSON.stringify({ error: error.message }) + '\n');
+    });
+    res.on('close', () => results.destroy());
+
+  } catch (error) {
+    console.error('Batch stream error:', error);
+    res.status(502).json({
+      success: false,
+      error: error.message
+    });
+  }
+});
+
+router.post('/jobs', async (req, res) => {
+  try {
+    const { texts, top_k = 1, include_digipin = true } = req.body;
+
+    if (!Array.isArray(texts) || texts.length === 0) {
+      return res.status(400).json({
+        success: false,
+        error: 'Request body must include a non-empty "texts" array'
+      });
+    }
+
+    const job = await mlService.createMatchJob(texts, {
+      top_k: parseInt(top_k),
+      include_digipin: include_digipin !== false
+    });
+
+    res.status(202).json({
+      success: true,
+      job: job
+    });
+
+  } catch (error) {
+    console.error('Batch job error:', error);
+    res.status(502).json({
+      success: false,
+      error: error.message
+    });
+  }
+});
+
+router.get('/jobs/:jobId', async (req, res) => {
+  await sendJob(res, () => mlService.getMatchJob(req.params.jobId));
+});
+
+router.get('/jobs/:jobId/results', async (req, res) => {
+  await sendJob(res, () => mlService.getMatchJobResults(req.params.jobId, {
+    offset: parseInt(req.query.offset) || 0,
+    limit: parseInt(req.query.limit) || 100
+  }));
+});
+
+router.delete('/jobs/:jobId', async (req, res) => {
+  await sendJob(res, () => mlService.cancelMatchJob(req.params.jobId));
+});
+
+async function sendJob(res, fetchJob) {
+  try {
+    const job = await fetchJob();
+
+    if (!job) {
+      return res.status(404).json({
+        success: false,
+        error: 'Job not found'
+      });
+    }
+
+    res.json({
+      success: true,
+      job: job
+    });
+
+  } catch (error) {
+    console.error('Batch job error:', error);
+    res.status(502).json({
+      success: false,
+      error: error.message
+    });
+  }
+}
+
 export default router;
@@ -19,6 +19,102 @@ export async function matchAddress(text, options = {}) {
   }
 }
 
+export async function matchAddresses(texts, options = {}) {
+  try {
+    const response = await axios.post(`${ML_API_URL}/api/ml/match_batch`, {
+      texts: texts,
+      top_k: options.top_k || 5,
+      include_digipin: options.include_digipin !== false
+    }, {
+      timeout: options.timeout || 120000
+    });
+
+    return response.data;
+  } catch (error) {
+    console.error('ML batch service error:', error.message);
+    throw new Error(`ML service unavailable: ${error.message}`);
+  }
+}
+
+export async function matchStream(body, options = {}) {
+  try {
+    const response = await axios.post(`${ML_API_URL}/api/ml/match_stream`, body, {
+      params: {
+        top_k: options.top_k || 5,
+        include_digipin: options.include_digipin !== false,
+        column: options.column || 'address'
+      },
+      headers: {
+        'Content-Type': options.contentType || 'text/csv'
+      },
+      responseType: 'stream',
+      maxBodyLength: Infinity,
+      maxContentLength: Infinity,
+      timeout: 0
+    });
+
+    return response.data;
+  } catch (error) {
+    console.error('ML stream service error:', error.message);
+    throw new Error(`ML service unavailable: ${error.message}`);
+  }
+}
+
+export async function createMatchJob(texts, options = {}) {
+  try {
+    const response = await axios.post(`${ML_API_URL}/api/ml/jobs`, {
+      texts: texts,
+      top_k: options.top_k || 5,
+      include_digipin: options.include_digipin !== false
+    }, {
+      maxBodyLength: Infinity,
+      timeout: options.timeout || 60000
+    });
+
+    return response.data;
+  } catch (error) {
+    console.error('ML job service error:', error.message);
+    throw new Error(`ML service unavailable: ${error.message}`);
+  }
+}
+
+export async function getMatchJob(jobId, options = {}) {
+  return requestJob('get', `/api/ml/jobs/${encodeURIComponent(jobId)}`, options);
+}
+
+export async function getMatchJobResults(jobId, options = {}) {
+  return requestJob('get', `/api/ml/jobs/${encodeURIComponent(jobId)}/results`, {
+    ...options,
+    params: {
+      offset: options.offset || 0,
+      limit: options.limit || 100
+    }
+  });
+}
+
+export async function cancelMatchJob(jobId, options = {}) {
+  return requestJob('delete', `/api/ml/jobs/${encodeURIComponent(jobId)}`, options);
+}
+
+async function requestJob(method, path, options = {}) {
+  try {
+    const response = await axios.request({
+      method: method,
+      url: `${ML_API_URL}${path}`,
+      params: options.params,
+      timeout: options.timeout || 30000
+    });
+
+    return response.data;
+  } catch (error) {
+    if (error.response && error.response.status === 404) {
+      return null;
+    }
+    console.error('ML job service error:', error.message);
+    throw new Error(`ML service unavailable: ${error.message}`);
+  }
+}
+
 export async function extractTextFromImage(imageBuffer) {
   try {
     const FormData = (await import('form-data')).default;
@@ -84,6 +180,12 @@ export async function checkMLHealth() {
 
 export default {
   matchAddress,
+  matchAddresses,
+  matchStream,
+  createMatchJob,
+  getMatchJob,
+  getMatchJobResults,
+  cancelMatchJob,
   extractTextFromImage,
   normalizeText,
   ocrAndMatch,
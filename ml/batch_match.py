@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Offline Batch Matching
+Match a large CSV of addresses with a pool of worker processes
+
+The parent builds (or validates) the cache once; each worker then opens the
+memory-mapped index and metadata read-only, so the pool shares one copy of
+the index in the page cache. The input is read in fixed-size chunks and
+every finished chunk is written as a checkpoint part, so an interrupted
+run resumes from the first missing chunk.
+
+Usage:
+  python batch_match.py addresses.csv matched.csv
+  python batch_match.py addresses.csv matched.parquet --workers 8 --chunk-size 20000
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from config import CSV_PATH, matcher_settings
+
+OUTPUT_FORMATS = {".csv": "csv", ".parquet": "parquet"}
+MATCH_COLUMNS = [
+    "match_officename", "match_pincode", "match_district", "match_state",
+    "match_digipin", "match_latitude", "match_longitude",
+    "match_confidence", "match_similarity", "match_path",
+]
+CHECKPOINT_FILE = "checkpoint.json"
+
+# Per-process matcher, created by the pool initializer
+_matcher = None
+
+
+def _init_worker(cache_dir: str, threads: int):
+    """Open the cached index in a worker process (no dataset load or rebuild)"""
+    global _matcher
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+
+    try:
+        import faiss
+        faiss.omp_set_num_threads(threads)
+    except (ImportError, AttributeError):
+        pass
+
+    from models.matcher import AddressMatcher
+    _matcher = AddressMatcher(**{**matcher_settings(), "cache_dir": cache_dir})
+    asyncio.run(_matcher.initialize())
+
+
+def _match_chunk(
+    chunk_id: int,
+    addresses: List[Optional[str]],
+    part_path: str,
+    output_format: str,
+    sub_batch: int
+) -> Dict:
+    """
+    Match one chunk of addresses and write it as a checkpoint part
+
+    Args:
+        chunk_id: Position of the chunk in the input
+        addresses: Address texts (None for empty cells)
+        part_path: Final path of the part file
+        output_format: "csv" or "parquet"
+        sub_batch: Addresses per match_many_sync call
+
+    Returns:
+        Chunk statistics
+    """
+    start_time = time.time()
+    rows = [None] * len(addresses)
+    texts = [(i, text) for i, text in enumerate(addresses) if text]
+
+    for offset in range(0, len(texts), sub_batch):
+        batch = texts[offset:offset + sub_batch]
+        results = _matcher.match_many_sync([text for _, text in batch], top_k=1, include_digipin=True)
+        for (i, _), result in zip(batch, results):
+            rows[i] = _match_row(result)
+
+    empty = dict.fromkeys(MATCH_COLUMNS)
+    part = pd.DataFrame([row or empty for row in rows], columns=MATCH_COLUMNS)
+    _write_frame(part, part_path, output_format)
+
+    return {
+        "chunk": chunk_id,
+        "rows": len(addresses),
+        "matched": sum(1 for row in rows if row and row["match_pincode"]),
+        "seconds": time.time() - start_time,
+    }
+
+
+def _match_row(result: Dict) -> Dict:
+    """Flatten the best match of one result into output columns"""
+    row = dict.fromkeys(MATCH_COLUMNS)
+    row["match_path"] = result.get("match_path")
+    if result["matches"]:
+        best = result["matches"][0]
+        for key in ("officename", "pincode", "district", "state", "digipin",
+                    "latitude", "longitude", "confidence", "similarity"):
+            row[f"match_{key}"] = best.get(key)
+    return row
+
+
+def _write_frame(frame: pd.DataFrame, path: str, output_format: str):
+    """Write a frame atomically (temporary file, then rename)"""
+    tmp_path = f"{path}.tmp"
+    if output_format == "parquet":
+        frame.to_parquet(tmp_path, index=False)
+    else:
+        frame.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _read_part(path: Path, output_format: str) -> pd.DataFrame:
+    if output_format == "parquet":
+        return pd.read_parquet(path)
+    return pd.read_csv(path, dtype={"match_pincode": str}, keep_default_na=False)
+
+
+def _prepare_checkpoints(args, output_format: str) -> Path:
+    """
+    Create or validate the checkpoint directory
+
+    Parts from a previous run are only reused if they were produced from
+    the same input file with the same chunking.
+    """
+    checkpoint_dir = Path(args.checkpoint_dir or f"{args.output}.parts")
+    stat = os.stat(args.input)
+    checkpoint = {
+        "input": os.path.abspath(args.input),
+        "input_size": stat.st_size,
+        "input_mtime": stat.st_mtime,
+        "column": args.column,
+        "chunk_size": args.chunk_size,
+        "format": output_format,
+    }
+
+    if args.restart and checkpoint_dir.exists():
+        shutil.rmtree(checkpoint_dir)
+
+    checkpoint_path = checkpoint_dir / CHECKPOINT_FILE
+    if checkpoint_path.exists():
+        previous = json.loads(checkpoint_path.read_text())
+        if previous != checkpoint:
+            changed = sorted(key for key in checkpoint if previous.get(key) != checkpoint[key])
+            raise SystemExit(
+                f"❌ Checkpoints in {checkpoint_dir} are from a different run "
+                f"({', '.join(changed)} changed); use --restart to discard them"
+            )
+    else:
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        checkpoint_path.write_text(json.dumps(checkpoint, indent=2))
+
+    return checkpoint_dir
+
+
+def _merge_parts(args, checkpoint_dir: Path, output_format: str):
+    """
+    Join input chunks with their match parts into the output file
+
+    CSV output is appended chunk by chunk; Parquet output is assembled in
+    memory, as a single file needs one schema across all row groups.
+    """
+    tmp_path = f"{args.output}.tmp"
+    frames = []
+    reader = pd.read_csv(args.input, chunksize=args.chunk_size, dtype=str, keep_default_na=False)
+    for chunk_id, chunk in enumerate(reader):
+        part = _read_part(checkpoint_dir / f"part-{chunk_id:06d}.{output_format}", output_format)
+        merged = pd.concat([chunk.reset_index(drop=True), part], axis=1)
+        if output_format == "parquet":
+            frames.append(merged)
+        else:
+            merged.to_csv(tmp_path, mode="a" if chunk_id else "w", header=not chunk_id, index=False)
+
+    if output_format == "parquet":
+        output = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        output.to_parquet(tmp_path, index=False)
+    elif not os.path.exists(tmp_path):
+        pd.DataFrame().to_csv(tmp_path, index=False)
+    os.replace(tmp_path, args.output)
+
+
+def run(args) -> int:
+    """Run a batch matching job; returns the process exit code"""
+    output_format = OUTPUT_FORMATS.get(Path(args.output).suffix.lower())
+    if output_format is None:
+        print(f"❌ Unsupported output format: {args.output} (use .csv or .parquet)")
+        return 1
+    if output_format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        print("❌ Parquet output requires pyarrow (pip install pyarrow)")
+        return 1
+
+    header = pd.read_csv(args.input, nrows=0).columns
+    if args.column not in header:
+        print(f'❌ Input CSV must have an "{args.column}" column')
+        return 1
+
+    checkpoint_dir = _prepare_checkpoints(args, output_format)
+    workers = args.workers or os.cpu_count() or 1
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    # Build or validate the cache once, so workers only ever load it
+    print(f"📊 Preparing index from: {CSV_PATH}")
+    from models.matcher import AddressMatcher
+    matcher = AddressMatcher(**{**matcher_settings(), "cache_dir": args.cache_dir})
+    asyncio.run(matcher.initialize())
+    del matcher
+
+    print(f"🚀 Matching {args.input} with {workers} worker(s), {threads} thread(s) each")
+    start_time = time.time()
+    chunks = done = skipped = rows = matched = 0
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(args.cache_dir, threads)
+    ) as pool:
+        pending = set()
+        reader = pd.read_csv(args.input, usecols=[args.column], chunksize=args.chunk_size,
+                             dtype=str, keep_default_na=False)
+
+        def collect(return_when):
+            nonlocal pending, done, rows, matched
+            finished, pending = wait(pending, return_when=return_when)
+            for future in finished:
+                stats = future.result()
+                done += 1
+                rows += stats["rows"]
+                matched += stats["matched"]
+                print(f"  ✅ Chunk {stats['chunk']}: {stats['rows']} rows in {stats['seconds']:.1f}s")
+
+        for chunk_id, chunk in enumerate(reader):
+            chunks += 1
+            part_path = checkpoint_dir / f"part-{chunk_id:06d}.{output_format}"
+            if part_path.exists():
+                skipped += 1
+                continue
+
+            addresses = [text.strip() or None for text in chunk[args.column]]
+            pending.add(pool.submit(
+                _match_chunk, chunk_id, addresses, str(part_path), output_format, args.sub_batch
+            ))
+            # Bound the chunks held in memory while workers catch up
+            if len(pending) >= workers * 2:
+                collect(FIRST_COMPLETED)
+
+        collect("ALL_COMPLETED")
+
+    elapsed = time.time() - start_time
+    if skipped:
+        print(f"⏭️  Resumed: {skipped} chunk(s) already matched")
+    if rows:
+        print(f"📈 {rows} rows ({matched} matched) in {elapsed:.1f}s - {rows / elapsed:.0f} rows/s")
+
+    print(f"📦 Writing {args.output}")
+    _merge_parts(args, checkpoint_dir, output_format)
+    if not args.keep_checkpoints:
+        shutil.rmtree(checkpoint_dir)
+    print(f"✅ Done: {chunks} chunk(s)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Match a CSV of addresses against the post office index")
+    parser.add_argument("input", help="Input CSV with an address column")
+    parser.add_argument("output", help="Output file (.csv or .parquet)")
+    parser.add_argument("--column", default="address", help="Address column name (default: address)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per checkpoint chunk (default: 10000)")
+    parser.add_argument("--sub-batch", type=int, default=256, help="Addresses per matcher call (default: 256)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--cache-dir", default="./cache", help="Index cache directory (default: ./cache)")
+    parser.add_argument("--checkpoint-dir", default=None, help="Checkpoint directory (default: <output>.parts)")
+    parser.add_argument("--restart", action="store_true", help="Discard existing checkpoints")
+    parser.add_argument("--keep-checkpoints", action="store_true", help="Keep part files after merging")
+    args = parser.parse_args()
+
+    if args.chunk_size < 1 or args.sub_batch < 1:
+        parser.error("--chunk-size and --sub-batch must be positive")
+
+    sys.exit(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Embedding backend parity/latency benchmark
+
+Encodes directory records and noisy address queries with the PyTorch
+model and each ONNX backend, then reports:
+- cosine similarity between each backend's embeddings and PyTorch's
+- top-k agreement: overlap of the records retrieved for each query when
+  corpus and queries are both encoded with the backend
+- single-query p50/p99 latency and batch throughput
+
+Usage (from the ml/ directory):
+    python -m benchmarks.embedder_parity --corpus 20000 --queries 500
+    python -m benchmarks.embedder_parity --backends onnx-int8 --quantization avx512_vnni --output parity.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+import faiss
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.matcher import AddressMatcher
+from models.embedder import load_embedder, DEFAULT_QUANTIZATION
+from benchmarks.index_recall import make_noisy_queries
+from utils.text_processor import clean_address
+
+
+def encode(model, texts: List[str], batch_size: int = 128) -> np.ndarray:
+    """Encode texts into L2-normalized float32 embeddings"""
+    embeddings = model.encode(texts, batch_size=batch_size, convert_to_numpy=True).astype('float32')
+    faiss.normalize_L2(embeddings)
+    return embeddings
+
+
+def measure_latency(model, queries: List[str], batch_size: int) -> Dict:
+    """Measure single-query latency and batch throughput"""
+    model.encode(queries[:8], convert_to_numpy=True)  # warm-up
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        model.encode([query], convert_to_numpy=True)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    model.encode(queries, batch_size=batch_size, convert_to_numpy=True)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 3),
+        'batch_texts_per_s': round(len(queries) / batch_seconds, 1),
+    }
+
+
+def top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Exact top-k record ids for each query"""
+    index = faiss.IndexFlatIP(corpus.shape[1])
+    index.add(corpus)
+    _, ids = index.search(queries, k)
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backend parity/latency benchmark")
+    parser.add_argument('--csv', default=os.getenv("CSV_PATH", "../post/all_india_pincode_directory_2025.csv"))
+    parser.add_argument('--cache-dir', default="./cache")
+    parser.add_argument('--model', default=os.getenv("MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2"))
+    parser.add_argument('--revision', default=os.getenv("MODEL_REVISION") or None)
+    parser.add_argument('--backends', default="onnx,onnx-int8", help="Backends compared against torch")
+    parser.add_argument('--quantization', default=os.getenv("ONNX_QUANTIZATION", DEFAULT_QUANTIZATION))
+    parser.add_argument('--corpus', type=int, default=20000, help="Directory records to encode (0 = all)")
+    parser.add_argument('--queries', type=int, default=500, help="Number of benchmark queries")
+    parser.add_argument('--k', type=int, default=10, help="Top-k cut-off for agreement")
+    parser.add_argument('--batch-size', type=int, default=128)
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    matcher = AddressMatcher(csv_path=args.csv, cache_dir=args.cache_dir)
+    matcher._load_dataset()
+    texts = matcher.df['search_text_norm'].astype(str).tolist()
+    if args.corpus and args.corpus < len(texts):
+        texts = random.Random(0).sample(texts, args.corpus)
+    queries = [clean_address(q) for q in make_noisy_queries(texts, args.queries)]
+
+    export_dir = os.path.join(args.cache_dir, "onnx")
+    backends = ['torch'] + [b.strip() for b in args.backends.split(',') if b.strip() and b.strip() != 'torch']
+
+    reference = None
+    results = []
+    for backend in backends:
+        print(f"🤖 Loading {backend} backend...")
+        model = load_embedder(
+            args.model,
+            backend=backend,
+            revision=args.revision,
+            export_dir=export_dir,
+            quantization=args.quantization
+        )
+
+        print(f"🔎 Encoding {len(texts)} records and {len(queries)} queries with {backend}...")
+        start = time.perf_counter()
+        corpus_vectors = encode(model, texts, args.batch_size)
+        corpus_seconds = time.perf_counter() - start
+        query_vectors = encode(model, queries, args.batch_size)
+        neighbours = top_k(corpus_vectors, query_vectors, args.k)
+
+        result = {
+            'backend': backend,
+            'corpus_texts_per_s': round(len(texts) / corpus_seconds, 1),
+            **measure_latency(model, queries, args.batch_size),
+        }
+
+        if reference is None:
+            reference = (corpus_vectors, query_vectors, neighbours)
+        else:
+            ref_corpus, ref_queries, ref_neighbours = reference
+            cosines = np.concatenate([
+                np.sum(corpus_vectors * ref_corpus, axis=1),
+                np.sum(query_vectors * ref_queries, axis=1),
+            ])
+            agreement = [
+                len(set(neighbours[i]) & set(ref_neighbours[i])) / args.k
+                for i in range(len(queries))
+            ]
+            result.update({
+                'cosine_mean': round(float(cosines.mean()), 6),
+                'cosine_min': round(float(cosines.min()), 6),
+                'top_k_agreement': round(float(np.mean(agreement)), 4),
+                'top1_agreement': round(float(np.mean(neighbours[:, 0] == ref_neighbours[:, 0])), 4),
+            })
+
+        results.append(result)
+        parity = (
+            f"  cosine mean={result['cosine_mean']:.5f} min={result['cosine_min']:.5f}  "
+            f"top{args.k} agreement={result['top_k_agreement']:.4f}"
+            if 'cosine_mean' in result else "  reference"
+        )
+        print(
+            f"  {backend:10s} p50={result['p50_ms']:.2f}ms  p99={result['p99_ms']:.2f}ms  "
+            f"batch={result['batch_texts_per_s']:.0f} texts/s{parity}"
+        )
+
+    report = {
+        'model': args.model,
+        'records': len(texts),
+        'queries': len(queries),
+        'k': args.k,
+        'quantization': args.quantization,
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+FAISS index recall/latency benchmark
+
+Builds each configured index type over the post office directory and
+reports recall@k against the exact flat index plus p50/p99 single-query
+search latency, so INDEX_TYPE / IVF_NPROBE / HNSW_EF_SEARCH can be picked
+deliberately.
+
+Usage (from the ml/ directory):
+    python -m benchmarks.index_recall --queries 1000 --k 10
+    python -m benchmarks.index_recall --types ivf,hnsw --nprobe 4,16,64 --output recall.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+import faiss
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.matcher import AddressMatcher
+from models.index_factory import build_index, configure_search, resolve_index_params
+from utils.text_processor import clean_address
+
+
+def make_noisy_queries(texts: List[str], count: int, seed: int = 0) -> List[str]:
+    """
+    Generate address-like queries from directory records
+
+    Each query drops some tokens and introduces character typos, so the
+    benchmark exercises the same fuzzy neighbourhoods real scans do.
+    """
+    rng = random.Random(seed)
+    queries = []
+    for text in rng.sample(texts, min(count, len(texts))):
+        tokens = [t for t in text.split() if rng.random() > 0.25] or text.split()
+        noisy = []
+        for token in tokens:
+            if len(token) > 3 and rng.random() < 0.2:
+                pos = rng.randrange(len(token) - 1)
+                token = token[:pos] + token[pos + 1] + token[pos] + token[pos + 2:]
+            noisy.append(token)
+        queries.append(' '.join(noisy))
+    return queries
+
+
+def measure(index: faiss.Index, queries: np.ndarray, truth: np.ndarray, k: int) -> Dict:
+    """Measure recall@k and per-query latency of an index"""
+    latencies = []
+    found = np.empty_like(truth)
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, ids = index.search(queries[i:i + 1], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found[i] = ids[0]
+
+    recall = np.mean([
+        len(set(found[i]) & set(truth[i])) / k
+        for i in range(len(truth))
+    ])
+
+    start = time.perf_counter()
+    index.search(queries, k)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        'recall_at_k': round(float(recall), 4),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 4),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 4),
+        'batch_qps': round(len(queries) / batch_seconds, 1),
+    }
+
+
+async def load_matcher(csv_path: str, cache_dir: str) -> AddressMatcher:
+    """Load the matcher (exact flat index) used as ground truth"""
+    matcher = AddressMatcher(csv_path=csv_path, cache_dir=cache_dir, index_type='flat')
+    await matcher.initialize()
+    return matcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAISS index recall/latency benchmark")
+    parser.add_argument('--csv', default=os.getenv("CSV_PATH", "../post/all_india_pincode_directory_2025.csv"))
+    parser.add_argument('--cache-dir', default="./cache")
+    parser.add_argument('--queries', type=int, default=1000, help="Number of benchmark queries")
+    parser.add_argument('--k', type=int, default=10, help="Recall cut-off")
+    parser.add_argument('--types', default="flat,ivf,hnsw,ivfpq", help="Comma-separated index types")
+    parser.add_argument('--nprobe', default="1,4,16,64", help="IVF nprobe values to sweep")
+    parser.add_argument('--ef-search', default="16,32,64,128", help="HNSW efSearch values to sweep")
+    parser.add_argument('--nlist', type=int, default=None)
+    parser.add_argument('--hnsw-m', type=int, default=None)
+    parser.add_argument('--pq-m', type=int, default=None)
+    parser.add_argument('--threads', type=int, default=1, help="FAISS OpenMP threads (1 = per-core latency)")
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    faiss.omp_set_num_threads(args.threads)
+
+    matcher = asyncio.run(load_matcher(args.csv, args.cache_dir))
+    texts = [str(t) for t in matcher.metadata.column('search_text_norm')]
+
+    # Corpus vectors: reuse the cached embeddings when possible
+    if os.path.exists(matcher.embeddings_path):
+        corpus = np.load(matcher.embeddings_path)
+    else:
+        corpus = matcher.model.encode(texts, batch_size=128, show_progress_bar=True, convert_to_numpy=True)
+        faiss.normalize_L2(corpus)
+    corpus = np.ascontiguousarray(corpus, dtype='float32')
+
+    print(f"🔎 Encoding {args.queries} benchmark queries...")
+    queries = [clean_address(q) for q in make_noisy_queries(texts, args.queries)]
+    query_vectors = matcher.model.encode(queries, batch_size=128, convert_to_numpy=True).astype('float32')
+    faiss.normalize_L2(query_vectors)
+
+    flat = build_index(corpus, 'flat')
+    _, truth = flat.search(query_vectors, args.k)
+
+    base_params = resolve_index_params({
+        'nlist': args.nlist,
+        'hnsw_m': args.hnsw_m,
+        'pq_m': args.pq_m,
+    })
+
+    results = []
+    for index_type in [t.strip() for t in args.types.split(',') if t.strip()]:
+        print(f"🔍 Building {index_type} index over {len(corpus)} vectors...")
+        start = time.perf_counter()
+        index = flat if index_type == 'flat' else build_index(corpus, index_type, base_params)
+        build_seconds = time.perf_counter() - start
+
+        if index_type in ('ivf', 'ivfpq'):
+            sweep = [('nprobe', int(v)) for v in args.nprobe.split(',')]
+        elif index_type == 'hnsw':
+            sweep = [('ef_search', int(v)) for v in args.ef_search.split(',')]
+        else:
+            sweep = [(None, None)]
+
+        for param, value in sweep:
+            params = dict(base_params)
+            if param:
+                params[param] = value
+            configure_search(index, params)
+
+            result = {
+                'index_type': index_type,
+                'param': param,
+                'value': value,
+                'build_seconds': round(build_seconds, 2),
+                **measure(index, query_vectors, truth, args.k),
+            }
+            results.append(result)
+            label = f"{param}={value}" if param else "exact"
+            print(
+                f"  {index_type:6s} {label:14s} recall@{args.k}={result['recall_at_k']:.4f}  "
+                f"p50={result['p50_ms']:.3f}ms  p99={result['p99_ms']:.3f}ms  "
+                f"batch={result['batch_qps']:.0f} q/s"
+            )
+
+    report = {
+        'records': int(len(corpus)),
+        'queries': len(queries),
+        'k': args.k,
+        'threads': args.threads,
+        'params': base_params,
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Performance benchmark suite
+
+Runs offline against a synthetic or sampled post office directory and
+measures the service's hot paths:
+- normalize_text / clean_address throughput
+- OCR image preprocessing (and full and tiered OCR when Tesseract is installed)
+- AddressMatcher.match p50/p95/p99 latency by top_k and include_digipin,
+  overall and per match_path
+- match_many_sync throughput by batch size
+- cache build time, cold-start (cache load) time and peak RSS, each in a
+  fresh process
+
+The synthetic queries name their office and PIN, so the exact-match fast
+path would answer nearly all of them by key lookup; match and batch run
+with it off unless --exact-fast-path is given.
+
+Results are written as JSON with a flat `metrics` map; pass a previous
+report as --baseline to flag regressions between commits.
+
+Usage (from the ml/ directory):
+    python -m benchmarks.suite --synthetic 20000 --output bench.json
+    python -m benchmarks.suite --sample 50000 --baseline bench-main.json --max-regression 0.15
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CSV_PATH, matcher_settings
+from models.matcher import AddressMatcher
+from utils.text_processor import normalize_text, clean_address
+
+STATES = [
+    "Andhra Pradesh", "Bihar", "Gujarat", "Karnataka", "Kerala", "Madhya Pradesh",
+    "Maharashtra", "Odisha", "Punjab", "Rajasthan", "Tamil Nadu", "Telangana",
+    "Uttar Pradesh", "West Bengal",
+]
+NAME_PARTS = [
+    "ram", "shiv", "nehru", "gandhi", "kothi", "nagar", "pur", "abad", "ganj",
+    "wadi", "pet", "halli", "mir", "garh", "kot", "pura", "bagh", "gaon",
+]
+OFFICE_TYPES = [("B.O", "BO"), ("S.O", "SO"), ("H.O", "HO")]
+STREETS = ["Main Road", "MG Road", "Station Road", "Temple Street", "Bazaar", "Colony", "Lane 2"]
+
+
+def synthetic_directory(path: str, records: int, seed: int = 0):
+    """Write a directory CSV with the columns of the India Post dataset"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(records):
+        name = ''.join(rng.sample(NAME_PARTS, 2)).title()
+        suffix, office_type = rng.choice(OFFICE_TYPES)
+        state = STATES[i % len(STATES)]
+        rows.append({
+            'circlename': f"{state} Circle",
+            'regionname': f"Region{i % 40}",
+            'divisionname': f"Division{i % 200}",
+            'officename': f"{name} {suffix}",
+            'pincode': 110001 + (i * 7919) % 744000,
+            'officetype': office_type,
+            'delivery': 'Delivery',
+            'district': f"{name[:4].title()}District{i % 700}",
+            'statename': state.upper(),
+            'latitude': round(rng.uniform(8.0, 35.0), 6),
+            'longitude': round(rng.uniform(68.0, 97.0), 6),
+        })
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+def sample_directory(source: str, path: str, records: int, seed: int = 0):
+    """Write a random sample of a directory CSV"""
+    df = pd.read_csv(source)
+    if records < len(df):
+        df = df.sample(n=records, random_state=seed)
+    df.to_csv(path, index=False)
+
+
+def make_addresses(matcher: AddressMatcher, count: int, seed: int = 0) -> List[str]:
+    """
+    Generate raw address strings from directory records
+
+    Mixes house numbers, street words, abbreviations and missing fields,
+    so the text processor and matcher see realistic inputs.
+    """
+    rng = random.Random(seed)
+    rows = rng.sample(range(matcher.total_records), min(count, matcher.total_records))
+    names = matcher.metadata.take('officename', rows)
+    districts = matcher.metadata.take('district', rows)
+    states = matcher.metadata.take('state', rows)
+    pincodes = matcher.metadata.take('pincode', rows)
+
+    addresses = []
+    for name, district, state, pincode in zip(names, districts, states, pincodes):
+        parts = [f"H.No. {rng.randint(1, 999)}/{rng.randint(1, 20)}", rng.choice(STREETS), str(name)]
+        if rng.random() < 0.8:
+            parts.append(f"{district} Dist.")
+        if rng.random() < 0.6:
+            parts.append(str(state))
+        if rng.random() < 0.85:
+            parts.append(f"PIN - {pincode}")
+        addresses.append(', '.join(parts))
+    return addresses
+
+
+def percentiles(latencies: List[float]) -> Dict:
+    return {
+        'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 3),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 3),
+        'mean_ms': round(float(np.mean(latencies)), 3),
+    }
+
+
+def bench_text(addresses: List[str], repeat: int) -> Dict:
+    """Calls per second of the text processing functions"""
+    results = {}
+    for fn in (normalize_text, clean_address):
+        fn(addresses[0])
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for address in addresses:
+                fn(address)
+        seconds = time.perf_counter() - start
+        results[fn.__name__] = {'calls_per_s': round(len(addresses) * repeat / seconds, 1)}
+    return results
+
+
+def bench_ocr(images: int) -> Optional[Dict]:
+    """
+    Preprocessing (and, with Tesseract installed, full OCR) time per image
+
+    Returns None when the OCR dependencies are not installed.
+    """
+    try:
+        from PIL import Image, ImageDraw
+        from utils.ocr import (
+            preprocess_image, extract_text_from_image, extract_text_tiered, init_ocr_worker, resolve_ocr_engine
+        )
+    except ImportError as e:
+        print(f"⚠️  Skipping OCR benchmark: {e}")
+        return None
+
+    image = Image.new('RGB', (1200, 500), 'white')
+    draw = ImageDraw.Draw(image)
+    for line, text in enumerate(["To: R. Kumar", "H.No. 12/4, Main Road", "Kothimir B.O", "Karimnagar Dist. 505001"]):
+        draw.text((60, 60 + line * 90), text, fill='black')
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    image_bytes = buffer.getvalue()
+
+    preprocess = []
+    for _ in range(images):
+        start = time.perf_counter()
+        preprocess_image(Image.open(io.BytesIO(image_bytes)))
+        preprocess.append((time.perf_counter() - start) * 1000)
+    results = {'preprocess': percentiles(preprocess)}
+
+    engine = resolve_ocr_engine(os.getenv('OCR_ENGINE', 'auto'))
+    if engine == 'tesserocr' or shutil.which('tesseract'):
+        print(f"   OCR engine: {engine}")
+        init_ocr_worker(engine)
+        full = []
+        for _ in range(images):
+            start = time.perf_counter()
+            extract_text_from_image(image_bytes)
+            full.append((time.perf_counter() - start) * 1000)
+        results['extract_text'] = percentiles(full)
+
+        tiered = []
+        tiers_used = {}
+        for _ in range(images):
+            start = time.perf_counter()
+            _, _, details = extract_text_tiered(image_bytes)
+            tiered.append((time.perf_counter() - start) * 1000)
+            tiers_used[details['tier']] = tiers_used.get(details['tier'], 0) + 1
+        results['extract_text_tiered'] = percentiles(tiered)
+        print(f"   Tiered OCR accepted at: {tiers_used}")
+    else:
+        print("⚠️  Tesseract not found: measuring OCR preprocessing only")
+    return results
+
+
+async def bench_match(matcher: AddressMatcher, addresses: List[str], top_ks: List[int]) -> List[Dict]:
+    """
+    Single-query latency of AddressMatcher.match (result cache disabled)
+
+    Latencies are also split by the match_path that answered each query,
+    so lookups and lexical shortcuts are not averaged into retrieval.
+    """
+    results = []
+    for top_k in top_ks:
+        for include_digipin in (True, False):
+            await matcher.match(addresses[0], top_k=top_k, include_digipin=include_digipin)
+            latencies = []
+            by_path = {}
+            for address in addresses:
+                start = time.perf_counter()
+                result = await matcher.match(address, top_k=top_k, include_digipin=include_digipin)
+                latency = (time.perf_counter() - start) * 1000
+                latencies.append(latency)
+                by_path.setdefault(result['match_path'], []).append(latency)
+            results.append({
+                'top_k': top_k,
+                'include_digipin': include_digipin,
+                **percentiles(latencies),
+                'by_path': {
+                    path: {'queries': len(values), **percentiles(values)}
+                    for path, values in sorted(by_path.items())
+                },
+            })
+    return results
+
+
+def bench_batch(matcher: AddressMatcher, addresses: List[str], batch_sizes: List[int]) -> List[Dict]:
+    """Queries per second of match_many_sync by batch size"""
+    results = []
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        for offset in range(0, len(addresses), batch_size):
+            matcher.match_many_sync(addresses[offset:offset + batch_size], top_k=5)
+        seconds = time.perf_counter() - start
+        results.append({'batch_size': batch_size, 'queries_per_s': round(len(addresses) / seconds, 1)})
+    return results
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def startup(csv_path: str, cache_dir: str) -> Dict:
+    """Initialize a matcher in this process and report time and memory"""
+    start = time.perf_counter()
+    matcher = AddressMatcher(**{**matcher_settings(), 'csv_path': csv_path, 'cache_dir': cache_dir})
+    asyncio.run(matcher.initialize())
+    return {
+        'initialize_seconds': round(time.perf_counter() - start, 3),
+        'peak_rss_mb': peak_rss_mb(),
+        'records': matcher.total_records,
+    }
+
+
+def bench_startup(csv_path: str, cache_dir: str) -> Dict:
+    """
+    Time a cache build and a cold start, each in a fresh interpreter
+
+    `process_seconds` includes interpreter start and imports.
+    """
+    results = {}
+    for phase in ('build', 'load'):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.suite', '--startup', '--csv', csv_path, '--cache-dir', cache_dir],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout
+        report = json.loads(output.strip().splitlines()[-1])
+        results[phase] = {
+            'process_seconds': round(time.perf_counter() - start, 3),
+            'initialize_seconds': report['initialize_seconds'],
+            'peak_rss_mb': report['peak_rss_mb'],
+        }
+    return results
+
+
+def flatten_metrics(report: Dict) -> Dict[str, float]:
+    """Comparable metrics as a flat name -> value map"""
+    metrics = {}
+    for name, result in report['text'].items():
+        metrics[f"text.{name}.calls_per_s"] = result['calls_per_s']
+    for name, result in (report.get('ocr') or {}).items():
+        for key in ('p50_ms', 'p95_ms'):
+            metrics[f"ocr.{name}.{key}"] = result[key]
+    for result in report['match']:
+        label = f"match.top{result['top_k']}.{'digipin' if result['include_digipin'] else 'plain'}"
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            metrics[f"{label}.{key}"] = result[key]
+        for path, path_result in result['by_path'].items():
+            for key in ('p50_ms', 'p95_ms'):
+                metrics[f"{label}.{path}.{key}"] = path_result[key]
+    for result in report['batch']:
+        metrics[f"batch.{result['batch_size']}.queries_per_s"] = result['queries_per_s']
+    for phase, result in report['startup'].items():
+        metrics[f"startup.{phase}.initialize_seconds"] = result['initialize_seconds']
+        metrics[f"startup.{phase}.peak_rss_mb"] = result['peak_rss_mb']
+    return metrics
+
+
+def compare(metrics: Dict[str, float], baseline: Dict[str, float], max_regression: float) -> List[str]:
+    """
+    List metrics that regressed by more than `max_regression` (a fraction)
+
+    Rates (`*_per_s`) regress when they drop; times and memory when they grow.
+    """
+    regressions = []
+    for name, value in metrics.items():
+        old = baseline.get(name)
+        if not old:
+            continue
+        change = (value - old) / old
+        if name.endswith('_per_s'):
+            change = -change
+        if change > max_regression:
+            regressions.append(f"{name}: {old} -> {value} ({change:+.1%} worse)")
+    return regressions
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ML service performance benchmark suite")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--synthetic', type=int, default=None, help="Generate a synthetic directory with N records")
+    source.add_argument('--sample', type=int, default=None, help="Sample N records from --csv")
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--cache-dir', default=None, help="Cache directory (default: a temporary directory)")
+    parser.add_argument('--queries', type=int, default=1000, help="Queries for latency and throughput")
+    parser.add_argument('--text-repeat', type=int, default=5, help="Passes over the queries for text processing")
+    parser.add_argument('--ocr-images', type=int, default=10, help="Images for the OCR benchmark (0 = skip)")
+    parser.add_argument('--top-k', default="1,5,10", help="top_k values for latency")
+    parser.add_argument('--batch-sizes', default="1,32,256,1024", help="Batch sizes for throughput")
+    parser.add_argument('--exact-fast-path', action='store_true',
+                        help="Keep the exact-match fast path on for match and batch (default: measure retrieval)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    parser.add_argument('--baseline', help="Previous JSON report to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.1, help="Allowed slowdown vs the baseline (fraction)")
+    parser.add_argument('--startup', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.startup:
+        print(json.dumps(startup(args.csv, args.cache_dir)))
+        return
+
+    workdir = tempfile.mkdtemp(prefix='ml-bench-')
+    try:
+        csv_path = args.csv
+        if args.synthetic:
+            csv_path = os.path.join(workdir, 'directory.csv')
+            print(f"🧪 Generating synthetic directory with {args.synthetic} records...")
+            synthetic_directory(csv_path, args.synthetic, args.seed)
+        elif args.sample:
+            csv_path = os.path.join(workdir, 'directory.csv')
+            print(f"🧪 Sampling {args.sample} records from {args.csv}...")
+            sample_directory(args.csv, csv_path, args.sample, args.seed)
+        csv_path = os.path.abspath(csv_path)
+        cache_dir = os.path.abspath(args.cache_dir or os.path.join(workdir, 'cache'))
+        if os.path.exists(cache_dir) and args.cache_dir:
+            print(f"⚠️  {cache_dir} exists: the build phase will measure a cache load")
+
+        print("⏱️  Measuring cache build and cold start...")
+        startup_results = bench_startup(csv_path, cache_dir)
+
+        settings = {
+            **matcher_settings(),
+            'csv_path': csv_path,
+            'cache_dir': cache_dir,
+            'result_cache_size': 0,
+            'exact_fast_path': args.exact_fast_path,
+        }
+        matcher = AddressMatcher(**settings)
+        asyncio.run(matcher.initialize())
+        addresses = make_addresses(matcher, args.queries, args.seed)
+
+        print("⏱️  Measuring text processing...")
+        text_results = bench_text(addresses, args.text_repeat)
+
+        ocr_results = None
+        if args.ocr_images:
+            print("⏱️  Measuring OCR...")
+            ocr_results = bench_ocr(args.ocr_images)
+
+        print("⏱️  Measuring match latency...")
+        top_ks = [int(k) for k in args.top_k.split(',')]
+        match_results = asyncio.run(bench_match(matcher, addresses, top_ks))
+
+        print("⏱️  Measuring batch throughput...")
+        batch_results = bench_batch(matcher, addresses, [int(b) for b in args.batch_sizes.split(',')])
+
+        report = {
+            'environment': {
+                'commit': git_commit(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+            },
+            'config': {
+                'dataset': 'synthetic' if args.synthetic else 'sample' if args.sample else 'full',
+                'records': matcher.total_records,
+                'queries': len(addresses),
+                'model': settings['model_name'],
+                'embedding_backend': settings['embedding_backend'],
+                'index_type': settings['index_type'],
+                'retrieval_mode': settings['retrieval_mode'],
+                'exact_fast_path': settings['exact_fast_path'],
+                'seed': args.seed,
+            },
+            'text': text_results,
+            'ocr': ocr_results,
+            'match': match_results,
+            'batch': batch_results,
+            'startup': startup_results,
+        }
+        report['metrics'] = flatten_metrics(report)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n📊 Results:")
+    for name, value in report['metrics'].items():
+        print(f"  {name:45s} {value}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report['metrics'], baseline.get('metrics', {}), args.max_regression)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.max_regression:.0%} vs {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Matcher configuration from environment variables
+
+Shared by the HTTP service (main.py) and the offline batch CLI
+(batch_match.py), so both build and load the same cache.
+"""
+import os
+from typing import Dict
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+CSV_PATH = os.getenv("CSV_PATH", "../post/all_india_pincode_directory_2025.csv")
+MODEL_NAME = os.getenv("MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2")
+MODEL_REVISION = os.getenv("MODEL_REVISION") or None
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+ONNX_QUANTIZATION = os.getenv("ONNX_QUANTIZATION", "avx2")
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", 10000))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", 3600))
+MATCH_CANDIDATE_FACTOR = int(os.getenv("MATCH_CANDIDATE_FACTOR", 3))
+INCREMENTAL_UPDATES = os.getenv("INCREMENTAL_UPDATES", "true").lower() in ("1", "true", "yes")
+MMAP_INDEX = os.getenv("MMAP_INDEX", "true").lower() in ("1", "true", "yes")
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "semantic")
+LEXICAL_WEIGHT = float(os.getenv("LEXICAL_WEIGHT", 0.3))
+LEXICAL_DECISIVE_MARGIN = float(os.getenv("LEXICAL_DECISIVE_MARGIN", 0.3))
+EXACT_FAST_PATH = os.getenv("EXACT_FAST_PATH", "true").lower() in ("1", "true", "yes")
+INDEX_TYPE = os.getenv("INDEX_TYPE", "flat")
+INDEX_PARAMS = {
+    "nlist": int(os.getenv("IVF_NLIST", 1024)),
+    "nprobe": int(os.getenv("IVF_NPROBE", 16)),
+    "hnsw_m": int(os.getenv("HNSW_M", 32)),
+    "ef_construction": int(os.getenv("HNSW_EF_CONSTRUCTION", 80)),
+    "ef_search": int(os.getenv("HNSW_EF_SEARCH", 64)),
+    "pq_m": int(os.getenv("PQ_M", 16)),
+    "pq_nbits": int(os.getenv("PQ_NBITS", 8)),
+}
+
+
+def matcher_settings() -> Dict:
+    """Keyword arguments for AddressMatcher from the environment"""
+    return {
+        "csv_path": CSV_PATH,
+        "model_name": MODEL_NAME,
+        "model_revision": MODEL_REVISION,
+        "result_cache_size": RESULT_CACHE_SIZE,
+        "result_cache_ttl": RESULT_CACHE_TTL,
+        "candidate_factor": MATCH_CANDIDATE_FACTOR,
+        "index_type": INDEX_TYPE,
+        "index_params": INDEX_PARAMS,
+        "incremental_updates": INCREMENTAL_UPDATES,
+        "embedding_backend": EMBEDDING_BACKEND,
+        "quantization": ONNX_QUANTIZATION,
+        "mmap_index": MMAP_INDEX,
+        "retrieval_mode": RETRIEVAL_MODE,
+        "lexical_weight": LEXICAL_WEIGHT,
+        "lexical_decisive_margin": LEXICAL_DECISIVE_MARGIN,
+        "exact_fast_path": EXACT_FAST_PATH,
+    }
@@ -1,17 +1,43 @@
 import os
+import time
+import asyncio
 import certifi
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 import uvicorn
 from dotenv import load_dotenv
 
 # Import custom modules
-from utils.text_processor import normalize_text, clean_address
-from utils.ocr import extract_text_from_image
+from utils.text_processor import normalize_text, clean_address, clean_addresses
+from utils.ocr import (
+    extract_text_tiered,
+    set_stage_observer,
+    init_ocr_worker,
+    resolve_ocr_engine,
+    OCRTimeout,
+    OCR_PIPELINE_VERSION,
+    OCR_MODES
+)
+from utils.ocr_cache import OCRCache
 from models.matcher import AddressMatcher
+from config import CSV_PATH, matcher_settings
+from models.index_factory import describe_index
+from utils.workers import BoundedExecutor, ExecutorSaturated, WorkerCrashed
+from utils.micro_batcher import MicroBatcher
+from utils.job_store import JobStore
+from utils.job_queue import JobRunner
+from utils.metrics import MetricsRegistry, MultiProcessMetrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from utils.streaming import (
+    spool_body,
+    iter_spooled,
+    iter_lines,
+    iter_csv_records,
+    iter_ndjson_records,
+    ndjson_line
+)
 
 # Load environment variables
 load_dotenv()
@@ -21,9 +47,49 @@ os.environ['REQUESTS_CA_BUNDLE'] = certifi.where()
 os.environ['SSL_CERT_FILE'] = certifi.where()
 
 # Configuration
-CSV_PATH = os.getenv("CSV_PATH", "../post/all_india_pincode_directory_2025.csv")
 PORT = int(os.getenv("ML_PORT", 8000))
 HOST = os.getenv("ML_HOST", "0.0.0.0")
+WORKERS = int(os.getenv("ML_WORKERS", 1))
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 10000))
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", 256))
+
+# Worker executors (matching runs in threads: encode and FAISS search release the GIL)
+MATCH_WORKERS = int(os.getenv("MATCH_WORKERS", 4))
+MATCH_QUEUE_SIZE = int(os.getenv("MATCH_QUEUE_SIZE", 64))
+MATCH_TIMEOUT = float(os.getenv("MATCH_TIMEOUT", 30))
+BATCH_MATCH_TIMEOUT = float(os.getenv("BATCH_MATCH_TIMEOUT", 300))
+OCR_EXECUTOR = os.getenv("OCR_EXECUTOR", "process")
+OCR_ENGINE = os.getenv("OCR_ENGINE", "auto")
+OCR_MODE = os.getenv("OCR_MODE", "tiered")
+OCR_MIN_CONFIDENCE = float(os.getenv("OCR_MIN_CONFIDENCE", 0.8))
+OCR_DETECT_REGION = os.getenv("OCR_DETECT_REGION", "true").lower() == "true"
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", 2))
+OCR_QUEUE_SIZE = int(os.getenv("OCR_QUEUE_SIZE", 16))
+OCR_TIMEOUT = float(os.getenv("OCR_TIMEOUT", 30))
+
+# OCR result cache (size 0 disables; empty path keeps it in memory only)
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", 1000))
+OCR_CACHE_TTL = float(os.getenv("OCR_CACHE_TTL", 86400))
+OCR_CACHE_PHASH_DISTANCE = int(os.getenv("OCR_CACHE_PHASH_DISTANCE", 0))
+OCR_CACHE_PATH = os.getenv("OCR_CACHE_PATH", "")
+
+# Micro-batching of concurrent /api/ml/match calls (window 0 disables)
+MATCH_BATCH_WINDOW_MS = float(os.getenv("MATCH_BATCH_WINDOW_MS", 5))
+MATCH_BATCH_MAX_SIZE = int(os.getenv("MATCH_BATCH_MAX_SIZE", 32))
+
+# Asynchronous batch jobs (SQLite job store + background workers)
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "./jobs/jobs.db")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 1))
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", 256))
+MAX_JOB_SIZE = int(os.getenv("MAX_JOB_SIZE", 1000000))
+JOB_RETENTION_HOURS = float(os.getenv("JOB_RETENTION_HOURS", 24))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", 300))
+
+# Prometheus /metrics endpoint and per-stage timing hooks
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# With ML_WORKERS > 1, workers share their metrics through this directory
+METRICS_DIR = os.getenv("METRICS_DIR", "./metrics")
+METRICS_WRITE_SECONDS = float(os.getenv("METRICS_WRITE_SECONDS", 5))
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -44,30 +110,126 @@ app.add_middleware(
 # Initialize matcher
 matcher = None
 
+# Bounded executors for CPU-bound work
+match_executor = None
+ocr_executor = None
+ocr_cache = None
+ocr_engine = None
+ocr_tiers = ()
+match_batcher = None
+
+# Batch job store and workers
+job_store = None
+job_runner = None
+
+# Background matcher startup
+startup_task = None
+metrics_task = None
+startup_error = None
+
 from contextlib import asynccontextmanager
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for FastAPI application"""
     # Startup
-    global matcher
+    global matcher, match_executor, ocr_executor, ocr_cache, ocr_engine, ocr_tiers, job_store, job_runner, startup_task, metrics_task
     print("🚀 Starting ML Microservice...")
     print(f"📊 Loading dataset from: {CSV_PATH}")
     
+    matcher = AddressMatcher(**matcher_settings())
+    match_executor = BoundedExecutor(
+        name="match",
+        kind="thread",
+        max_workers=MATCH_WORKERS,
+        max_pending=MATCH_QUEUE_SIZE,
+        timeout=MATCH_TIMEOUT
+    )
+    ocr_engine = resolve_ocr_engine(OCR_ENGINE)
+    if ocr_engine == 'pytesseract':
+        reason = "tesserocr is not installed" if OCR_ENGINE == "auto" else "OCR_ENGINE=pytesseract"
+        print(f"⚠️  WARNING: OCR falls back to pytesseract ({reason}): every image starts a new "
+              f"tesseract process and reloads the language model. Install tesserocr "
+              f"(see requirements.txt) for a persistent engine per OCR worker.")
+    if OCR_MODE not in OCR_MODES:
+        raise ValueError(f"Unknown OCR mode '{OCR_MODE}', expected one of {tuple(OCR_MODES)}")
+    ocr_tiers = tuple(t for t in OCR_MODES[OCR_MODE] if OCR_DETECT_REGION or t != 'region')
+    ocr_executor = BoundedExecutor(
+        name="ocr",
+        kind=OCR_EXECUTOR,
+        max_workers=OCR_WORKERS,
+        max_pending=OCR_QUEUE_SIZE,
+        timeout=OCR_TIMEOUT,
+        initializer=init_ocr_worker,
+        # Tesseract stops at the same limit, so a timed-out call frees its worker
+        initargs=(ocr_engine, OCR_TIMEOUT)
+    )
+    # Load an OCR engine per worker now, before the model load starts threads
+    ocr_executor.warmup()
+    print(f"🔤 OCR engine: {ocr_engine}, tiers {'/'.join(ocr_tiers)} ({OCR_WORKERS} {OCR_EXECUTOR} workers)")
+    ocr_cache = OCRCache(
+        maxsize=OCR_CACHE_SIZE,
+        ttl=OCR_CACHE_TTL,
+        phash_distance=OCR_CACHE_PHASH_DISTANCE,
+        path=OCR_CACHE_PATH or None,
+        namespace=f"{ocr_engine}-{'-'.join(ocr_tiers)}-v{OCR_PIPELINE_VERSION}"
+    )
+    job_store = JobStore(JOB_DB_PATH)
+    job_runner = JobRunner(
+        job_store,
+        match_with_retry,
+        workers=JOB_WORKERS,
+        chunk_size=JOB_CHUNK_SIZE,
+        stale_after=JOB_STALE_SECONDS,
+        retention=JOB_RETENTION_HOURS * 3600
+    )
+    
+    # Load the model and index in the background: the server accepts
+    # connections at once and /health/ready reports when matching is up
+    startup_task = asyncio.create_task(start_matcher())
+    if shared_metrics:
+        metrics_task = asyncio.create_task(write_metrics())
+        
+    yield  # Application running
+    
+    # Shutdown
+    print("📝 Cleaning up resources...")
+    startup_task.cancel()
+    if metrics_task:
+        metrics_task.cancel()
+    await job_runner.stop()
+    job_store.close()
+    ocr_cache.close()
+    for executor in (match_executor, ocr_executor):
+        executor.shutdown()
+
+async def start_matcher():
+    """Initialize the matcher, then start the services that depend on it"""
+    global match_batcher, startup_error
+    start_time = time.time()
     try:
-        matcher = AddressMatcher(csv_path=CSV_PATH)
         await matcher.initialize()
-        print(f"✅ ML Service ready with {matcher.total_records} post office records")
     except Exception as e:
+        startup_error = str(e)
         print(f"❌ Failed to initialize matcher: {e}")
-        raise
-        
-    yield  # Application running
+        return
     
-    # Shutdown
-    if matcher:
-        print("📝 Cleaning up resources...")
-        # Add any cleanup if needed
+    if METRICS_ENABLED:
+        matcher.stage_observer = observe_stage
+        set_stage_observer(observe_stage)
+    
+    if MATCH_BATCH_WINDOW_MS > 0 and MATCH_BATCH_MAX_SIZE > 1:
+        match_batcher = MicroBatcher(
+            matcher.match_many_sync,
+            match_executor,
+            max_batch_size=MATCH_BATCH_MAX_SIZE,
+            max_wait_ms=MATCH_BATCH_WINDOW_MS,
+            timeout=MATCH_TIMEOUT
+        )
+    
+    # A single process owns every running job, so resume them right away
+    job_runner.start(requeue_running=WORKERS == 1)
+    print(f"✅ ML Service ready with {matcher.total_records} post office records in {time.time() - start_time:.1f}s")
 
 # Update FastAPI app initialization with lifespan
 app = FastAPI(
@@ -77,10 +239,146 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Metrics
+metrics = MetricsRegistry()
+STAGE_SECONDS = metrics.histogram(
+    "ml_stage_duration_seconds",
+    "Time per pipeline stage per matcher or OCR call",
+    ["stage"]
+)
+REQUEST_SECONDS = metrics.histogram(
+    "ml_request_duration_seconds",
+    "HTTP request latency until the response starts",
+    ["endpoint"]
+)
+REQUESTS = metrics.counter(
+    "ml_requests_total",
+    "HTTP requests by endpoint and outcome",
+    ["endpoint", "outcome"]
+)
+
+def observe_stage(stage: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+
+def executor_stat(key: str):
+    """Per-executor value of a BoundedExecutor stats() field"""
+    executors = {"match": match_executor, "ocr": ocr_executor}
+    return {name: executor.stats()[key] for name, executor in executors.items() if executor}
+
+def result_cache_stat(key: str):
+    return matcher.result_cache.stats()[key] if matcher else None
+
+def ocr_cache_stat(key: str):
+    return ocr_cache.stats()[key] if ocr_cache else None
+
+def index_size_bytes():
+    if matcher and os.path.exists(matcher.index_path):
+        return os.path.getsize(matcher.index_path)
+    return None
+
+metrics.gauge("ml_ready", "1 when the matcher is loaded", lambda: int(bool(matcher and matcher.is_ready)))
+metrics.gauge(
+    "ml_result_cache_lookups_total",
+    "Result cache lookups by result",
+    lambda: {"hit": result_cache_stat("hits"), "miss": result_cache_stat("misses")} if matcher else None,
+    ["result"],
+    type="counter"
+)
+metrics.gauge("ml_result_cache_hit_ratio", "Result cache hits / lookups", lambda: result_cache_stat("hit_ratio"))
+metrics.gauge("ml_result_cache_entries", "Entries in the result cache", lambda: result_cache_stat("size"))
+metrics.gauge(
+    "ml_ocr_cache_lookups_total",
+    "OCR cache lookups by result",
+    lambda: {
+        "hit": ocr_cache_stat("hits"),
+        "near_duplicate": ocr_cache_stat("near_duplicate_hits"),
+        "disk": ocr_cache_stat("disk_hits"),
+        "miss": ocr_cache_stat("misses")
+    } if ocr_cache else None,
+    ["result"],
+    type="counter"
+)
+metrics.gauge("ml_ocr_cache_hit_ratio", "OCR cache hits / lookups", lambda: ocr_cache_stat("hit_ratio"))
+metrics.gauge("ml_ocr_cache_entries", "Entries in the OCR cache", lambda: ocr_cache_stat("size"))
+metrics.gauge("ml_executor_in_flight", "Calls running or queued per executor", lambda: executor_stat("in_flight"), ["executor"])
+metrics.gauge("ml_executor_queue_depth", "Calls waiting for a worker per executor", lambda: executor_stat("queued"), ["executor"])
+metrics.gauge(
+    "ml_executor_rejected_total",
+    "Calls rejected with 503 because the queue was full",
+    lambda: executor_stat("rejected"),
+    ["executor"],
+    type="counter"
+)
+metrics.gauge(
+    "ml_executor_timeouts_total",
+    "Calls that exceeded the executor timeout",
+    lambda: executor_stat("timeouts"),
+    ["executor"],
+    type="counter"
+)
+metrics.gauge(
+    "ml_executor_restarts_total",
+    "Worker pools rebuilt after a worker process died",
+    lambda: executor_stat("restarts"),
+    ["executor"],
+    type="counter"
+)
+metrics.gauge(
+    "ml_micro_batches_total",
+    "Micro-batches run for single-address requests",
+    lambda: match_batcher.stats()["batches"] if match_batcher else None,
+    type="counter"
+)
+metrics.gauge("ml_jobs", "Batch jobs by status", lambda: job_store.stats() if job_store else None, ["status"])
+metrics.gauge("ml_index_records", "Post office records in the index", lambda: matcher.total_records if matcher else None)
+metrics.gauge("ml_index_vectors", "Vectors in the FAISS index", lambda: matcher.index.ntotal if matcher and matcher.index else None)
+metrics.gauge("ml_index_size_bytes", "Size of the FAISS index file", index_size_bytes)
+
+# Each worker process has its own registry; merge them so that one scrape
+# covers the whole service rather than whichever worker answers it
+shared_metrics = MultiProcessMetrics(metrics, METRICS_DIR) if METRICS_ENABLED and WORKERS > 1 else None
+
+async def write_metrics():
+    """Publish this worker's metrics for scrapes answered by the other workers"""
+    while True:
+        try:
+            await asyncio.to_thread(shared_metrics.write)
+        except Exception as e:
+            print(f"⚠️  Failed to write metrics snapshot: {e}")
+        await asyncio.sleep(METRICS_WRITE_SECONDS)
+
+def request_outcome(status_code: int) -> str:
+    if status_code < 400:
+        return "success"
+    if status_code == 503:
+        return "rejected"
+    if status_code == 504:
+        return "timeout"
+    return "client_error" if status_code < 500 else "error"
+
+if METRICS_ENABLED:
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        """Count requests by route template and outcome, and time them"""
+        start = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            endpoint = getattr(route, "path", "unmatched")
+            REQUESTS.inc(endpoint=endpoint, outcome=request_outcome(status_code))
+            REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+
 # Pydantic models
 class NormalizeRequest(BaseModel):
     text: str
 
+class NormalizeBatchRequest(BaseModel):
+    texts: List[str]
+
 class MatchRequest(BaseModel):
     text: str
     top_k: int = 5
@@ -90,12 +388,107 @@ class MatchResponse(BaseModel):
     query: str
     normalized_query: str
     matches: List[dict]
+    match_path: Optional[str] = None
+    processing_time_ms: float
+
+class BatchMatchRequest(BaseModel):
+    texts: List[str]
+    top_k: int = 5
+    include_digipin: bool = True
+
+class BatchMatchResponse(BaseModel):
+    results: List[MatchResponse]
+    total: int
     processing_time_ms: float
 
 class OCRResponse(BaseModel):
     raw_text: str
     clean_text: str
     confidence: Optional[float] = None
+    tier: Optional[str] = None
+    tier_ms: Optional[Dict[str, float]] = None
+    region: Optional[List[int]] = None
+
+async def guard_worker(awaitable, name: str):
+    """
+    Await work queued on a bounded executor, mapping backpressure to HTTP errors
+    
+    - Queue full: 503 with Retry-After, so clients back off
+    - Worker process died: 503 with Retry-After (the pool is rebuilt)
+    - Timed out (in the executor or at the OCR time limit): 504
+    """
+    try:
+        return await awaitable
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=f"Server busy: {str(e)}", headers={"Retry-After": "1"})
+    except WorkerCrashed as e:
+        raise HTTPException(status_code=503, detail=f"Worker restarted: {str(e)}", headers={"Retry-After": "1"})
+    except (asyncio.TimeoutError, OCRTimeout):
+        raise HTTPException(status_code=504, detail=f"{name} request timed out")
+
+async def run_blocking(executor: BoundedExecutor, fn, *args, timeout: Optional[float] = None, **kwargs):
+    """Run blocking work on a bounded executor"""
+    return await guard_worker(executor.run(fn, *args, timeout=timeout, **kwargs), executor.name)
+
+async def run_ocr(image_bytes: bytes):
+    """
+    OCR an image through the OCR result cache
+    
+    Cache misses run the OCR tiers (OCR_MODE) on the OCR executor; the
+    whole call, hit or miss, is timed as the 'ocr' stage.
+    
+    Returns:
+        Tuple of (text, confidence, details); details name the tier that
+        produced the text ("cache" on a hit) and the time spent per tier
+    """
+    start = time.perf_counter()
+    cached = None
+    if ocr_cache.enabled:
+        # Hashing (and the optional disk lookup) stays off the event loop
+        keys = await asyncio.to_thread(ocr_cache.keys, image_bytes)
+        cached = await asyncio.to_thread(ocr_cache.get, keys)
+    
+    if cached is not None:
+        text, confidence = cached
+        details = {"tier": "cache", "tier_ms": {}, "region": None}
+    else:
+        text, confidence, details = await run_blocking(
+            ocr_executor,
+            extract_text_tiered,
+            image_bytes,
+            tiers=ocr_tiers,
+            min_confidence=OCR_MIN_CONFIDENCE
+        )
+        if ocr_cache.enabled:
+            await asyncio.to_thread(ocr_cache.put, keys, (text, confidence))
+        if METRICS_ENABLED and OCR_EXECUTOR == "process":
+            # The stage hook does not reach worker processes; use their tier timings
+            for tier, ms in details["tier_ms"].items():
+                observe_stage(f"ocr_{tier}", ms / 1000)
+    
+    if METRICS_ENABLED:
+        observe_stage("ocr", time.perf_counter() - start)
+    return text, confidence, details
+
+async def match_one(query_text: str, top_k: int, include_digipin: bool):
+    """
+    Match a single address
+    
+    Concurrent calls are coalesced by the micro-batcher into one encode +
+    search pass when batching is enabled.
+    """
+    if match_batcher:
+        return await guard_worker(
+            match_batcher.submit(query_text, top_k=top_k, include_digipin=include_digipin),
+            "match"
+        )
+    return await run_blocking(
+        match_executor,
+        matcher.match_sync,
+        query_text=query_text,
+        top_k=top_k,
+        include_digipin=include_digipin
+    )
 
 # API Endpoints
 
@@ -109,10 +502,36 @@ async def root():
         "endpoints": {
             "ocr": "POST /api/ml/ocr",
             "normalize": "POST /api/ml/normalize",
-            "match": "POST /api/ml/match"
+            "normalize_batch": "POST /api/ml/normalize_batch",
+            "match": "POST /api/ml/match",
+            "match_batch": "POST /api/ml/match_batch",
+            "match_stream": "POST /api/ml/match_stream",
+            "jobs": "POST /api/ml/jobs",
+            "liveness": "GET /health/live",
+            "readiness": "GET /health/ready"
         }
     }
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is serving (fails only if startup failed)"""
+    if startup_error:
+        return JSONResponse(status_code=503, content={"status": "failed", "error": startup_error})
+    return {"status": "alive", "state": matcher.state if matcher else "starting"}
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: 200 once the model and index are loaded"""
+    if not matcher or not matcher.is_ready:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "failed" if startup_error else matcher.state if matcher else "starting",
+                "error": startup_error
+            }
+        )
+    return {"status": "ready", "state": matcher.state, "total_records": matcher.total_records}
+
 @app.get("/health")
 async def health_check():
     """Detailed health check"""
@@ -122,10 +541,34 @@ async def health_check():
     return {
         "status": "healthy",
         "model_loaded": matcher.model is not None,
+        "embedding_backend": matcher.embedding_backend,
+        "retrieval_mode": matcher.retrieval_mode,
+        "exact_fast_path": matcher.exact is not None,
         "index_loaded": matcher.index is not None,
-        "total_records": matcher.total_records
+        "index": describe_index(matcher.index),
+        "total_records": matcher.total_records,
+        "result_cache": matcher.result_cache.stats(),
+        "executors": {
+            "match": match_executor.stats() if match_executor else None,
+            "ocr": ocr_executor.stats() if ocr_executor else None
+        },
+        "ocr_engine": ocr_engine,
+        "ocr_cache": ocr_cache.stats() if ocr_cache else None,
+        "micro_batching": match_batcher.stats() if match_batcher else None,
+        "batch_jobs": job_runner.stats() if job_runner else None
     }
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus metrics: per-stage latency, requests, cache, queues, index"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    if shared_metrics:
+        content = await asyncio.to_thread(shared_metrics.render)
+    else:
+        content = metrics.render()
+    return Response(content=content, media_type=METRICS_CONTENT_TYPE)
+
 @app.post("/api/ml/ocr", response_model=OCRResponse)
 async def ocr_extract(file: UploadFile = File(...)):
     try:
@@ -133,7 +576,7 @@ async def ocr_extract(file: UploadFile = File(...)):
         image_bytes = await file.read()
         
         # Extract text using OCR
-        raw_text, confidence = extract_text_from_image(image_bytes)
+        raw_text, confidence, details = await run_ocr(image_bytes)
         
         # Clean the extracted text
         clean_text = clean_address(raw_text)
@@ -141,9 +584,14 @@ async def ocr_extract(file: UploadFile = File(...)):
         return OCRResponse(
             raw_text=raw_text,
             clean_text=clean_text,
-            confidence=confidence
+            confidence=confidence,
+            tier=details["tier"],
+            tier_ms=details["tier_ms"],
+            region=details["region"]
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"OCR extraction failed: {str(e)}")
 
@@ -162,6 +610,33 @@ async def normalize_address(request: NormalizeRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Normalization failed: {str(e)}")
 
+@app.post("/api/ml/normalize_batch", response_model=dict)
+async def normalize_address_batch(request: NormalizeBatchRequest):
+    if len(request.texts) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.texts)} texts (max {MAX_BATCH_SIZE})"
+        )
+    
+    try:
+        start_time = time.time()
+        normalized, cleaned = await asyncio.to_thread(
+            lambda texts: ([normalize_text(text) for text in texts], clean_addresses(texts)),
+            request.texts
+        )
+        
+        return {
+            "results": [
+                {"original": text, "normalized": norm, "cleaned": clean}
+                for text, norm, clean in zip(request.texts, normalized, cleaned)
+            ],
+            "total": len(request.texts),
+            "processing_time_ms": round((time.time() - start_time) * 1000, 2)
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Normalization failed: {str(e)}")
+
 @app.post("/api/ml/match", response_model=MatchResponse)
 async def match_address(request: MatchRequest):
     if not matcher or not matcher.is_ready:
@@ -169,7 +644,7 @@ async def match_address(request: MatchRequest):
     
     try:
         # Perform matching
-        results = await matcher.match(
+        results = await match_one(
             query_text=request.text,
             top_k=request.top_k,
             include_digipin=request.include_digipin
@@ -177,9 +652,239 @@ async def match_address(request: MatchRequest):
         
         return results
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Matching failed: {str(e)}")
 
+@app.post("/api/ml/match_batch", response_model=BatchMatchResponse)
+async def match_address_batch(request: BatchMatchRequest):
+    """
+    Batch endpoint: Match many addresses in a single encode + search pass
+    
+    - **texts**: Address texts to match
+    - **top_k**: Number of matches to return per address
+    - Returns per-address results in input order
+    """
+    if not matcher or not matcher.is_ready:
+        raise HTTPException(status_code=503, detail="Matcher not initialized")
+    
+    if len(request.texts) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.texts)} texts (max {MAX_BATCH_SIZE})"
+        )
+    
+    try:
+        start_time = time.time()
+        
+        results = await run_blocking(
+            match_executor,
+            matcher.match_many_sync,
+            queries=request.texts,
+            top_k=request.top_k,
+            include_digipin=request.include_digipin,
+            timeout=BATCH_MATCH_TIMEOUT
+        )
+        
+        return {
+            "results": results,
+            "total": len(results),
+            "processing_time_ms": round((time.time() - start_time) * 1000, 2)
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch matching failed: {str(e)}")
+
+@app.post("/api/ml/match_stream")
+async def match_address_stream(
+    request: Request,
+    top_k: int = 5,
+    include_digipin: bool = True,
+    column: str = "address",
+    format: Optional[str] = None
+):
+    """
+    Streaming endpoint: Match a CSV or NDJSON body row by row
+    
+    - **body**: CSV with an address column, or NDJSON (objects with an
+      address field, or bare strings), streamed in any size
+    - **format**: `csv` or `ndjson` (defaults from Content-Type)
+    - Returns NDJSON: one line per input row as soon as its batch is
+      matched, then a final summary line
+    """
+    if not matcher or not matcher.is_ready:
+        raise HTTPException(status_code=503, detail="Matcher not initialized")
+    
+    content_type = request.headers.get("content-type", "")
+    if format is None:
+        format = "ndjson" if "json" in content_type else "csv"
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    
+    # Receive the upload first (spooled to disk past a few MB)
+    body = await spool_body(request.stream())
+    
+    parse = iter_ndjson_records if format == "ndjson" else iter_csv_records
+    records = parse(iter_lines(iter_spooled(body)), column=column.lower())
+    
+    return StreamingResponse(
+        stream_matches(records, top_k=top_k, include_digipin=include_digipin, body=body),
+        media_type="application/x-ndjson"
+    )
+
+async def stream_matches(records, top_k: int, include_digipin: bool, body=None):
+    """
+    Match streamed records in batches of STREAM_BATCH_SIZE and yield NDJSON
+    
+    Records are parsed lazily from the spooled body and results are written
+    batch by batch, so memory stays bounded regardless of the input size.
+    """
+    start_time = time.time()
+    counts = {"rows": 0, "matched": 0, "no_match": 0, "errors": 0}
+    batch = []
+    
+    async def flush():
+        texts = [text for _, text, error in batch if not error]
+        results, failure = [], None
+        if texts:
+            try:
+                results = await match_with_retry(texts, top_k, include_digipin)
+            except Exception as e:
+                failure = f"Matching failed: {str(e)}"
+        
+        # Emit in input order, invalid rows included
+        results = iter(results)
+        for row, text, error in batch:
+            if error or failure:
+                counts["errors"] += 1
+                yield ndjson_line({"row": row, "query": text, "error": error or failure})
+                continue
+            result = next(results)
+            counts["matched" if result["matches"] else "no_match"] += 1
+            yield ndjson_line({"row": row, **result})
+    
+    try:
+        async for row, text, error in records:
+            counts["rows"] += 1
+            batch.append((row, text, error))
+            if len(batch) >= STREAM_BATCH_SIZE:
+                async for line in flush():
+                    yield line
+                batch = []
+        
+        if batch:
+            async for line in flush():
+                yield line
+    
+    except Exception as e:
+        # Malformed body: report it in-band, the response has already started
+        yield ndjson_line({"error": f"Stream aborted: {str(e)}"})
+    
+    finally:
+        if body is not None:
+            body.close()
+    
+    yield ndjson_line({
+        "summary": {
+            **counts,
+            "processing_time_ms": round((time.time() - start_time) * 1000, 2)
+        }
+    })
+
+async def match_with_retry(texts: List[str], top_k: int, include_digipin: bool):
+    """Run one stream batch, waiting for queue space instead of failing with 503"""
+    deadline = time.time() + BATCH_MATCH_TIMEOUT
+    while True:
+        try:
+            return await match_executor.run(
+                matcher.match_many_sync,
+                texts,
+                top_k=top_k,
+                include_digipin=include_digipin,
+                timeout=BATCH_MATCH_TIMEOUT
+            )
+        except ExecutorSaturated:
+            if time.time() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+@app.post("/api/ml/jobs", status_code=202)
+async def create_match_job(request: BatchMatchRequest):
+    """
+    Job endpoint: Queue a batch for background matching
+    
+    - **texts**: Address texts to match
+    - Returns the job immediately; poll `GET /api/ml/jobs/{job_id}` for
+      progress and page through `GET /api/ml/jobs/{job_id}/results`
+    """
+    if not job_runner:
+        raise HTTPException(status_code=503, detail="Job queue not initialized")
+    
+    if not request.texts:
+        raise HTTPException(status_code=400, detail="No texts provided")
+    if len(request.texts) > MAX_JOB_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Job too large: {len(request.texts)} texts (max {MAX_JOB_SIZE})"
+        )
+    
+    try:
+        job = await asyncio.to_thread(
+            job_store.create_job,
+            request.texts,
+            top_k=request.top_k,
+            include_digipin=request.include_digipin
+        )
+        job_runner.notify()
+        return job
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create job: {str(e)}")
+
+@app.get("/api/ml/jobs/{job_id}")
+async def get_match_job(job_id: str):
+    """Job status and progress (processed / total)"""
+    job = await asyncio.to_thread(job_store.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/ml/jobs/{job_id}/results")
+async def get_match_job_results(job_id: str, offset: int = 0, limit: int = 100):
+    """
+    One page of a job's results in input order
+    
+    Available while the job runs; rows not matched yet have a null result.
+    """
+    job = await asyncio.to_thread(job_store.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if offset < 0 or not 1 <= limit <= 1000:
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit between 1 and 1000")
+    
+    results = await asyncio.to_thread(job_store.get_results, job_id, offset, limit)
+    next_offset = offset + len(results)
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "offset": offset,
+        "limit": limit,
+        "total": job["total"],
+        "results": results,
+        "next_offset": next_offset if next_offset < job["total"] else None
+    }
+
+@app.delete("/api/ml/jobs/{job_id}")
+async def cancel_match_job(job_id: str):
+    """Cancel a queued or running job; rows matched so far stay available"""
+    job = await asyncio.to_thread(job_store.cancel_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 @app.post("/api/ml/ocr_match")
 async def ocr_and_match(file: UploadFile = File(...), top_k: int = 5):
     """
@@ -195,11 +900,11 @@ async def ocr_and_match(file: UploadFile = File(...), top_k: int = 5):
     try:
         # Extract text from image
         image_bytes = await file.read()
-        raw_text, ocr_confidence = extract_text_from_image(image_bytes)
+        raw_text, ocr_confidence, ocr_details = await run_ocr(image_bytes)
         clean_text = clean_address(raw_text)
         
         # Match the extracted text
-        results = await matcher.match(
+        results = await match_one(
             query_text=clean_text,
             top_k=top_k,
             include_digipin=True
@@ -210,14 +915,28 @@ async def ocr_and_match(file: UploadFile = File(...), top_k: int = 5):
             "ocr": {
                 "raw_text": raw_text,
                 "clean_text": clean_text,
-                "confidence": ocr_confidence
+                "confidence": ocr_confidence,
+                "tier": ocr_details["tier"],
+                "tier_ms": ocr_details["tier_ms"],
+                "region": ocr_details["region"]
             },
             "matching": results
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"OCR+Match failed: {str(e)}")
 
 if __name__ == "__main__":
     print(f"🌐 Starting server on {HOST}:{PORT}")
-    uvicorn.run(app, host=HOST, port=PORT, log_level="info")
+    if WORKERS > 1:
+        # Split cores between workers so their model threads don't oversubscribe
+        os.environ.setdefault("OMP_NUM_THREADS", str(max(1, (os.cpu_count() or 1) // WORKERS)))
+        print(f"👷 Running {WORKERS} worker processes sharing the memory-mapped index")
+        if METRICS_ENABLED:
+            # Counters restart from zero with the service
+            MultiProcessMetrics.clear(METRICS_DIR)
+        uvicorn.run("main:app", host=HOST, port=PORT, workers=WORKERS, log_level="info")
+    else:
+        uvicorn.run(app, host=HOST, port=PORT, log_level="info")
@@ -6,6 +6,7 @@ Clear or check the status of the ML service cache
 
 import os
 import sys
+import json
 import shutil
 from pathlib import Path
 
@@ -37,7 +38,7 @@ def check_cache():
         return
     
     faiss_index = CACHE_DIR / "faiss.index"
-    metadata = CACHE_DIR / "metadata.pkl"
+    metadata = CACHE_DIR / "metadata"
     embeddings = CACHE_DIR / "embeddings.npy"
     
     print("\n📊 Cache Status:")
@@ -50,13 +51,24 @@ def check_cache():
                        (metadata, "Metadata"), 
                        (embeddings, "Embeddings")]:
         if file.exists():
-            size = file.stat().st_size
+            size = get_cache_size(file) if file.is_dir() else file.stat().st_size
             total_size += size
             files_found.append(name)
             print(f"  {name}: ✅ ({format_size(size)})")
         else:
             print(f"  {name}: ❌ (not found)")
     
+    manifest_path = CACHE_DIR / "manifest.json"
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        print("\n🧾 Built from:")
+        print(f"  Dataset SHA-256: {manifest['dataset']['sha256'][:16]}…")
+        print(f"  Model: {manifest['model']['name']} (revision: {manifest['model']['revision'] or 'default'})")
+        print(f"  Normalizer version: {manifest['normalizer_version']}")
+        print(f"  Index: {manifest['index']}")
+    elif files_found:
+        print("\n⚠️  No manifest found - cache will be rebuilt on next startup")
+    
     if files_found:
         print(f"\n📦 Total cache size: {format_size(total_size)}")
         print(f"✅ Cache is ready ({len(files_found)} file(s) found)")
@@ -0,0 +1,112 @@
+"""
+Atomic replacement of cache directories
+
+A cache directory such as cache/metadata is a symlink to a versioned
+sibling (metadata.<version>). A save writes a new version and repoints the
+symlink with os.replace, which is atomic: readers always find a complete
+directory, and concurrent savers never delete the directory another one
+is about to publish. Publishes of the same path are serialized with a
+lock file next to it, which readers share while opening a version. The
+replaced version is removed one publish later; workers that still have it
+memory-mapped keep their pages.
+"""
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-worker only
+    fcntl = None
+
+
+def new_version(path: str) -> str:
+    """
+    Create an empty versioned directory next to path
+
+    Args:
+        path: Published directory path (the symlink)
+
+    Returns:
+        Path of the new version, to be filled and then published
+    """
+    version_path = f"{path}.{uuid.uuid4().hex[:12]}"
+    os.makedirs(version_path)
+    return version_path
+
+
+def publish(path: str, version_path: str):
+    """
+    Point path at version_path
+
+    The version it replaces is kept (behind path.previous) until the next
+    publish, so a reader that resolved path just before the swap can still
+    open it. A plain directory left at path by an older release is moved
+    aside first; that one-time migration is the only non-atomic step.
+    """
+    with _lock(path):
+        previous = None
+        if os.path.islink(path):
+            previous = os.path.realpath(path)
+        elif os.path.isdir(path):
+            previous = f"{path}.{uuid.uuid4().hex[:12]}"
+            os.rename(path, previous)
+
+        # Relative targets, so the cache directory can be moved or mounted elsewhere
+        _point(path, version_path)
+
+        if previous:
+            previous_link = f"{path}.previous"
+            stale = os.path.realpath(previous_link) if os.path.islink(previous_link) else None
+            _point(previous_link, previous)
+            if stale and stale != previous:
+                shutil.rmtree(stale, ignore_errors=True)
+
+
+@contextmanager
+def read(path: str):
+    """
+    Resolve path to its current version for opening
+
+    Readers open every file through the yielded version path, so a
+    concurrent publish cannot mix files from two versions, and hold a
+    shared lock meanwhile, so that version is not removed under them.
+    Memory-mapped files stay readable after the lock is released.
+    """
+    with _lock(path, exclusive=False):
+        yield os.path.realpath(path)
+
+
+def remove(path: str):
+    """Remove a published directory and the versions it points to"""
+    with _lock(path):
+        for link in (path, f"{path}.previous"):
+            if os.path.islink(link):
+                target = os.path.realpath(link)
+                os.remove(link)
+                shutil.rmtree(target, ignore_errors=True)
+            elif os.path.isdir(link):
+                shutil.rmtree(link)
+
+
+def _point(link: str, target: str):
+    """Atomically create or repoint a symlink"""
+    link_tmp = f"{link}.{uuid.uuid4().hex[:12]}.link"
+    os.symlink(os.path.basename(target), link_tmp)
+    os.replace(link_tmp, link)
+
+
+@contextmanager
+def _lock(path: str, exclusive: bool = True):
+    """Hold the lock on path: exclusive to publish, shared to read"""
+    if fcntl is None:
+        yield
+        return
+
+    with open(f"{path}.lock", 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,172 @@
+"""
+Cache manifest: fingerprint of everything the FAISS/metadata cache depends on
+
+The cache is only reused when the manifest stored next to it matches the
+fingerprint of the current dataset, model, normalizer and index settings.
+"""
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-worker only
+    fcntl = None
+
+# Bump when the layout of cached artifacts changes
+CACHE_VERSION = 2
+
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = ".build.lock"
+
+# Index parameters that change the built index (query-time parameters such
+# as nprobe / ef_search are applied on load and do not invalidate the cache)
+BUILD_INDEX_PARAMS = {
+    'flat': [],
+    'ivf': ['nlist'],
+    'hnsw': ['hnsw_m', 'ef_construction'],
+    'ivfpq': ['nlist', 'pq_m', 'pq_nbits'],
+}
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """Compute the SHA-256 of a file without loading it into memory"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dataset_fingerprint(csv_path: str, stored: Optional[Dict] = None) -> Dict:
+    """
+    Fingerprint the dataset file
+
+    Hashing a large CSV dominates a warm start, so the hash recorded in a
+    stored manifest is reused when the file's size and modification time
+    are unchanged.
+    """
+    stat = os.stat(csv_path)
+    known = (stored or {}).get('dataset') or {}
+    if known.get('size') == stat.st_size and known.get('mtime_ns') == stat.st_mtime_ns and known.get('sha256'):
+        sha256 = known['sha256']
+    else:
+        sha256 = file_sha256(csv_path)
+    return {'sha256': sha256, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def build_manifest(
+    csv_path: str,
+    model_name: str,
+    model_revision: Optional[str],
+    normalizer_version: int,
+    metadata_format: int,
+    index_type: str,
+    index_params: Dict,
+    embedding_backend: str = 'torch',
+    quantization: Optional[str] = None,
+    stored: Optional[Dict] = None
+) -> Dict:
+    """
+    Build the fingerprint of the current configuration
+
+    Args:
+        csv_path: PIN code directory CSV
+        model_name: Sentence transformer model name
+        model_revision: Model revision (branch, tag or commit), if pinned
+        normalizer_version: Text normalizer version
+        metadata_format: Metadata store format version
+        index_type: FAISS index type
+        index_params: FAISS index parameters
+        embedding_backend: Embedding inference backend (torch, onnx, onnx-int8)
+        quantization: Quantization preset, for quantized backends
+        stored: Manifest of the existing cache, to skip rehashing an
+                unchanged dataset
+
+    Returns:
+        Manifest dictionary
+    """
+    return {
+        'cache_version': CACHE_VERSION,
+        'dataset': dataset_fingerprint(csv_path, stored),
+        'model': {
+            'name': model_name,
+            'revision': model_revision,
+            'backend': embedding_backend,
+            'quantization': quantization,
+        },
+        'normalizer_version': normalizer_version,
+        'metadata_format': metadata_format,
+        'index': {
+            'type': index_type,
+            **{k: index_params[k] for k in BUILD_INDEX_PARAMS.get(index_type, [])},
+        },
+    }
+
+
+def read_manifest(cache_dir: str) -> Optional[Dict]:
+    """Read the manifest stored in a cache directory, if any"""
+    path = os.path.join(cache_dir, MANIFEST_FILE)
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(cache_dir: str, manifest: Dict):
+    """Atomically write the manifest into a cache directory"""
+    path = os.path.join(cache_dir, MANIFEST_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def remove_manifest(cache_dir: str):
+    """Delete the manifest, marking the cache as invalid"""
+    path = os.path.join(cache_dir, MANIFEST_FILE)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def manifest_mismatches(expected: Dict, stored: Optional[Dict]) -> List[str]:
+    """
+    List the top-level manifest fields that differ
+
+    Returns:
+        Names of mismatching fields (empty when the cache is valid)
+    """
+    if stored is None:
+        return ['missing manifest']
+    return [key for key in expected if _comparable(key, stored.get(key)) != _comparable(key, expected[key])]
+
+
+def _comparable(key: str, value):
+    """Drop fields that do not affect the cache (a touched but identical CSV)"""
+    if key == 'dataset' and isinstance(value, dict):
+        return {k: v for k, v in value.items() if k != 'mtime_ns'}
+    return value
+
+
+@contextmanager
+def cache_lock(cache_dir: str):
+    """
+    Hold an exclusive lock on a cache directory
+
+    Worker processes starting together take this lock before checking the
+    cache, so exactly one of them builds it while the others wait and then
+    load the finished files.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with open(os.path.join(cache_dir, LOCK_FILE), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,81 @@
+"""
+Sentence embedding backends for the address matcher
+
+- torch:     PyTorch SentenceTransformer (default)
+- onnx:      the same model exported to ONNX and run with ONNX Runtime
+- onnx-int8: ONNX export with int8 dynamic-quantized weights
+
+All backends return a SentenceTransformer, so callers keep using
+`model.encode(...)`; tokenization, mean pooling and normalization are
+identical across backends. ONNX backends need `optimum[onnxruntime]`.
+"""
+import os
+import re
+from typing import Optional
+
+from sentence_transformers import SentenceTransformer
+
+EMBEDDING_BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+# ONNX Runtime quantization presets (see sentence_transformers
+# export_dynamic_quantized_onnx_model): arm64, avx2, avx512, avx512_vnni
+DEFAULT_QUANTIZATION = 'avx2'
+
+
+def load_embedder(
+    model_name: str,
+    backend: str = 'torch',
+    revision: Optional[str] = None,
+    export_dir: str = "./cache/onnx",
+    quantization: str = DEFAULT_QUANTIZATION
+) -> SentenceTransformer:
+    """
+    Load the embedding model with the requested inference backend
+
+    ONNX exports are written once under export_dir and reused on later
+    starts, so only the first start pays for the export.
+
+    Args:
+        model_name: Sentence transformer model name
+        backend: One of EMBEDDING_BACKENDS
+        revision: Model revision (branch, tag or commit), if pinned
+        export_dir: Directory holding ONNX exports
+        quantization: Quantization preset for onnx-int8
+
+    Returns:
+        SentenceTransformer running on the selected backend
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {EMBEDDING_BACKENDS}")
+
+    if backend == 'torch':
+        return SentenceTransformer(model_name, revision=revision)
+
+    path = os.path.join(export_dir, _export_name(model_name, revision))
+    if not os.path.exists(os.path.join(path, 'onnx', 'model.onnx')):
+        print(f"📦 Exporting {model_name} to ONNX...")
+        model = SentenceTransformer(model_name, revision=revision, backend='onnx')
+        model.save_pretrained(path)
+
+    if backend == 'onnx':
+        return SentenceTransformer(path, backend='onnx')
+
+    file_name = f"model_qint8_{quantization}.onnx"
+    if not os.path.exists(os.path.join(path, 'onnx', file_name)):
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+
+        print(f"📦 Quantizing ONNX model to int8 ({quantization})...")
+        model = SentenceTransformer(path, backend='onnx')
+        export_dynamic_quantized_onnx_model(model, quantization, path)
+
+    return SentenceTransformer(
+        path,
+        backend='onnx',
+        model_kwargs={'file_name': os.path.join('onnx', file_name)}
+    )
+
+
+def _export_name(model_name: str, revision: Optional[str]) -> str:
+    """Filesystem-safe directory name for an exported model"""
+    name = re.sub(r'[^A-Za-z0-9._-]+', '--', model_name)
+    return f"{name}@{revision}" if revision else name
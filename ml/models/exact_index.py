@@ -0,0 +1,167 @@
+"""
+Sorted-key indexes from PIN code and office name to metadata rows
+"""
+import json
+import os
+from typing import Iterable, List
+import numpy as np
+
+from models import atomic_dir
+
+FORMAT_VERSION = 1
+PARAMS_FILE = "params.json"
+
+ARRAYS = ('pin_keys', 'pin_indptr', 'pin_row_ids', 'name_keys', 'name_indptr', 'name_row_ids')
+
+# Office-type suffixes dropped from normalized office names, so that
+# "Kothimir B.O" is found from "kothimir", "kothimir bo" or "kothimir b o"
+OFFICE_SUFFIXES = [
+    ('g', 'p', 'o'), ('b', 'o'), ('s', 'o'), ('h', 'o'),
+    ('gpo',), ('bo',), ('so',), ('ho',),
+]
+
+
+class ExactIndex:
+    """
+    Key lookups for the exact-match fast path
+
+    Each index is a sorted key array plus CSR arrays, like the BM25 index:
+    - pin_keys / name_keys: distinct PIN codes / office names without
+      their type suffix, sorted (looked up with binary search)
+    - *_indptr:  start of each key's rows in *_row_ids
+    - *_row_ids: metadata rows of each key, in row order
+
+    The arrays are built once with the cache and memory-mapped on load,
+    so worker processes share them instead of each building dictionaries.
+    """
+
+    def __init__(self, arrays: dict, max_name_tokens: int):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.max_name_tokens = max_name_tokens
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, pincodes: Iterable[str], office_names: Iterable[str]) -> "ExactIndex":
+        """
+        Build both indexes with one entry per record (row = position)
+
+        Args:
+            pincodes: PIN code of each record
+            office_names: Normalized office name of each record
+
+        Returns:
+            Populated ExactIndex
+        """
+        names = [base_office_name(name) for name in office_names]
+        pin_keys, pin_indptr, pin_row_ids = _group_rows([str(pin) for pin in pincodes])
+        name_keys, name_indptr, name_row_ids = _group_rows(names)
+        return cls({
+            'pin_keys': pin_keys,
+            'pin_indptr': pin_indptr,
+            'pin_row_ids': pin_row_ids,
+            'name_keys': name_keys,
+            'name_indptr': name_indptr,
+            'name_row_ids': name_row_ids,
+        }, max((len(name.split()) for name in names), default=0))
+
+    @classmethod
+    def open(cls, path: str, mmap: bool = True) -> "ExactIndex":
+        """Open an index previously written with save()"""
+        with atomic_dir.read(path) as version_path:
+            with open(os.path.join(version_path, PARAMS_FILE)) as f:
+                params = json.load(f)
+
+            if params.get('format_version') != FORMAT_VERSION:
+                raise ValueError(f"Unsupported exact index format: {params.get('format_version')}")
+
+            mmap_mode = 'r' if mmap else None
+            arrays = {
+                name: np.load(os.path.join(version_path, f"{name}.npy"), mmap_mode=mmap_mode)
+                for name in ARRAYS
+            }
+        return cls(arrays, params['max_name_tokens'])
+
+    def save(self, path: str):
+        """Write the index to a directory, replacing any previous index"""
+        version_path = atomic_dir.new_version(path)
+
+        for name in ARRAYS:
+            np.save(os.path.join(version_path, f"{name}.npy"), np.asarray(getattr(self, name)))
+        with open(os.path.join(version_path, PARAMS_FILE), 'w') as f:
+            json.dump({
+                'format_version': FORMAT_VERSION,
+                'max_name_tokens': self.max_name_tokens,
+            }, f, indent=2)
+
+        atomic_dir.publish(path, version_path)
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """Check whether a saved index exists at path"""
+        return os.path.exists(os.path.join(path, PARAMS_FILE))
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.pin_keys)
+
+    def pin_rows(self, pincode: str) -> np.ndarray:
+        """Rows of the offices in a PIN code (empty if unknown)"""
+        return _lookup(self.pin_keys, self.pin_indptr, self.pin_row_ids, pincode)
+
+    def named_rows(self, tokens: List[str], pincode: str) -> np.ndarray:
+        """
+        Rows of offices in a PIN whose name appears in the query tokens
+
+        Every run of up to `max_name_tokens` consecutive tokens is looked
+        up in the name index; longer names are returned first.
+        """
+        in_pin = self.pin_rows(pincode)
+        if not len(in_pin):
+            return in_pin
+
+        hits = []
+        for length in range(min(self.max_name_tokens, len(tokens)), 0, -1):
+            for start in range(len(tokens) - length + 1):
+                name = ' '.join(tokens[start:start + length])
+                rows = _lookup(self.name_keys, self.name_indptr, self.name_row_ids, name)
+                if len(rows):
+                    hits.append(rows[np.isin(rows, in_pin)])
+
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        rows = np.concatenate(hits)
+        _, first = np.unique(rows, return_index=True)
+        return rows[np.sort(first)]
+
+
+def base_office_name(name: str) -> str:
+    """Strip a trailing office-type suffix from a normalized office name"""
+    tokens = str(name).split()
+    for suffix in OFFICE_SUFFIXES:
+        if len(tokens) > len(suffix) and tuple(tokens[-len(suffix):]) == suffix:
+            return ' '.join(tokens[:-len(suffix)])
+    return ' '.join(tokens)
+
+
+def _group_rows(values: List[str]):
+    """Sorted distinct values with CSR offsets into their rows, in row order"""
+    values = np.asarray(values, dtype=str)
+    order = np.argsort(values, kind='stable')
+    keys, starts = np.unique(values[order], return_index=True)
+    indptr = np.append(starts, len(values)).astype(np.int64)
+    return keys, indptr, order.astype(np.int64)
+
+
+def _lookup(keys: np.ndarray, indptr: np.ndarray, rows: np.ndarray, key: str) -> np.ndarray:
+    """Rows stored under key (empty if absent)"""
+    pos = int(np.searchsorted(keys, key))
+    if pos == len(keys) or keys[pos] != key:
+        return np.empty(0, dtype=np.int64)
+    return np.asarray(rows[indptr[pos]:indptr[pos + 1]])
@@ -0,0 +1,198 @@
+"""
+FAISS index construction for the address matcher
+
+Supported index types (all use inner product on L2-normalized vectors,
+i.e. cosine similarity):
+- flat:  exact brute-force scan (IndexFlatIP)
+- ivf:   inverted file with flat storage, tuned by `nlist` / `nprobe`
+- hnsw:  HNSW graph, tuned by `hnsw_m` / `ef_construction` / `ef_search`
+- ivfpq: inverted file with product-quantized storage, tuned by
+         `nlist` / `nprobe` / `pq_m` / `pq_nbits`
+"""
+from typing import Dict, Optional
+import numpy as np
+import faiss
+
+INDEX_TYPES = ('flat', 'ivf', 'hnsw', 'ivfpq')
+
+DEFAULT_INDEX_PARAMS = {
+    'nlist': 1024,
+    'nprobe': 16,
+    'hnsw_m': 32,
+    'ef_construction': 80,
+    'ef_search': 64,
+    'pq_m': 16,
+    'pq_nbits': 8,
+}
+
+# FAISS warns when training with fewer than ~39 points per centroid
+MIN_POINTS_PER_CENTROID = 39
+
+# Cap on training vectors for IVF quantizers
+MAX_TRAINING_POINTS = 100000
+
+
+def resolve_index_params(params: Optional[Dict] = None) -> Dict:
+    """Merge user-supplied index parameters over the defaults"""
+    resolved = dict(DEFAULT_INDEX_PARAMS)
+    if params:
+        resolved.update({k: v for k, v in params.items() if v is not None})
+    return resolved
+
+
+def build_index(
+    embeddings: np.ndarray,
+    index_type: str = 'flat',
+    params: Optional[Dict] = None,
+    ids: Optional[np.ndarray] = None
+) -> faiss.Index:
+    """
+    Build and populate a FAISS index
+
+    Args:
+        embeddings: L2-normalized float32 embeddings, one row per record
+        index_type: One of INDEX_TYPES
+        params: Index parameters (see DEFAULT_INDEX_PARAMS)
+        ids: Optional int64 record ids; when given, searches return these
+             ids instead of row positions and vectors can later be removed
+             or replaced by id
+
+    Returns:
+        Populated FAISS index with search parameters applied
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+
+    params = resolve_index_params(params)
+    embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+    num_vectors, dimension = embeddings.shape
+
+    if index_type == 'flat':
+        index = faiss.IndexFlatIP(dimension)
+
+    elif index_type == 'hnsw':
+        index = faiss.IndexHNSWFlat(dimension, params['hnsw_m'], faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = params['ef_construction']
+
+    else:
+        nlist = _effective_nlist(params['nlist'], num_vectors)
+        quantizer = faiss.IndexFlatIP(dimension)
+        if index_type == 'ivf':
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+        else:
+            if dimension % params['pq_m'] != 0:
+                raise ValueError(f"pq_m={params['pq_m']} must divide embedding dimension {dimension}")
+            index = faiss.IndexIVFPQ(
+                quantizer, dimension, nlist, params['pq_m'], params['pq_nbits'],
+                faiss.METRIC_INNER_PRODUCT
+            )
+        index.train(_training_sample(embeddings))
+
+    if ids is not None:
+        if not isinstance(index, faiss.IndexIVF):
+            index = faiss.IndexIDMap2(index)
+        index.add_with_ids(embeddings, np.ascontiguousarray(ids, dtype='int64'))
+    else:
+        index.add(embeddings)
+
+    configure_search(index, params)
+    return index
+
+
+def read_index(path: str, index_type: str = 'flat', mmap: bool = False) -> faiss.Index:
+    """
+    Read an index written with faiss.write_index
+
+    With mmap=True the vector storage is memory-mapped read-only instead of
+    copied into RAM, so several worker processes serving the same cache
+    share its pages through the OS page cache. IVF inverted lists are mapped
+    with IO_FLAG_MMAP; flat and HNSW storage need IO_FLAG_MMAP_IFC
+    (faiss >= 1.11) and are read into RAM on older versions.
+
+    Args:
+        path: Index file
+        index_type: INDEX_TYPES name the index was built with
+        mmap: Memory-map the index instead of loading it
+
+    Returns:
+        FAISS index (read-only when memory-mapped)
+    """
+    if not mmap:
+        return faiss.read_index(path)
+
+    if index_type in ('ivf', 'ivfpq'):
+        flags = faiss.IO_FLAG_MMAP
+    else:
+        flags = getattr(faiss, 'IO_FLAG_MMAP_IFC', 0)
+    return faiss.read_index(path, flags | faiss.IO_FLAG_READ_ONLY)
+
+
+def supports_removal(index: faiss.Index) -> bool:
+    """Check whether vectors can be removed from an index by id"""
+    return index_type_of(index) != 'hnsw'
+
+
+def configure_search(index: faiss.Index, params: Optional[Dict] = None):
+    """
+    Apply query-time parameters (nprobe / efSearch) to an index
+
+    These do not affect the stored index, so they can be changed on a
+    cached index without rebuilding it.
+    """
+    params = resolve_index_params(params)
+    base = _unwrap(index)
+
+    if isinstance(base, faiss.IndexIVF):
+        base.nprobe = min(params['nprobe'], base.nlist)
+    elif isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efSearch = params['ef_search']
+
+
+def index_type_of(index: faiss.Index) -> str:
+    """Return the INDEX_TYPES name of a FAISS index"""
+    base = _unwrap(index)
+    if isinstance(base, faiss.IndexIVFPQ):
+        return 'ivfpq'
+    if isinstance(base, faiss.IndexIVF):
+        return 'ivf'
+    if isinstance(base, faiss.IndexHNSW):
+        return 'hnsw'
+    return 'flat'
+
+
+def describe_index(index: faiss.Index) -> Dict:
+    """Summarize an index for health reporting"""
+    base = _unwrap(index)
+    info = {
+        'type': index_type_of(index),
+        'vectors': int(index.ntotal),
+        'dimension': int(index.d),
+    }
+    if isinstance(base, faiss.IndexIVF):
+        info['nlist'] = int(base.nlist)
+        info['nprobe'] = int(base.nprobe)
+    elif isinstance(base, faiss.IndexHNSW):
+        info['ef_search'] = int(base.hnsw.efSearch)
+    return info
+
+
+def _unwrap(index: faiss.Index) -> faiss.Index:
+    """Downcast an index to its concrete FAISS class, skipping id maps"""
+    index = faiss.downcast_index(index)
+    while isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        index = faiss.downcast_index(index.index)
+    return index
+
+
+def _effective_nlist(nlist: int, num_vectors: int) -> int:
+    """Shrink nlist so every centroid gets enough training points"""
+    return max(1, min(nlist, num_vectors // MIN_POINTS_PER_CENTROID))
+
+
+def _training_sample(embeddings: np.ndarray) -> np.ndarray:
+    """Pick a random subset of vectors to train IVF quantizers on"""
+    if len(embeddings) <= MAX_TRAINING_POINTS:
+        return embeddings
+    rng = np.random.default_rng(0)
+    rows = rng.choice(len(embeddings), MAX_TRAINING_POINTS, replace=False)
+    return embeddings[np.sort(rows)]
@@ -0,0 +1,214 @@
+"""
+BM25 inverted index over the normalized record search text
+"""
+import json
+import os
+from collections import Counter
+from typing import Iterable, List, Tuple
+import numpy as np
+
+from models import atomic_dir
+
+FORMAT_VERSION = 1
+PARAMS_FILE = "params.json"
+
+# Standard BM25 parameters: term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+ARRAYS = ('terms', 'idf', 'indptr', 'postings', 'weights')
+
+
+class BM25Index:
+    """
+    Inverted BM25 index stored as flat NumPy arrays
+
+    - terms:    sorted vocabulary (looked up with binary search)
+    - idf:      inverse document frequency per term
+    - indptr:   start of each term's posting list (CSR layout)
+    - postings: metadata row of each posting, sorted within a term
+    - weights:  precomputed BM25 term weight of each posting
+
+    A query score is the sum of the weights of its terms' postings, so
+    scoring never touches the document text. Indexes opened from disk are
+    memory-mapped like the metadata store.
+    """
+
+    def __init__(self, arrays: dict, num_docs: int):
+        self.terms = arrays['terms']
+        self.idf = arrays['idf']
+        self.indptr = arrays['indptr']
+        self.postings = arrays['postings']
+        self.weights = arrays['weights']
+        self.num_docs = num_docs
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, texts: Iterable[str]) -> "BM25Index":
+        """
+        Build an index with one document per text (document id = position)
+
+        Args:
+            texts: Whitespace-tokenizable normalized texts
+
+        Returns:
+            Populated BM25Index
+        """
+        term_ids = {}
+        post_terms, post_docs, post_tfs = [], [], []
+        doc_lengths = []
+
+        for doc, text in enumerate(texts):
+            tokens = str(text).split()
+            doc_lengths.append(len(tokens))
+            for token, tf in Counter(tokens).items():
+                post_terms.append(term_ids.setdefault(token, len(term_ids)))
+                post_docs.append(doc)
+                post_tfs.append(tf)
+
+        num_docs = len(doc_lengths)
+        doc_lengths = np.asarray(doc_lengths, dtype=np.float64)
+        avg_length = doc_lengths.mean() if num_docs else 0.0
+
+        # Renumber terms in sorted order so lookups can binary-search
+        vocab = np.array(list(term_ids), dtype=str)
+        sort_order = np.argsort(vocab, kind='stable')
+        rank = np.empty(len(vocab), dtype=np.int64)
+        rank[sort_order] = np.arange(len(vocab))
+
+        post_terms = rank[np.asarray(post_terms, dtype=np.int64)]
+        post_docs = np.asarray(post_docs, dtype=np.int64)
+        post_tfs = np.asarray(post_tfs, dtype=np.float64)
+
+        order = np.lexsort((post_docs, post_terms))
+        post_terms, post_docs, post_tfs = post_terms[order], post_docs[order], post_tfs[order]
+
+        doc_freq = np.bincount(post_terms, minlength=len(vocab))
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(doc_freq, out=indptr[1:])
+
+        idf = np.log1p((num_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[post_docs] / max(avg_length, 1e-9))
+        weights = idf[post_terms] * post_tfs * (BM25_K1 + 1) / (post_tfs + length_norm)
+
+        return cls({
+            'terms': vocab[sort_order],
+            'idf': idf.astype(np.float32),
+            'indptr': indptr,
+            'postings': post_docs.astype(np.int32),
+            'weights': weights.astype(np.float32),
+        }, num_docs)
+
+    @classmethod
+    def open(cls, path: str, mmap: bool = True) -> "BM25Index":
+        """Open an index previously written with save()"""
+        with atomic_dir.read(path) as version_path:
+            with open(os.path.join(version_path, PARAMS_FILE)) as f:
+                params = json.load(f)
+
+            if params.get('format_version') != FORMAT_VERSION:
+                raise ValueError(f"Unsupported lexical index format: {params.get('format_version')}")
+
+            mmap_mode = 'r' if mmap else None
+            arrays = {
+                name: np.load(os.path.join(version_path, f"{name}.npy"), mmap_mode=mmap_mode)
+                for name in ARRAYS
+            }
+        return cls(arrays, params['num_docs'])
+
+    def save(self, path: str):
+        """Write the index to a directory, replacing any previous index"""
+        version_path = atomic_dir.new_version(path)
+
+        for name in ARRAYS:
+            np.save(os.path.join(version_path, f"{name}.npy"), np.asarray(getattr(self, name)))
+        with open(os.path.join(version_path, PARAMS_FILE), 'w') as f:
+            json.dump({
+                'format_version': FORMAT_VERSION,
+                'num_docs': self.num_docs,
+                'k1': BM25_K1,
+                'b': BM25_B,
+            }, f, indent=2)
+
+        atomic_dir.publish(path, version_path)
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """Check whether a saved index exists at path"""
+        return os.path.exists(os.path.join(path, PARAMS_FILE))
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def term_ids(self, tokens: List[str]) -> np.ndarray:
+        """Look up term ids for tokens (-1 for tokens not in the vocabulary)"""
+        if not tokens or not len(self.terms):
+            return np.full(len(tokens), -1, dtype=np.int64)
+        tokens = np.asarray(tokens, dtype=str)
+        pos = np.searchsorted(self.terms, tokens)
+        pos = np.minimum(pos, len(self.terms) - 1)
+        return np.where(self.terms[pos] == tokens, pos, -1).astype(np.int64)
+
+    def score(self, tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score every document containing at least one query token
+
+        Args:
+            tokens: Query tokens (duplicates are ignored)
+
+        Returns:
+            (rows, scores): matching document rows in ascending order and
+            their BM25 scores
+        """
+        ids = self.term_ids(sorted(set(tokens)))
+        ids = ids[ids >= 0]
+        if not len(ids):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        rows = np.concatenate([self.postings[self.indptr[t]:self.indptr[t + 1]] for t in ids])
+        weights = np.concatenate([self.weights[self.indptr[t]:self.indptr[t + 1]] for t in ids])
+        rows, inverse = np.unique(rows, return_inverse=True)
+        return rows.astype(np.int64), np.bincount(inverse, weights=weights).astype(np.float32)
+
+    def search(self, tokens: List[str], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the k best-scoring documents for a query
+
+        Returns:
+            (rows, scores) sorted by descending score (ties by row)
+        """
+        rows, scores = self.score(tokens)
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.lexsort((rows, -scores))
+        return rows[order], scores[order]
+
+    def coverage(self, tokens: List[str], rows: np.ndarray) -> np.ndarray:
+        """
+        IDF-weighted fraction of the query tokens each document contains
+
+        Tokens missing from the vocabulary count with the highest IDF, so
+        unknown words in the query lower the coverage of every document.
+
+        Returns:
+            Array of values between 0 and 1, one per row
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        ids = self.term_ids(sorted(set(tokens)))
+        if not len(ids):
+            return np.zeros(len(rows))
+
+        max_idf = float(self.idf.max()) if len(self.idf) else 1.0
+        total = sum(float(self.idf[t]) if t >= 0 else max_idf for t in ids)
+
+        covered = np.zeros(len(rows))
+        for t in ids[ids >= 0]:
+            docs = self.postings[self.indptr[t]:self.indptr[t + 1]]
+            pos = np.minimum(np.searchsorted(docs, rows), max(len(docs) - 1, 0))
+            covered += float(self.idf[t]) * (docs[pos] == rows)
+        return covered / total
@@ -1,64 +1,203 @@
 import os
 import time
+import asyncio
 import hashlib
+from concurrent.futures import Future, ThreadPoolExecutor
 import numpy as np
 import pandas as pd
 import faiss
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Optional, Tuple
-import requests
+from typing import Callable, List, Dict, Optional, Tuple
 
 from utils.text_processor import (
     normalize_text, 
-    clean_address, 
+    normalize_series,
+    clean_addresses, 
     extract_pincode,
-    highlight_matching_tokens
+    NORMALIZER_VERSION
 )
+from utils.digipin import encode_digipin, INVALID_DIGIPIN
+from utils.result_cache import ResultCache
+from utils.metrics import StageClock
+from models.metadata_store import MetadataStore, FORMAT_VERSION as METADATA_FORMAT_VERSION
+from models.cache_manifest import (
+    build_manifest,
+    read_manifest,
+    write_manifest,
+    remove_manifest,
+    manifest_mismatches,
+    cache_lock
+)
+from models.embedder import load_embedder, DEFAULT_QUANTIZATION
+from models.lexical_index import BM25Index
+from models import atomic_dir
+from models.exact_index import ExactIndex
+from models.index_factory import (
+    build_index,
+    configure_search,
+    read_index,
+    resolve_index_params,
+    supports_removal
+)
+
+
+# Columns persisted in the metadata store
+METADATA_COLUMNS = [
+    'officename', 'district', 'state', 'pincode', 'digipin', 'search_text_norm',
+    'officename_norm', 'district_norm', 'state_norm', 'record_key', 'record_id'
+]
+OPTIONAL_METADATA_COLUMNS = ['latitude', 'longitude', 'officetype']
+
+# Columns returned for each match
+RESULT_COLUMNS = [
+    'officename', 'district', 'state', 'pincode', 'digipin',
+    'search_text_norm', 'latitude', 'longitude', 'officetype'
+]
+
+# Record fields that are normalized once and matched against the query
+NORMALIZED_FIELDS = ['officename', 'district', 'state']
+
+# Retrieval modes: FAISS only, FAISS fused with BM25, or BM25 alone when
+# its top hit is decisive (falling back to hybrid otherwise)
+RETRIEVAL_MODES = ('semantic', 'hybrid', 'lexical_first')
+
+# Confidence boost when a normalized field appears in the query
+NAME_BOOSTS = [
+    ('officename', 0.15),
+    ('district', 0.1),
+    ('state', 0.05),
+]
 
 
 class AddressMatcher:
-    def __init__(self, csv_path: str, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", cache_dir: str = "./cache"):
+    def __init__(
+        self,
+        csv_path: str,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        cache_dir: str = "./cache",
+        result_cache_size: int = 10000,
+        result_cache_ttl: Optional[float] = 3600,
+        candidate_factor: int = 3,
+        index_type: str = "flat",
+        index_params: Optional[Dict] = None,
+        model_revision: Optional[str] = None,
+        incremental_updates: bool = True,
+        embedding_backend: str = "torch",
+        quantization: str = DEFAULT_QUANTIZATION,
+        mmap_index: bool = True,
+        retrieval_mode: str = "semantic",
+        lexical_weight: float = 0.3,
+        lexical_decisive_margin: float = 0.3,
+        exact_fast_path: bool = True
+    ):
         self.csv_path = csv_path
         self.model_name = model_name
+        self.model_revision = model_revision
         self.cache_dir = cache_dir
         self.model = None
         self.index = None
         self.df = None
-        self.metadata = None
+        self.metadata: Optional[MetadataStore] = None
+        self.candidate_factor = max(1, candidate_factor)
+        self.index_type = index_type
+        self.index_params = resolve_index_params(index_params)
+        self.incremental_updates = incremental_updates
+        self.embedding_backend = embedding_backend
+        self.quantization = quantization
+        self.mmap_index = mmap_index
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{retrieval_mode}', expected one of {RETRIEVAL_MODES}")
+        self.retrieval_mode = retrieval_mode
+        self.lexical_weight = min(1.0, max(0.0, lexical_weight))
+        self.lexical_decisive_margin = lexical_decisive_margin
+        self.lexical: Optional[BM25Index] = None
+        self.exact_fast_path = exact_fast_path
+        self.exact: Optional[ExactIndex] = None
+        self.row_embeddings = None
+        self.embeddings = None
+        self.id_to_row = None
+        self.manifest = None
         self.total_records = 0
         self.is_ready = False
+        # starting -> loading (-> building) -> ready, or failed
+        self.state = 'starting'
+        
+        # In-memory cache of match results, keyed on the cleaned query
+        self.result_cache = ResultCache(maxsize=result_cache_size, ttl=result_cache_ttl)
         
-        # DIGIPIN API configuration
-        self.digipin_api = os.getenv("DIGIPIN_API_URL", "http://localhost:5002")
+        # Called as stage_observer(stage, seconds) after each match pass
+        self.stage_observer: Optional[Callable[[str, float], None]] = None
         
         # Cache file paths
         os.makedirs(self.cache_dir, exist_ok=True)
         self.embeddings_path = os.path.join(self.cache_dir, "embeddings.npy")
         self.index_path = os.path.join(self.cache_dir, "faiss.index")
-        self.metadata_path = os.path.join(self.cache_dir, "metadata.pkl")
+        self.metadata_path = os.path.join(self.cache_dir, "metadata")
+        self.lexical_path = os.path.join(self.cache_dir, "lexical")
+        self.exact_path = os.path.join(self.cache_dir, "exact")
         
     async def initialize(self):
-        """Initialize matcher: load model and build/load index"""
-        print("📊 Loading dataset...")
-        await self._load_dataset()
+        """
+        Initialize matcher: load model and build/load index
         
+        The model and a valid cache load concurrently in worker threads, so
+        a restart costs roughly the slower of the two. The dataset CSV is
+        only parsed when the cache has to be built or updated.
+        """
+        self.state = 'loading'
         print("🤖 Loading sentence transformer model...")
-        await self._load_model()
-        
-        # Check if cached index exists
-        if self._cache_exists():
-            print("📦 Loading cached FAISS index and metadata...")
-            await self._load_from_cache()
-        else:
-            print("🔍 Building FAISS index from scratch...")
-            await self._build_index()
-            print("💾 Saving index to cache...")
-            await self._save_to_cache()
+        pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='matcher-init')
+        try:
+            model_future = pool.submit(self._load_model)
+            index_future = pool.submit(self._prepare_index, model_future)
+            await asyncio.wrap_future(model_future)
+            await asyncio.wrap_future(index_future)
+        except Exception:
+            self.state = 'failed'
+            raise
+        finally:
+            pool.shutdown(wait=False)
         
         self.is_ready = True
+        self.state = 'ready'
         print(f"✅ Matcher initialized with {self.total_records} records")
+    
+    def _prepare_index(self, model_future: Future):
+        """
+        Load the cached index, or build/update it once the model is loaded
+        
+        Args:
+            model_future: Pending model load; encoding waits for it
+        """
+        # Workers starting together take turns: the first builds the cache,
+        # the rest find it valid and only load it
+        built = False
+        with cache_lock(self.cache_dir):
+            # Reuse the cache only if it was built from the same inputs
+            if self._cache_is_valid():
+                print("📦 Loading cached FAISS index and metadata...")
+                self._load_from_cache()
+            else:
+                self.state = 'building'
+                print("📊 Loading dataset...")
+                self._load_dataset()
+                model_future.result()
+                
+                if self._can_update_incrementally():
+                    print("🔁 Dataset changed, updating FAISS index incrementally...")
+                    self._update_index()
+                else:
+                    print("🔍 Building FAISS index from scratch...")
+                    self._build_index()
+                print("💾 Saving index to cache...")
+                self._save_to_cache()
+                built = True
+        
+        # Swap the freshly built in-RAM index for the shared memory-mapped copy
+        if built and self.mmap_index and self._cache_is_valid():
+            self._load_from_cache()
+            self.df = None
         
-    async def _load_dataset(self):
+    def _load_dataset(self):
         """Load and preprocess the PIN code dataset"""
         try:
             # Load CSV
@@ -110,11 +249,16 @@ class AddressMatcher:
             )
             
             # Normalize search text
-            self.df['search_text_norm'] = self.df['search_text'].apply(normalize_text)
+            self.df['search_text_norm'] = normalize_series(self.df['search_text'])
+            
+            # Normalize name fields once for re-ranking
+            self._add_normalized_fields(self.df)
             
-            # Generate DIGIPIN (will be done lazily when needed, not during init)
-            # Set to N/A initially to avoid startup delays
-            self.df['digipin'] = 'N/A'
+            # Encode DIGIPIN for every office locally (vectorized, no API calls)
+            self.df['digipin'] = self._encode_digipins(self.df)
+            
+            # Stable key used to diff directory versions
+            self.df['record_key'] = self._record_keys(self.df)
             
             self.total_records = len(self.df)
             print(f"✅ Loaded {self.total_records} post office records")
@@ -145,142 +289,329 @@ class AddressMatcher:
         
         return mapping
     
-    def _generate_digipin(self, row) -> str:
-        """Generate DIGIPIN using the real DIGIPIN API"""
-        try:
-            # Use lat/long if available to call real DIGIPIN API
-            if pd.notna(row.get('latitude')) and pd.notna(row.get('longitude')):
-                try:
-                    # Call real DIGIPIN encode API
-                    response = requests.post(
-                        f"{self.digipin_api}/api/digipin/encode",
-                        json={
-                            "latitude": float(row['latitude']),
-                            "longitude": float(row['longitude'])
-                        },
-                        timeout=5
-                    )
-                    if response.status_code == 200:
-                        return response.json().get('digipin', 'N/A')
-                except Exception as e:
-                    print(f"⚠️  DIGIPIN API call failed: {e}")
-            
-            # Fallback: If DIGIPIN API is unavailable or no lat/long, return N/A
-            return "N/A"
-        except:
-            return "N/A"
+    def _add_normalized_fields(self, df: pd.DataFrame):
+        """Add normalized office/district/state columns used for re-ranking"""
+        for col in NORMALIZED_FIELDS:
+            df[f'{col}_norm'] = normalize_series(df[col].astype(str))
     
-    def _generate_digipin_for_coords(self, latitude: float, longitude: float) -> str:
-        """Generate DIGIPIN for specific coordinates using real DIGIPIN API"""
-        try:
-            response = requests.post(
-                f"{self.digipin_api}/api/digipin/encode",
-                json={
-                    "latitude": latitude,
-                    "longitude": longitude
-                },
-                timeout=2  # Short timeout to avoid hanging
-            )
-            if response.status_code == 200:
-                return response.json().get('digipin', 'N/A')
-        except Exception as e:
-            print(f"⚠️  DIGIPIN API call failed: {e}")
-        return "N/A"
+    def _record_keys(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Build a stable key per record from PIN code and normalized office name
+        
+        Duplicate office names within a PIN are disambiguated by occurrence.
+        """
+        keys = df['pincode'].astype(str) + '|' + df['officename_norm']
+        occurrence = keys.groupby(keys).cumcount()
+        return keys.where(occurrence == 0, keys + '#' + occurrence.astype(str))
     
-    async def _load_model(self):
+    def _encode_digipins(self, df: pd.DataFrame) -> np.ndarray:
+        """Encode DIGIPIN codes for all rows with coordinates"""
+        if 'latitude' not in df.columns or 'longitude' not in df.columns:
+            return np.full(len(df), INVALID_DIGIPIN)
+        
+        return encode_digipin(
+            df['latitude'].to_numpy(dtype=np.float64),
+            df['longitude'].to_numpy(dtype=np.float64)
+        )
+    
+    def _load_model(self):
         """Load sentence transformer model"""
         try:
-            self.model = SentenceTransformer(self.model_name)
-            print(f"✅ Model loaded: {self.model_name}")
+            self.model = load_embedder(
+                self.model_name,
+                backend=self.embedding_backend,
+                revision=self.model_revision,
+                export_dir=os.path.join(self.cache_dir, "onnx"),
+                quantization=self.quantization
+            )
+            print(f"✅ Model loaded: {self.model_name} ({self.embedding_backend})")
         except Exception as e:
             raise Exception(f"Failed to load model: {str(e)}")
     
-    async def _build_index(self):
+    def _encode_records(self, texts: List[str]) -> np.ndarray:
+        """Encode record texts into L2-normalized float32 embeddings"""
+        embeddings = self.model.encode(
+            texts,
+            batch_size=128,
+            show_progress_bar=True,
+            convert_to_numpy=True
+        ).astype('float32')
+        
+        # Normalize embeddings for cosine similarity
+        faiss.normalize_L2(embeddings)
+        return embeddings
+    
+    def _build_index(self):
         """Build FAISS index from embeddings"""
         try:
             # Generate embeddings for all records
             print(f"Encoding {len(self.df)} records...")
-            texts = self.df['search_text_norm'].tolist()
+            embeddings = self._encode_records(self.df['search_text_norm'].tolist())
             
-            embeddings = self.model.encode(
-                texts,
-                batch_size=128,
-                show_progress_bar=True,
-                convert_to_numpy=True
-            )
+            # Record ids are FAISS ids; they stay stable across incremental updates
+            self.df['record_id'] = np.arange(len(self.df), dtype=np.int64)
             
-            # Normalize embeddings for cosine similarity
-            faiss.normalize_L2(embeddings)
-            
-            # Create FAISS index
+            # Create FAISS index (inner product = cosine similarity)
             dimension = embeddings.shape[1]
-            self.index = faiss.IndexFlatIP(dimension)  # Inner product = cosine similarity
-            self.index.add(embeddings.astype('float32'))
-            
-            # Store metadata separately
-            self.metadata = self.df[[
-                'officename', 'district', 'state', 'pincode', 
-                'digipin', 'search_text'
-            ]].copy()
+            self.index = build_index(
+                embeddings, self.index_type, self.index_params,
+                ids=self.df['record_id'].to_numpy()
+            )
+            self.embeddings = embeddings
             
-            # Add lat/long if available
-            if 'latitude' in self.df.columns:
-                self.metadata['latitude'] = self.df['latitude']
-            if 'longitude' in self.df.columns:
-                self.metadata['longitude'] = self.df['longitude']
-            if 'officetype' in self.df.columns:
-                self.metadata['officetype'] = self.df['officetype']
+            self._set_metadata(self.df)
             
-            print(f"✅ FAISS index built with dimension {dimension}")
+            print(f"✅ FAISS {self.index_type} index built with dimension {dimension}")
             
         except Exception as e:
             raise Exception(f"Failed to build index: {str(e)}")
     
-    def _cache_exists(self) -> bool:
-        """Check if cache files exist"""
-        return (
-            os.path.exists(self.embeddings_path) and
+    def _can_update_incrementally(self) -> bool:
+        """Check whether only the dataset changed since the cache was built"""
+        if not self.incremental_updates:
+            return False
+        if not (
             os.path.exists(self.index_path) and
-            os.path.exists(self.metadata_path)
+            os.path.exists(self.embeddings_path) and
+            MetadataStore.exists(self.metadata_path)
+        ):
+            return False
+        
+        mismatches = manifest_mismatches(self._current_manifest(), read_manifest(self.cache_dir))
+        return mismatches == ['dataset']
+    
+    def _update_index(self):
+        """
+        Update the cached index for a new version of the dataset
+        
+        Records are matched to the cached ones by record key. Unchanged
+        records reuse their stored embedding, changed and added records are
+        re-encoded, and retired records are removed from the index by id.
+        """
+        try:
+            old_metadata = MetadataStore.open(self.metadata_path, mmap=False)
+            old_embeddings = np.load(self.embeddings_path)
+            self.index = faiss.read_index(self.index_path)
+            
+            old_keys = old_metadata.column('record_key')
+            old_texts = old_metadata.column('search_text_norm')
+            old_ids = old_metadata.column('record_id').astype(np.int64)
+            old_rows = {key: row for row, key in enumerate(old_keys)}
+            
+            new_keys = self.df['record_key'].tolist()
+            new_texts = self.df['search_text_norm'].tolist()
+            new_ids = np.empty(len(new_keys), dtype=np.int64)
+            source_rows = np.full(len(new_keys), -1, dtype=np.int64)
+            
+            next_id = int(old_ids.max()) + 1 if len(old_ids) else 0
+            changed, added = [], []
+            for row, (key, text) in enumerate(zip(new_keys, new_texts)):
+                old_row = old_rows.pop(key, None)
+                if old_row is None:
+                    new_ids[row] = next_id
+                    next_id += 1
+                    added.append(row)
+                    continue
+                
+                new_ids[row] = old_ids[old_row]
+                if old_texts[old_row] == text:
+                    source_rows[row] = old_row
+                else:
+                    changed.append(row)
+            
+            retired_ids = old_ids[list(old_rows.values())]
+            reencode = changed + added
+            print(
+                f"📝 {len(added)} added, {len(changed)} changed, "
+                f"{len(retired_ids)} retired, {len(new_keys) - len(reencode)} unchanged"
+            )
+            
+            # Reuse stored vectors, re-encode only new text
+            embeddings = np.empty((len(new_keys), old_embeddings.shape[1]), dtype='float32')
+            reused = source_rows >= 0
+            embeddings[reused] = old_embeddings[source_rows[reused]]
+            if reencode:
+                embeddings[reencode] = self._encode_records([new_texts[row] for row in reencode])
+            
+            if supports_removal(self.index):
+                stale_ids = np.concatenate([retired_ids, new_ids[changed]]).astype(np.int64)
+                if len(stale_ids):
+                    self.index.remove_ids(stale_ids)
+                if reencode:
+                    self.index.add_with_ids(embeddings[reencode], new_ids[reencode])
+                configure_search(self.index, self.index_params)
+            else:
+                # HNSW graphs cannot drop vectors; rebuild from stored embeddings
+                self.index = build_index(embeddings, self.index_type, self.index_params, ids=new_ids)
+            
+            self.df['record_id'] = new_ids
+            self.embeddings = embeddings
+            self._set_metadata(self.df)
+            
+            print(f"✅ FAISS index updated: {self.index.ntotal} vectors")
+            
+        except Exception as e:
+            raise Exception(f"Failed to update index: {str(e)}")
+    
+    def _set_metadata(self, df: pd.DataFrame):
+        """Build the columnar metadata store from the dataset"""
+        columns = METADATA_COLUMNS + [
+            col for col in OPTIONAL_METADATA_COLUMNS if col in df.columns
+        ]
+        self.metadata = MetadataStore.from_frame(df, columns=columns)
+        self._build_id_lookup()
+        
+        if self.exact_fast_path:
+            self.exact = ExactIndex.build(df['pincode'], df['officename_norm'])
+        
+        if self.retrieval_mode != 'semantic':
+            self.lexical = BM25Index.build(df['search_text_norm'])
+            self.row_embeddings = self.embeddings
+        
+        # Cached results refer to the old index
+        self.result_cache.clear()
+    
+    def _build_id_lookup(self):
+        """Map FAISS record ids to metadata rows"""
+        ids = np.asarray(self.metadata.column('record_id'), dtype=np.int64)
+        self.id_to_row = np.full(int(ids.max()) + 1 if len(ids) else 0, -1, dtype=np.int64)
+        self.id_to_row[ids] = np.arange(len(ids), dtype=np.int64)
+    
+    def _current_manifest(self) -> Dict:
+        """Fingerprint of the dataset, model, normalizer and index settings"""
+        if self.manifest is None:
+            self.manifest = self._build_manifest()
+        return self.manifest
+    
+    def _build_manifest(self) -> Dict:
+        return build_manifest(
+            csv_path=self.csv_path,
+            model_name=self.model_name,
+            model_revision=self.model_revision,
+            stored=read_manifest(self.cache_dir),
+            normalizer_version=NORMALIZER_VERSION,
+            metadata_format=METADATA_FORMAT_VERSION,
+            index_type=self.index_type,
+            index_params=self.index_params,
+            embedding_backend=self.embedding_backend,
+            quantization=self.quantization if self.embedding_backend == 'onnx-int8' else None
         )
     
-    async def _save_to_cache(self):
+    def _cache_is_valid(self) -> bool:
+        """Check that cache files exist and their manifest matches"""
+        if not (os.path.exists(self.index_path) and MetadataStore.exists(self.metadata_path)):
+            return False
+        
+        stored = read_manifest(self.cache_dir)
+        mismatches = manifest_mismatches(self._current_manifest(), stored)
+        if mismatches:
+            print(f"♻️  Cache is stale ({', '.join(mismatches)})")
+            return False
+        
+        # Same content, new timestamp: record it so the next start skips hashing
+        if stored != self._current_manifest():
+            write_manifest(self.cache_dir, self._current_manifest())
+        
+        return True
+    
+    def _save_to_cache(self):
         """Save embeddings, index, and metadata to disk"""
         try:
-            # Save FAISS index
-            faiss.write_index(self.index, self.index_path)
+            # Invalidate while files are being replaced
+            remove_manifest(self.cache_dir)
+            
+            # Save FAISS index to a new file, so workers that still have the
+            # old one memory-mapped keep reading intact pages
+            tmp_index_path = f"{self.index_path}.tmp"
+            faiss.write_index(self.index, tmp_index_path)
+            os.replace(tmp_index_path, self.index_path)
             
             # Save metadata
-            self.metadata.to_pickle(self.metadata_path)
+            self.metadata.save(self.metadata_path)
+            
+            # Save the BM25 and exact-match indexes, or drop ones left over
+            # from an older dataset
+            if self.lexical is not None:
+                self.lexical.save(self.lexical_path)
+            else:
+                atomic_dir.remove(self.lexical_path)
+            if self.exact is not None:
+                self.exact.save(self.exact_path)
+            else:
+                atomic_dir.remove(self.exact_path)
+            
+            # Save embeddings so unchanged vectors can be reused on update;
+            # like the index, they may be memory-mapped by other workers
+            if self.embeddings is not None:
+                tmp_embeddings_path = f"{self.embeddings_path}.tmp"
+                with open(tmp_embeddings_path, 'wb') as f:
+                    np.save(f, self.embeddings)
+                os.replace(tmp_embeddings_path, self.embeddings_path)
+                self.embeddings = None
+            
+            # Record what the cache was built from
+            write_manifest(self.cache_dir, self._current_manifest())
             
             print(f"✅ Cache saved to {self.cache_dir}")
             
         except Exception as e:
             print(f"⚠️  Warning: Failed to save cache: {str(e)}")
     
-    async def _load_from_cache(self):
+    def _load_from_cache(self):
         """Load embeddings, index, and metadata from disk"""
         try:
-            # Load FAISS index
-            self.index = faiss.read_index(self.index_path)
+            # Load FAISS index (memory-mapped, shared between workers)
+            self.index = read_index(self.index_path, self.index_type, mmap=self.mmap_index)
+            configure_search(self.index, self.index_params)
+            self.result_cache.clear()
+            
+            # Memory-map columnar metadata
+            self.metadata = MetadataStore.open(self.metadata_path)
+            self.total_records = len(self.metadata)
+            self._build_id_lookup()
+            
+            if self.exact_fast_path:
+                self._load_exact()
             
-            # Load metadata
-            self.metadata = pd.read_pickle(self.metadata_path)
+            if self.retrieval_mode != 'semantic':
+                self._load_lexical()
             
             print(f"✅ Cache loaded from {self.cache_dir}")
             
         except Exception as e:
             raise Exception(f"Failed to load cache: {str(e)}")
     
+    def _load_exact(self):
+        """Open the PIN and office name indexes for the fast path"""
+        if not ExactIndex.exists(self.exact_path):
+            print("🎯 Building exact-match index from cached metadata...")
+            ExactIndex.build(
+                self.metadata.column('pincode'), self.metadata.column('officename_norm')
+            ).save(self.exact_path)
+        self.exact = ExactIndex.open(self.exact_path, mmap=self.mmap_index)
+    
+    def _load_lexical(self):
+        """Open the BM25 index and the stored embeddings used for hybrid scoring"""
+        if not BM25Index.exists(self.lexical_path):
+            print("🔤 Building BM25 index from cached metadata...")
+            BM25Index.build(self.metadata.column('search_text_norm')).save(self.lexical_path)
+        self.lexical = BM25Index.open(self.lexical_path, mmap=self.mmap_index)
+        
+        # Exact cosine for lexical candidates FAISS did not return
+        self.row_embeddings = np.load(self.embeddings_path, mmap_mode='r' if self.mmap_index else None)
+    
     def clear_cache(self):
         """Clear cached files"""
+        self.result_cache.clear()
         try:
+            remove_manifest(self.cache_dir)
             if os.path.exists(self.embeddings_path):
                 os.remove(self.embeddings_path)
             if os.path.exists(self.index_path):
                 os.remove(self.index_path)
-            if os.path.exists(self.metadata_path):
-                os.remove(self.metadata_path)
+            atomic_dir.remove(self.metadata_path)
+            atomic_dir.remove(self.lexical_path)
+            atomic_dir.remove(self.exact_path)
             print(f"✅ Cache cleared from {self.cache_dir}")
         except Exception as e:
             print(f"⚠️  Warning: Failed to clear cache: {str(e)}")
@@ -302,135 +633,426 @@ class AddressMatcher:
         Returns:
             Dictionary with matches and metadata
         """
+        return self.match_sync(query_text, top_k=top_k, include_digipin=include_digipin)
+    
+    async def match_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        include_digipin: bool = True
+    ) -> List[Dict]:
+        """
+        Match many query addresses in one pass (see match_many_sync)
+        """
+        return self.match_many_sync(queries, top_k=top_k, include_digipin=include_digipin)
+    
+    def match_sync(
+        self,
+        query_text: str,
+        top_k: int = 5,
+        include_digipin: bool = True
+    ) -> Dict:
+        """
+        Blocking version of match(), safe to run in a worker thread
+        """
+        return self.match_many_sync(
+            [query_text],
+            top_k=top_k,
+            include_digipin=include_digipin
+        )[0]
+    
+    def match_many_sync(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        include_digipin: bool = True
+    ) -> List[Dict]:
+        """
+        Match many query addresses in one pass
+        
+        All queries are cleaned up front, encoded as a single batched matrix
+        and searched with one FAISS call, so the per-item cost is a fraction
+        of calling match() once per address. This call blocks on CPU-bound
+        work; async callers should dispatch it to a worker thread.
+        
+        Args:
+            queries: Address texts to match
+            top_k: Number of top matches to return per query
+            include_digipin: Whether to include DIGIPIN codes
+            
+        Returns:
+            List of match dictionaries, in the same order as the input
+        """
+        if not queries:
+            return []
+        
         start_time = time.time()
+        clock = StageClock()
         
-        # Clean and normalize query
-        normalized_query = normalize_text(query_text)
-        cleaned_query = clean_address(query_text)
+        # Clean and normalize all queries
+        normalized_queries = [normalize_text(q) for q in queries]
+        cleaned_queries = clean_addresses(queries)
         
-        # Extract PIN code from query if present
-        query_pincode = extract_pincode(query_text)
+        # Extract PIN codes from queries if present
+        query_pincodes = [extract_pincode(q) for q in queries]
+        clock.lap('normalize')
         
-        # Generate query embedding
-        query_embedding = self.model.encode(
-            [cleaned_query],
-            convert_to_numpy=True
-        )
-        faiss.normalize_L2(query_embedding)
+        # Serve repeated addresses from the result cache. The exact fast
+        # path reads the normalized query and the PIN boost the raw query's
+        # PIN, so both are part of the key next to the cleaned text
+        cache_keys = [
+            (cleaned, normalized, pincode, top_k, include_digipin)
+            for cleaned, normalized, pincode in zip(cleaned_queries, normalized_queries, query_pincodes)
+        ]
+        cached = [self.result_cache.get(key) for key in cache_keys]
+        all_matches = [entry[1] if entry else None for entry in cached]
+        match_paths = [entry[0] if entry else None for entry in cached]
+        misses = [i for i, matches in enumerate(all_matches) if matches is None]
+        clock.lap('cache')
         
-        # Search FAISS index
-        similarities, indices = self.index.search(
-            query_embedding.astype('float32'), 
-            top_k * 3  # Get more candidates for re-ranking
-        )
+        num_candidates = top_k * self.candidate_factor  # Get more candidates for re-ranking
+        
+        # Consistent PIN + office name, or a bare PIN: answer by lookup
+        if self.exact is not None:
+            for i in misses:
+                answer = self._exact_match(normalized_queries[i], query_pincodes[i])
+                clock.lap('exact_lookup')
+                if answer is not None:
+                    match_paths[i], rows, scores = answer
+                    # No embedding was computed, so there is no similarity
+                    all_matches[i] = self._rank_candidates(
+                        None, rows, cleaned_queries[i], query_pincodes[i],
+                        top_k, include_digipin, scores=scores, clock=clock
+                    )
+                    self.result_cache.put(cache_keys[i], (match_paths[i], all_matches[i]))
         
-        # Build candidate list
-        candidates = []
-        for sim, idx in zip(similarities[0], indices[0]):
-            if idx == -1:
-                continue
+        # Lexical candidates, and answers that need no embedding at all
+        lexical_hits = {}
+        if self.lexical is not None:
+            for i in misses:
+                if all_matches[i] is not None:
+                    continue
+                tokens = cleaned_queries[i].split()
+                lexical_hits[i] = self.lexical.score(tokens)
+                
+                if self.retrieval_mode == 'lexical_first':
+                    rows = self._decisive_lexical_rows(tokens, *lexical_hits[i], num_candidates)
+                    if rows is not None:
+                        coverage = self.lexical.coverage(tokens, rows)
+                        clock.lap('lexical')
+                        all_matches[i] = self._rank_candidates(
+                            coverage, rows, cleaned_queries[i], query_pincodes[i],
+                            top_k, include_digipin, clock=clock
+                        )
+                        match_paths[i] = 'lexical'
+                        self.result_cache.put(cache_keys[i], (match_paths[i], all_matches[i]))
+                clock.lap('lexical')
+        
+        semantic = [i for i in misses if all_matches[i] is None]
+        if semantic:
+            # Generate all query embeddings in one batch
+            query_embeddings = self.model.encode(
+                [cleaned_queries[i] for i in semantic],
+                batch_size=128,
+                convert_to_numpy=True
+            ).astype('float32')
+            faiss.normalize_L2(query_embeddings)
+            clock.lap('encode')
+            
+            # Search FAISS index once for the whole batch
+            similarities, indices = self.index.search(query_embeddings, num_candidates)
+            clock.lap('search')
+            
+            # Re-rank candidates per query
+            for row, i in enumerate(semantic):
+                valid = indices[row] != -1
+                rows = self.id_to_row[indices[row][valid]]
+                sims = similarities[row][valid].astype(np.float64)
+                scores = None
+                path = 'semantic'
                 
-            record = self.metadata.iloc[idx]
-            
-            # Calculate confidence score
-            confidence = self._calculate_confidence(
-                similarity=float(sim),
-                record=record,
-                query=cleaned_query,
-                query_pincode=query_pincode
+                if i in lexical_hits:
+                    rows, sims, scores = self._fuse_candidates(
+                        rows, query_embeddings[row], *lexical_hits[i], num_candidates
+                    )
+                    path = 'hybrid'
+                    clock.lap('fusion')
+                
+                matches = self._rank_candidates(
+                    sims, rows, cleaned_queries[i], query_pincodes[i],
+                    top_k, include_digipin, scores=scores, clock=clock
+                )
+                self.result_cache.put(cache_keys[i], (path, matches))
+                all_matches[i] = matches
+                match_paths[i] = path
+        
+        # Amortize batch time across queries
+        processing_time = (time.time() - start_time) * 1000 / len(queries)
+        
+        results = [
+            {
+                'query': query_text,
+                'normalized_query': normalized_query,
+                'matches': [dict(match) for match in matches],
+                'match_path': match_path,
+                'processing_time_ms': round(processing_time, 2)
+            }
+            for query_text, normalized_query, matches, match_path in zip(
+                queries, normalized_queries, all_matches, match_paths
             )
+        ]
+        clock.lap('enrich')
+        
+        if self.stage_observer is not None:
+            for stage, seconds in clock.totals.items():
+                self.stage_observer(stage, seconds)
+        
+        return results
+    
+    def _exact_match(
+        self,
+        normalized_query: str,
+        query_pincode: str
+    ) -> Optional[Tuple[str, np.ndarray, np.ndarray]]:
+        """
+        Answer a query from the PIN and office name indexes, if possible
+        
+        - A bare PIN returns the offices in that PIN ('pin_lookup')
+        - A PIN plus the name of an office in that PIN returns that office
+          first, followed by the PIN's other offices ('exact')
+        
+        Returns:
+            (match path, candidate rows, base confidence scores: 1 for the
+            requested offices, 0 for the rest), or None when the query
+            needs retrieval
+        """
+        if not query_pincode:
+            return None
+        
+        pin_rows = self.exact.pin_rows(query_pincode)
+        if not len(pin_rows):
+            return None
+        
+        tokens = normalized_query.split()
+        if tokens == [query_pincode]:
+            return 'pin_lookup', pin_rows, np.ones(len(pin_rows))
+        
+        named = self.exact.named_rows(tokens, query_pincode)
+        if not len(named):
+            return None
+        
+        others = pin_rows[~np.isin(pin_rows, named)]
+        return (
+            'exact',
+            np.concatenate([named, others]),
+            np.concatenate([np.ones(len(named)), np.zeros(len(others))])
+        )
+    
+    def _decisive_lexical_rows(
+        self,
+        tokens: List[str],
+        rows: np.ndarray,
+        scores: np.ndarray,
+        num_candidates: int
+    ) -> Optional[np.ndarray]:
+        """
+        Return the top BM25 rows if the lexical result is decisive
+        
+        Decisive means the best document contains every query token and
+        outscores the runner-up by at least `lexical_decisive_margin`
+        (relative), e.g. an exact office name plus PIN code.
+        
+        Returns:
+            Candidate rows, or None when the query needs embedding
+        """
+        if not len(rows):
+            return None
+        
+        top = np.lexsort((rows, -scores))[:num_candidates]
+        rows, scores = rows[top], scores[top]
+        
+        runner_up = float(scores[1]) if len(scores) > 1 else 0.0
+        if (scores[0] - runner_up) / scores[0] < self.lexical_decisive_margin:
+            return None
+        if self.lexical.coverage(tokens, rows[:1])[0] < 1.0:
+            return None
+        return rows
+    
+    def _fuse_candidates(
+        self,
+        rows: np.ndarray,
+        query_embedding: np.ndarray,
+        lexical_rows: np.ndarray,
+        lexical_scores: np.ndarray,
+        num_candidates: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Merge FAISS and BM25 candidates and fuse their scores
+        
+        The candidate set is the FAISS candidates plus the best BM25 rows.
+        Every candidate gets its exact cosine similarity from the stored
+        embeddings and its BM25 score scaled by the query's best BM25 score;
+        the fused score is their weighted sum (`lexical_weight`).
+        
+        Returns:
+            (rows, cosine similarities, fused scores)
+        """
+        if len(lexical_rows):
+            top = np.lexsort((lexical_rows, -lexical_scores))[:num_candidates]
+            extra = lexical_rows[top][~np.isin(lexical_rows[top], rows)]
+            rows = np.concatenate([rows, extra])
+        
+        sims = np.asarray(self.row_embeddings[rows] @ query_embedding, dtype=np.float64)
+        
+        lexical = np.zeros(len(rows))
+        if len(lexical_rows):
+            pos = np.minimum(np.searchsorted(lexical_rows, rows), len(lexical_rows) - 1)
+            found = lexical_rows[pos] == rows
+            lexical[found] = lexical_scores[pos[found]] / lexical_scores.max()
+        
+        scores = (1 - self.lexical_weight) * sims + self.lexical_weight * lexical
+        return rows, sims, scores
+    
+    def _rank_candidates(
+        self,
+        similarities: Optional[np.ndarray],
+        rows: np.ndarray,
+        cleaned_query: str,
+        query_pincode: str,
+        top_k: int,
+        include_digipin: bool,
+        scores: Optional[np.ndarray] = None,
+        clock: Optional[StageClock] = None
+    ) -> List[Dict]:
+        """
+        Re-rank retrieval candidates for a single query
+        
+        Confidence boosts are computed over the whole candidate block at once,
+        and result dictionaries are only built for the final top K.
+        
+        Args:
+            similarities: Similarity scores for the query's candidates, or
+                          None when no embedding similarity was computed
+                          (reported as a null `similarity`)
+            rows: Metadata rows of the query's candidates
+            cleaned_query: Cleaned query text
+            query_pincode: Extracted PIN code from query
+            top_k: Number of top matches to return
+            include_digipin: Whether to include DIGIPIN codes
+            scores: Base scores for confidence (defaults to similarities),
+                    e.g. fused lexical + semantic scores or exact lookup hits
+            clock: Stage clock charged for re-ranking and enrichment
+            
+        Returns:
+            Ranked list of match dictionaries
+        """
+        sims = None if similarities is None else np.asarray(similarities, dtype=np.float64)
+        
+        # Calculate confidence scores for all candidates
+        confidences = self._calculate_confidence(
+            similarities=sims if scores is None else scores,
+            rows=rows,
+            query=cleaned_query,
+            query_pincode=query_pincode
+        )
+        
+        # Sort by rounded confidence, keeping retrieval order for ties
+        rounded = np.round(confidences, 4)
+        order = np.argsort(-rounded, kind='stable')[:top_k]
+        if clock is not None:
+            clock.lap('rerank')
+        
+        query_tokens = set(cleaned_query.split())
+        
+        # Fetch fields for the final rows only
+        top_rows = rows[order]
+        fields = {
+            col: self.metadata.take(col, top_rows)
+            for col in RESULT_COLUMNS
+            if col in self.metadata
+        }
+        
+        final_matches = []
+        for rank, pos in enumerate(order, 1):
+            i = rank - 1
             
             # Build match result
             match = {
-                'officename': str(record['officename']),
-                'district': str(record['district']),
-                'state': str(record['state']),
-                'pincode': str(record['pincode']),
-                'similarity': round(float(sim), 4),
-                'confidence': round(confidence, 4)
+                'officename': str(fields['officename'][i]),
+                'district': str(fields['district'][i]),
+                'state': str(fields['state'][i]),
+                'pincode': str(fields['pincode'][i]),
+                'similarity': None if sims is None else round(float(sims[pos]), 4),
+                'confidence': round(float(confidences[pos]), 4)
             }
             
             # Add optional fields
             if include_digipin:
-                # Generate DIGIPIN on-demand only when requested
-                if 'latitude' in record and pd.notna(record['latitude']) and 'longitude' in record and pd.notna(record['longitude']):
-                    digipin = self._generate_digipin_for_coords(float(record['latitude']), float(record['longitude']))
-                    match['digipin'] = digipin
-                else:
-                    match['digipin'] = 'N/A'
+                # DIGIPIN is precomputed at index build time
+                match['digipin'] = str(fields['digipin'][i])
             
-            if 'latitude' in record and pd.notna(record['latitude']):
-                match['latitude'] = float(record['latitude'])
-            if 'longitude' in record and pd.notna(record['longitude']):
-                match['longitude'] = float(record['longitude'])
-            if 'officetype' in record:
-                match['officetype'] = str(record['officetype'])
+            if 'latitude' in fields and np.isfinite(fields['latitude'][i]):
+                match['latitude'] = float(fields['latitude'][i])
+            if 'longitude' in fields and np.isfinite(fields['longitude'][i]):
+                match['longitude'] = float(fields['longitude'][i])
+            if 'officetype' in fields:
+                match['officetype'] = str(fields['officetype'][i])
             
             # Add matched tokens for explainability
-            match['matched_tokens'] = highlight_matching_tokens(
-                cleaned_query, 
-                record['search_text']
+            match['matched_tokens'] = list(
+                query_tokens & set(fields['search_text_norm'][i].split())
             )
             
-            candidates.append(match)
-        
-        # Sort by confidence
-        candidates.sort(key=lambda x: x['confidence'], reverse=True)
-        
-        # Take top K
-        final_matches = candidates[:top_k]
+            match['rank'] = rank
+            final_matches.append(match)
         
-        # Add rank
-        for i, match in enumerate(final_matches, 1):
-            match['rank'] = i
-        
-        processing_time = (time.time() - start_time) * 1000  # Convert to ms
-        
-        return {
-            'query': query_text,
-            'normalized_query': normalized_query,
-            'matches': final_matches,
-            'processing_time_ms': round(processing_time, 2)
-        }
+        if clock is not None:
+            clock.lap('enrich')
+        return final_matches
     
     def _calculate_confidence(
         self,
-        similarity: float,
-        record: pd.Series,
+        similarities: np.ndarray,
+        rows: np.ndarray,
         query: str,
         query_pincode: str
-    ) -> float:
+    ) -> np.ndarray:
         """
-        Calculate confidence score considering multiple factors
+        Calculate confidence scores considering multiple factors
         
         Args:
-            similarity: Embedding similarity score
-            record: Post office record
+            similarities: Embedding similarity scores of the candidates
+            rows: Metadata row indices of the candidates
             query: Normalized query text
             query_pincode: Extracted PIN code from query
             
         Returns:
-            Confidence score between 0 and 1
+            Array of confidence scores between 0 and 1
         """
-        confidence = similarity  # Base confidence from embedding
+        confidence = similarities.copy()  # Base confidence from embedding
         
-        # Boost if PIN code matches
-        if query_pincode and query_pincode == str(record['pincode']):
-            confidence = min(1.0, confidence + 0.2)
+        # Boost if PIN code matches (compared on dictionary codes)
+        if query_pincode:
+            confidence += 0.2 * self.metadata.equals('pincode', rows, query_pincode)
         
-        # Boost if office name appears in query
-        office_name = normalize_text(str(record['officename']))
-        if office_name in query:
-            confidence = min(1.0, confidence + 0.15)
+        # Boost if office name, district or state appears in query
+        for col, boost in NAME_BOOSTS:
+            confidence += boost * self._names_in_query(f'{col}_norm', rows, query)
         
-        # Boost if district appears in query
-        district_name = normalize_text(str(record['district']))
-        if district_name in query:
-            confidence = min(1.0, confidence + 0.1)
+        return np.minimum(1.0, confidence)
+    
+    def _names_in_query(self, col: str, rows: np.ndarray, query: str) -> np.ndarray:
+        """
+        Check which candidate rows have a column value contained in the query
         
-        # Boost if state appears in query
-        state_name = normalize_text(str(record['state']))
-        if state_name in query:
-            confidence = min(1.0, confidence + 0.05)
+        Dictionary-encoded columns (district, state) are checked once per
+        distinct value in the candidate block rather than once per row.
+        """
+        if self.metadata.encoding(col) == 'dict':
+            codes, inverse = np.unique(self.metadata.codes(col)[rows], return_inverse=True)
+            vocab = self.metadata.vocabulary(col)
+            hits = np.fromiter((vocab[c] in query for c in codes), dtype=bool, count=len(codes))
+            return hits[inverse]
         
-        return min(1.0, confidence)
+        names = self.metadata.take(col, rows)
+        return np.fromiter((name in query for name in names), dtype=bool, count=len(names))
@@ -0,0 +1,249 @@
+"""
+Columnar, memory-mappable metadata store for post office records
+"""
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+
+from models import atomic_dir
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+
+# Strings with fewer distinct values than this fraction of rows are
+# dictionary-encoded; the rest are stored as a UTF-8 blob with offsets
+DICT_ENCODING_MAX_RATIO = 0.5
+
+
+class MetadataStore:
+    """
+    Read-only columnar store for record metadata
+
+    Each column is kept as plain NumPy arrays:
+    - numeric columns as typed arrays
+    - low-cardinality strings as int32 codes into an interned vocabulary
+    - high-cardinality strings as a UTF-8 byte blob plus row offsets
+
+    Stores opened from disk memory-map every array, so several worker
+    processes share the same pages through the OS page cache and row
+    lookups by FAISS id never touch pandas.
+    """
+
+    def __init__(self, num_rows: int, columns: Dict[str, Dict]):
+        self.num_rows = num_rows
+        self._columns = columns
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: Optional[List[str]] = None) -> "MetadataStore":
+        """
+        Build an in-memory store from a DataFrame
+
+        Args:
+            df: Source DataFrame
+            columns: Columns to include (defaults to all)
+
+        Returns:
+            MetadataStore holding the encoded columns
+        """
+        encoded = {}
+        for name in columns or list(df.columns):
+            series = df[name]
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                encoded[name] = {'encoding': 'numeric', 'values': series.to_numpy()}
+            else:
+                encoded[name] = _encode_strings(series.astype(str).tolist())
+
+        return cls(len(df), encoded)
+
+    @classmethod
+    def open(cls, path: str, mmap: bool = True) -> "MetadataStore":
+        """
+        Open a store previously written with save()
+
+        Args:
+            path: Store directory
+            mmap: Memory-map arrays instead of reading them into RAM
+
+        Returns:
+            MetadataStore backed by the files in path
+        """
+        with atomic_dir.read(path) as version_path:
+            with open(os.path.join(version_path, MANIFEST_FILE)) as f:
+                manifest = json.load(f)
+
+            if manifest.get('format_version') != FORMAT_VERSION:
+                raise ValueError(f"Unsupported metadata format: {manifest.get('format_version')}")
+
+            mmap_mode = 'r' if mmap else None
+            columns = {}
+            for name, spec in manifest['columns'].items():
+                column = {'encoding': spec['encoding']}
+                for key, filename in spec['files'].items():
+                    column[key] = np.load(os.path.join(version_path, filename), mmap_mode=mmap_mode)
+                if spec['encoding'] == 'dict':
+                    column['vocab'] = _decode_blob(column.pop('vocab_offsets'), column.pop('vocab_bytes'))
+                columns[name] = column
+
+        return cls(manifest['num_rows'], columns)
+
+    def save(self, path: str):
+        """
+        Write the store to a directory, replacing any previous store
+
+        Files are written to a new versioned directory that path is then
+        atomically repointed to (see atomic_dir), so readers never see a
+        half-written or missing store.
+        """
+        version_path = atomic_dir.new_version(path)
+
+        manifest = {'format_version': FORMAT_VERSION, 'num_rows': self.num_rows, 'columns': {}}
+        for name, column in self._columns.items():
+            arrays = {k: v for k, v in column.items() if k != 'encoding'}
+            if column['encoding'] == 'dict':
+                offsets, blob = _encode_blob(arrays.pop('vocab'))
+                arrays['vocab_offsets'] = offsets
+                arrays['vocab_bytes'] = blob
+
+            files = {}
+            for key, array in arrays.items():
+                filename = f"{name}.{key}.npy"
+                np.save(os.path.join(version_path, filename), np.asarray(array))
+                files[key] = filename
+            manifest['columns'][name] = {'encoding': column['encoding'], 'files': files}
+
+        with open(os.path.join(version_path, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        atomic_dir.publish(path, version_path)
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """Check whether a saved store exists at path"""
+        return os.path.exists(os.path.join(path, MANIFEST_FILE))
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def encoding(self, name: str) -> str:
+        """Return 'numeric', 'dict' or 'blob' for a column"""
+        return self._columns[name]['encoding']
+
+    def codes(self, name: str) -> np.ndarray:
+        """Return the code array of a dictionary-encoded column"""
+        return self._columns[name]['codes']
+
+    def vocabulary(self, name: str) -> np.ndarray:
+        """Return the interned values of a dictionary-encoded column"""
+        return self._columns[name]['vocab']
+
+    def code_for(self, name: str, value: str) -> int:
+        """Return the code of value in a dictionary-encoded column, or -1"""
+        lookup = self._columns[name].get('lookup')
+        if lookup is None:
+            lookup = {v: i for i, v in enumerate(self.vocabulary(name))}
+            self._columns[name]['lookup'] = lookup
+        return lookup.get(value, -1)
+
+    def equals(self, name: str, rows: Iterable[int], value) -> np.ndarray:
+        """
+        Compare a column against a value for the given rows
+
+        Dictionary-encoded columns are compared on their integer codes.
+
+        Returns:
+            Boolean array, one entry per row
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if self.encoding(name) == 'dict':
+            return self.codes(name)[rows] == self.code_for(name, value)
+        return self.take(name, rows) == value
+
+    def take(self, name: str, rows: Iterable[int]) -> np.ndarray:
+        """
+        Return decoded values of a column for the given rows
+
+        Args:
+            name: Column name
+            rows: Row indices (FAISS ids)
+
+        Returns:
+            Array of values (float for numeric columns, object for strings)
+        """
+        column = self._columns[name]
+        rows = np.asarray(rows, dtype=np.int64)
+
+        if column['encoding'] == 'numeric':
+            return np.asarray(column['values'][rows])
+        if column['encoding'] == 'dict':
+            return column['vocab'][column['codes'][rows]]
+
+        offsets, blob = column['offsets'], column['bytes']
+        return np.array(
+            [bytes(blob[offsets[r]:offsets[r + 1]]).decode('utf-8') for r in rows],
+            dtype=object
+        )
+
+    def column(self, name: str) -> np.ndarray:
+        """Return a fully decoded column"""
+        column = self._columns[name]
+        if column['encoding'] == 'numeric':
+            return column['values']
+        return self.take(name, np.arange(self.num_rows))
+
+    def row(self, idx: int) -> Dict:
+        """Return a single record as a dictionary"""
+        return {name: self.take(name, [idx])[0] for name in self._columns}
+
+    def to_frame(self) -> pd.DataFrame:
+        """Decode the whole store into a DataFrame"""
+        return pd.DataFrame({name: self.column(name) for name in self._columns})
+
+
+def _encode_strings(values: List[str]) -> Dict:
+    """Pick dictionary or blob encoding for a list of strings"""
+    codes, vocab = pd.factorize(pd.Series(values, dtype=object), sort=False)
+    if len(vocab) <= max(1, DICT_ENCODING_MAX_RATIO * len(values)):
+        return {
+            'encoding': 'dict',
+            'codes': codes.astype(np.int32),
+            'vocab': np.asarray(vocab, dtype=object)
+        }
+
+    offsets, blob = _encode_blob(values)
+    return {'encoding': 'blob', 'offsets': offsets, 'bytes': blob}
+
+
+def _encode_blob(values: Iterable[str]):
+    """Concatenate strings into a UTF-8 byte array with row offsets"""
+    encoded = [str(v).encode('utf-8') for v in values]
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return offsets, blob
+
+
+def _decode_blob(offsets: np.ndarray, blob: np.ndarray) -> np.ndarray:
+    """Decode a blob-encoded string array into an object array"""
+    data = bytes(blob)
+    return np.array(
+        [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)],
+        dtype=object
+    )
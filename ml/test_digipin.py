@@ -0,0 +1,67 @@
+"""
+Tests for utils.digipin encoding and decoding
+Run with: pytest test_digipin.py
+"""
+import numpy as np
+
+from utils.digipin import (
+    INVALID_DIGIPIN,
+    MAX_LAT,
+    MAX_LON,
+    MIN_LAT,
+    MIN_LON,
+    decode_digipin,
+    encode_digipin,
+)
+
+
+def test_known_value():
+    # Dak Bhawan, New Delhi
+    assert encode_digipin(28.622788, 77.213033).tolist() == ['39J-49L-L8T4']
+
+
+def test_vectorized_matches_scalar():
+    lats = [28.622788, 17.385, 12.9352, 8.5241]
+    lons = [77.213033, 78.4867, 77.6245, 76.9366]
+    codes = encode_digipin(lats, lons).tolist()
+    assert codes == [encode_digipin(lat, lon)[0] for lat, lon in zip(lats, lons)]
+
+
+def test_round_trip():
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(MIN_LAT, MAX_LAT, 1000)
+    lons = rng.uniform(MIN_LON, MAX_LON, 1000)
+    codes = encode_digipin(lats, lons)
+
+    # The centre of each cell encodes back to the same cell
+    dec_lats, dec_lons = decode_digipin(codes)
+    assert encode_digipin(dec_lats, dec_lons).tolist() == codes.tolist()
+
+    # and lies within a level-10 cell (about 3.8 m) of the original point
+    cell_lat = (MAX_LAT - MIN_LAT) / 4 ** 10
+    cell_lon = (MAX_LON - MIN_LON) / 4 ** 10
+    assert np.all(np.abs(dec_lats - lats) <= cell_lat)
+    assert np.all(np.abs(dec_lons - lons) <= cell_lon)
+
+
+def test_decode_ignores_separators_and_case():
+    lat, lon = decode_digipin(['39J-49L-L8T4', '39j49ll8t4'])
+    assert lat[0] == lat[1] and lon[0] == lon[1]
+    assert abs(lat[0] - 28.622788) < 1e-4
+    assert abs(lon[0] - 77.213033) < 1e-4
+
+
+def test_out_of_bounds():
+    codes = encode_digipin(
+        [MIN_LAT - 0.1, MAX_LAT + 0.1, 28.6, 28.6, np.nan, MIN_LAT],
+        [77.2, 77.2, MIN_LON - 0.1, MAX_LON + 0.1, 77.2, MIN_LON],
+    ).tolist()
+    assert codes[:5] == [INVALID_DIGIPIN] * 5
+    # The bounding box edges are inside it
+    assert codes[5] != INVALID_DIGIPIN
+
+
+def test_decode_invalid():
+    lat, lon = decode_digipin(['39J-49L', '39J-49L-L8TA', INVALID_DIGIPIN, ''])
+    assert np.isnan(lat).all()
+    assert np.isnan(lon).all()
@@ -0,0 +1,67 @@
+"""
+Tests for models.exact_index lookups, in memory and memory-mapped
+Run with: pytest test_exact_index.py
+"""
+import pytest
+
+from models.exact_index import ExactIndex, base_office_name
+
+PINCODES = ["504273", "504273", "504273", "110001", "110001", "560034"]
+OFFICE_NAMES = [
+    "kothimir b o",
+    "asifabad s o",
+    "rebbena bo",
+    "dak bhawan s o",
+    "kothimir b o",
+    "koramangala vi bk s o",
+]
+
+
+@pytest.fixture(params=["memory", "mmap"])
+def index(request, tmp_path):
+    built = ExactIndex.build(PINCODES, OFFICE_NAMES)
+    if request.param == "memory":
+        return built
+    path = str(tmp_path / "exact")
+    built.save(path)
+    return ExactIndex.open(path, mmap=True)
+
+
+def test_base_office_name():
+    assert base_office_name("kothimir b o") == "kothimir"
+    assert base_office_name("rebbena bo") == "rebbena"
+    assert base_office_name("new delhi g p o") == "new delhi"
+    assert base_office_name("so") == "so"
+
+
+def test_pin_only(index):
+    assert index.pin_rows("504273").tolist() == [0, 1, 2]
+    assert index.pin_rows("110001").tolist() == [3, 4]
+    assert index.pin_rows("999999").tolist() == []
+    assert index.pin_rows("5042730").tolist() == []
+    assert len(index) == 3
+
+
+def test_pin_and_name(index):
+    assert index.named_rows("kothimir bo 504273".split(), "504273").tolist() == [0]
+    assert index.named_rows("asifabad 504273".split(), "504273").tolist() == [1]
+    # Multi-token names are matched, longer names first
+    assert index.max_name_tokens == 3
+    tokens = "koramangala vi bk bangalore 560034".split()
+    assert index.named_rows(tokens, "560034").tolist() == [5]
+
+
+def test_name_in_another_pin(index):
+    # Kothimir exists in both PINs; only the office in the query's PIN counts
+    assert index.named_rows("kothimir 110001".split(), "110001").tolist() == [4]
+    # Asifabad is not in 110001, so the query needs retrieval
+    assert index.named_rows("asifabad 110001".split(), "110001").tolist() == []
+    assert index.named_rows("asifabad 999999".split(), "999999").tolist() == []
+
+
+def test_empty_index(tmp_path):
+    index = ExactIndex.build([], [])
+    assert index.pin_rows("504273").tolist() == []
+    path = str(tmp_path / "exact")
+    index.save(path)
+    assert ExactIndex.open(path).named_rows(["kothimir"], "504273").tolist() == []
@@ -0,0 +1,66 @@
+"""
+Tests for utils.metrics rendering and merging across worker processes
+Run with: pytest test_metrics.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+from utils.metrics import MetricsRegistry, MultiProcessMetrics
+
+
+def make_registry(value: float):
+    registry = MetricsRegistry()
+    requests = registry.counter("ml_requests_total", "Requests", ["outcome"])
+    latency = registry.histogram("ml_request_duration_seconds", "Latency", buckets=(0.1, 1.0))
+    registry.gauge("ml_ready", "Ready", lambda: value)
+    requests.inc(outcome="success")
+    latency.observe(0.05)
+    latency.observe(value)
+    return registry
+
+
+def write_snapshot(path, pid: int, registry: MetricsRegistry):
+    with open(os.path.join(path, f"{pid}.json"), "w") as f:
+        json.dump({"pid": pid, "metrics": registry.collect()}, f)
+
+
+def test_render():
+    text = make_registry(0.5).render()
+    assert "# TYPE ml_requests_total counter" in text
+    assert 'ml_requests_total{outcome="success"} 1\n' in text
+    assert 'ml_request_duration_seconds_bucket{le="0.1"} 1\n' in text
+    assert 'ml_request_duration_seconds_bucket{le="+Inf"} 2\n' in text
+    assert "ml_ready 0.5\n" in text
+
+
+def test_merge_workers(tmp_path):
+    shared = MultiProcessMetrics(make_registry(1), str(tmp_path))
+
+    # Another live worker, and one that has exited
+    worker = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    try:
+        write_snapshot(tmp_path, worker.pid, make_registry(0.5))
+        write_snapshot(tmp_path, dead.pid, make_registry(5))
+        text = shared.render()
+    finally:
+        worker.kill()
+        worker.wait()
+
+    # Counters and histograms add up over all workers, dead ones included
+    assert 'ml_requests_total{outcome="success"} 3\n' in text
+    assert 'ml_request_duration_seconds_bucket{le="0.1"} 3\n' in text
+    assert 'ml_request_duration_seconds_bucket{le="1"} 5\n' in text
+    assert 'ml_request_duration_seconds_count 6\n' in text
+    assert text.count("# TYPE ml_requests_total counter") == 1
+
+    # Gauges are per live worker
+    assert f'ml_ready{{worker="{os.getpid()}"}} 1\n' in text
+    assert f'ml_ready{{worker="{worker.pid}"}} 0.5\n' in text
+    assert f'worker="{dead.pid}"' not in text
+
+    MultiProcessMetrics.clear(str(tmp_path))
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,115 @@
+"""
+Tests for utils.streaming parsing of CSV / NDJSON request bodies
+Run with: pytest test_streaming.py
+"""
+import asyncio
+import json
+
+import pytest
+
+from utils.streaming import iter_csv_records, iter_lines, iter_ndjson_records
+
+CSV_BODY = (
+    'id,Address,city\r\n'
+    '1,"Kothimir B.O, Asifabad 504273",Asifabad\r\n'
+    '2,"Flat 4,\r\nKoramangala VI Bk\r\nBangalore 560034",Bangalore\r\n'
+    '3,"Shop ""A"", Dak Bhawan, New Delhi 110001",Delhi\r\n'
+    '4,,Nowhere\r\n'
+    '5,Rebbena 504292,Asifabad'
+).encode('utf-8-sig')
+
+CSV_RECORDS = [
+    (1, 'Kothimir B.O, Asifabad 504273', None),
+    (2, 'Flat 4,\nKoramangala VI Bk\nBangalore 560034', None),
+    (3, 'Shop "A", Dak Bhawan, New Delhi 110001', None),
+    (4, None, 'Missing address column'),
+    (5, 'Rebbena 504292', None),
+]
+
+
+async def _chunks(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def parse(parser, body: bytes, chunk_size: int = 64 * 1024, **kwargs):
+    async def collect():
+        lines = iter_lines(_chunks(body, chunk_size))
+        return [record async for record in parser(lines, **kwargs)]
+    return asyncio.run(collect())
+
+
+def test_csv_quoted_multiline_fields():
+    assert parse(iter_csv_records, CSV_BODY) == CSV_RECORDS
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+def test_csv_chunk_boundaries(chunk_size):
+    # Chunks split rows, quoted newlines, CRLFs and the BOM
+    assert parse(iter_csv_records, CSV_BODY, chunk_size=chunk_size) == CSV_RECORDS
+
+
+def test_chunk_boundary_inside_utf8_character():
+    body = 'address\nकोठीमीर 504273\n'.encode('utf-8')
+    for chunk_size in range(1, 8):
+        assert parse(iter_csv_records, body, chunk_size=chunk_size) == [(1, 'कोठीमीर 504273', None)]
+
+
+def test_csv_missing_address_column():
+    with pytest.raises(ValueError, match='"address" column'):
+        parse(iter_csv_records, b'id,text\n1,Kothimir 504273\n')
+
+
+def test_csv_custom_column():
+    body = b'id,Text\n1,Kothimir 504273\n'
+    assert parse(iter_csv_records, body, column='text') == [(1, 'Kothimir 504273', None)]
+
+
+def test_ndjson_records():
+    body = b'{"address": " Kothimir 504273 "}\n"Rebbena 504292"\n\n{"city": "Delhi"}\n'
+    assert parse(iter_ndjson_records, body) == [
+        (1, 'Kothimir 504273', None),
+        (2, 'Rebbena 504292', None),
+        (3, None, 'Missing address field'),
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64 * 1024])
+def test_ndjson_bad_lines(chunk_size):
+    lines = [
+        '{"address": "Kothimir 504273"}',
+        '{"address": "Asifabad',
+        'not json',
+        '{"address": "Rebbena 504292"}',
+        '[1, 2',
+    ]
+    records = parse(iter_ndjson_records, '\n'.join(lines).encode(), chunk_size=chunk_size)
+
+    # One error record per bad line; the good lines around them still parse
+    assert [(row, text) for row, text, _ in records] == [
+        (1, 'Kothimir 504273'), (2, None), (3, None), (4, 'Rebbena 504292'), (5, None)
+    ]
+    assert [row for row, _, error in records if error and error.startswith('Invalid JSON')] == [2, 3, 5]
+
+
+def test_stream_summary_counts_bad_lines(monkeypatch):
+    main = pytest.importorskip("main")
+
+    async def fake_match(texts, top_k, include_digipin):
+        return [{"query": text, "matches": [{"pincode": "504273"}] if "504273" in text else []} for text in texts]
+
+    monkeypatch.setattr(main, "match_with_retry", fake_match)
+    monkeypatch.setattr(main, "STREAM_BATCH_SIZE", 2)
+
+    body = b'{"address": "Kothimir 504273"}\nnot json\n"Nowhere"\n{"address": \n"Rebbena 504273"\n'
+
+    async def collect():
+        records = iter_ndjson_records(iter_lines(_chunks(body, 3)))
+        return [json.loads(line) async for line in main.stream_matches(records, top_k=1, include_digipin=False)]
+
+    lines = asyncio.run(collect())
+    assert [line["row"] for line in lines[:-1]] == [1, 2, 3, 4, 5]
+    assert [bool(line.get("error")) for line in lines[:-1]] == [False, True, False, True, False]
+
+    summary = lines[-1]["summary"]
+    assert (summary["rows"], summary["matched"], summary["no_match"], summary["errors"]) == (5, 2, 1, 2)
@@ -0,0 +1,146 @@
+"""
+Golden-output tests for utils.text_processor
+
+The reference functions below are the original regex-chain normalizer;
+the optimized implementation must produce exactly the same strings.
+Run with: pytest test_text_processor.py
+"""
+import re
+import random
+
+import pandas as pd
+
+from utils.text_processor import (
+    ABBREVIATIONS,
+    normalize_text,
+    normalize_series,
+    expand_abbreviations,
+    extract_pincode,
+    remove_personal_info,
+    clean_address,
+    clean_addresses
+)
+
+
+def reference_normalize_text(text: str) -> str:
+    if not text:
+        return ""
+    text = text.lower()
+    text = re.sub(r'[^a-z0-9\s]', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def reference_expand_abbreviations(text: str) -> str:
+    expanded_words = []
+    for word in text.split():
+        if word.lower() in ABBREVIATIONS:
+            expanded_words.append(ABBREVIATIONS[word.lower()])
+        else:
+            expanded_words.append(word)
+    return ' '.join(expanded_words)
+
+
+def reference_remove_personal_info(text: str) -> str:
+    text = re.sub(r'\b\d{10}\b', '', text)
+    text = re.sub(r'\S+@\S+', '', text)
+    text = re.sub(r'\b[sdw]/o\s+\w+\s+\w+', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\b(mr|mrs|ms|dr|shri|smt)\.?\s+', '', text, flags=re.IGNORECASE)
+    return text
+
+
+def reference_clean_address(text: str) -> str:
+    if not text:
+        return ""
+    text = reference_remove_personal_info(text)
+    text = reference_normalize_text(text)
+    text = reference_expand_abbreviations(text)
+    return reference_normalize_text(text)
+
+
+GOLDEN_CASES = [
+    "",
+    " ",
+    "Kothimir PO, Asifabad Dist, TG-504273",
+    "koramangala bangalore 560034",
+    "Mr. John S/O Ram, Gurgaon Near DLF Phase 2, HR",
+    "Smt Lakshmi W/O Ravi Kumar, H.No 4-12, Nr Bus Stand, Rd No. 5, Hyderabad TG 500034",
+    "Dr.Sharma C/O Anil, 9876543210, anil@example.com, Sector 21 Noida UP 201301",
+    "s/o  9876543210 ram kumar village post",
+    "x@9876543210 Rohini DL 110085",
+    "PO: Dak Bhawan\tNew Delhi\n110001",
+    "FLAT 3B, BLDG 7, FLR 2, APT Sunrise, MG RD, Pune MH 411001",
+    "  Multiple   spaces\r\nand\x0btabs\x1c\x1dhere  ",
+    "Bengaluru – Karnataka · 560001",
+    "ÇAFÉ Strasse Nagar Ñ 400001",
+    "İstanbul Road Kolkata WB",
+    "K Kelvin Colony   Near Temple",
+    "१२३४५६ Devanagari digits ५६०००१",
+    "Shri Ram Mandir Marg, Ms Gupta D/O Om Prakash, Jaipur RJ",
+    "mr.", "MRS ", "S/O", "ho bo so", "OR AS UK or as uk",
+    "@@@ /// ... ---",
+    "12345678901 1234567890 123456 12345",
+]
+
+
+def random_addresses(count: int, seed: int = 7):
+    """Noisy synthetic addresses mixing abbreviations, punctuation and unicode"""
+    rng = random.Random(seed)
+    words = list(ABBREVIATIONS) + [
+        "Mr.", "Dr", "Smt.", "S/O", "d/o", "W/o", "a@b.c", "9876543210",
+        "560034", "Main", "Road", "Nagar", "Café", " ", "\t", "-", ",",
+        "#12", "Ward-3", "İ", "ß", " ", "१२३", "x/o", "ho.", "PO:"
+    ]
+    separators = [" ", "  ", ", ", "-", "\n", ""]
+    return [
+        "".join(rng.choice(words) + rng.choice(separators) for _ in range(rng.randint(0, 12)))
+        for _ in range(count)
+    ]
+
+
+def all_cases():
+    return GOLDEN_CASES + random_addresses(2000)
+
+
+def test_normalize_text_matches_reference():
+    for text in all_cases():
+        assert normalize_text(text) == reference_normalize_text(text), repr(text)
+
+
+def test_expand_abbreviations_matches_reference():
+    for text in all_cases():
+        assert expand_abbreviations(text) == reference_expand_abbreviations(text), repr(text)
+
+
+def test_remove_personal_info_matches_reference():
+    for text in all_cases():
+        assert remove_personal_info(text) == reference_remove_personal_info(text), repr(text)
+
+
+def test_clean_address_matches_reference():
+    for text in all_cases():
+        assert clean_address(text) == reference_clean_address(text), repr(text)
+
+
+def test_clean_addresses_matches_single_calls():
+    texts = all_cases()
+    texts = texts + texts[:100]
+    assert clean_addresses(texts) == [reference_clean_address(text) for text in texts]
+
+
+def test_normalize_series_matches_apply():
+    values = pd.Series(all_cases() * 2, index=range(100, 100 + 2 * len(all_cases())), name="search_text")
+    result = normalize_series(values)
+    assert result.index.equals(values.index)
+    assert result.name == "search_text"
+    assert result.tolist() == values.apply(reference_normalize_text).tolist()
+
+
+def test_normalize_series_missing_values():
+    values = pd.Series(["Delhi", None, float("nan"), "DELHI"])
+    assert normalize_series(values).tolist() == ["delhi", "", "", "delhi"]
+
+
+def test_extract_pincode():
+    assert extract_pincode("New Delhi 110001") == "110001"
+    assert extract_pincode("call 9876543210") == ""
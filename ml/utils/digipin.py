@@ -0,0 +1,148 @@
+"""
+Local DIGIPIN encoder/decoder
+
+Implements the public DIGIPIN grid algorithm (India Post / IIT Hyderabad)
+vectorized over NumPy arrays, so a whole column of coordinates can be
+encoded in a few milliseconds without calling the DIGIPIN API.
+"""
+from typing import Iterable, Tuple, Union
+import numpy as np
+
+# 4x4 symbol grid, row 0 is the northern-most band
+DIGIPIN_GRID = np.array([
+    ['F', 'C', '9', '8'],
+    ['J', '3', '2', '7'],
+    ['K', '4', '5', '6'],
+    ['L', 'M', 'P', 'T'],
+])
+
+# Bounding box covered by DIGIPIN
+MIN_LAT, MAX_LAT = 2.5, 38.5
+MIN_LON, MAX_LON = 63.5, 99.5
+
+DIGIPIN_LEVELS = 10
+INVALID_DIGIPIN = 'N/A'
+
+_GRID_BYTES = np.frombuffer(''.join(DIGIPIN_GRID.ravel()).encode('ascii'), dtype=np.uint8).reshape(4, 4)
+_SYMBOL_POSITIONS = {
+    symbol: (row, col)
+    for row in range(4)
+    for col, symbol in enumerate(DIGIPIN_GRID[row])
+}
+
+
+def encode_digipin(
+    latitude: Union[float, Iterable[float]],
+    longitude: Union[float, Iterable[float]]
+) -> np.ndarray:
+    """
+    Encode coordinates to DIGIPIN codes
+
+    Args:
+        latitude: Latitude value or array of latitudes
+        longitude: Longitude value or array of longitudes
+
+    Returns:
+        Array of DIGIPIN strings ('XXX-XXX-XXXX'); coordinates that are
+        missing or outside the DIGIPIN bounding box get 'N/A'
+    """
+    lat = np.atleast_1d(np.asarray(latitude, dtype=np.float64))
+    lon = np.atleast_1d(np.asarray(longitude, dtype=np.float64))
+
+    valid = (
+        np.isfinite(lat) & np.isfinite(lon) &
+        (lat >= MIN_LAT) & (lat <= MAX_LAT) &
+        (lon >= MIN_LON) & (lon <= MAX_LON)
+    )
+
+    n = len(lat)
+    min_lat = np.full(n, MIN_LAT)
+    max_lat = np.full(n, MAX_LAT)
+    min_lon = np.full(n, MIN_LON)
+    max_lon = np.full(n, MAX_LON)
+
+    # 10 symbols plus two '-' separators
+    codes = np.full((n, DIGIPIN_LEVELS + 2), ord('-'), dtype=np.uint8)
+
+    with np.errstate(invalid='ignore'):
+        pos = 0
+        for level in range(1, DIGIPIN_LEVELS + 1):
+            lat_div = (max_lat - min_lat) / 4
+            lon_div = (max_lon - min_lon) / 4
+
+            # Rows count down from the north edge
+            row = 3 - np.floor((lat - min_lat) / lat_div)
+            col = np.floor((lon - min_lon) / lon_div)
+            row = np.clip(np.nan_to_num(row), 0, 3).astype(np.intp)
+            col = np.clip(np.nan_to_num(col), 0, 3).astype(np.intp)
+
+            codes[:, pos] = _GRID_BYTES[row, col]
+            pos += 1
+            if level == 3 or level == 6:
+                pos += 1
+
+            # Narrow the bounding box to the selected cell
+            max_lat = min_lat + lat_div * (4 - row)
+            min_lat = min_lat + lat_div * (3 - row)
+            min_lon = min_lon + lon_div * col
+            max_lon = min_lon + lon_div
+
+    digipins = codes.view(f'S{DIGIPIN_LEVELS + 2}').ravel().astype(f'U{DIGIPIN_LEVELS + 2}')
+    digipins[~valid] = INVALID_DIGIPIN
+    return digipins
+
+
+def decode_digipin(digipins: Union[str, Iterable[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode DIGIPIN codes to the centre of their grid cell
+
+    Args:
+        digipins: DIGIPIN string or iterable of DIGIPIN strings
+
+    Returns:
+        Tuple of (latitudes, longitudes) arrays; invalid codes give NaN
+    """
+    if isinstance(digipins, str):
+        digipins = [digipins]
+
+    cleaned = [str(code).replace('-', '').upper() for code in digipins]
+    n = len(cleaned)
+
+    rows = np.zeros((n, DIGIPIN_LEVELS), dtype=np.intp)
+    cols = np.zeros((n, DIGIPIN_LEVELS), dtype=np.intp)
+    valid = np.ones(n, dtype=bool)
+
+    for i, code in enumerate(cleaned):
+        if len(code) != DIGIPIN_LEVELS:
+            valid[i] = False
+            continue
+        for j, symbol in enumerate(code):
+            position = _SYMBOL_POSITIONS.get(symbol)
+            if position is None:
+                valid[i] = False
+                break
+            rows[i, j], cols[i, j] = position
+
+    min_lat = np.full(n, MIN_LAT)
+    max_lat = np.full(n, MAX_LAT)
+    min_lon = np.full(n, MIN_LON)
+    max_lon = np.full(n, MAX_LON)
+
+    for j in range(DIGIPIN_LEVELS):
+        lat_div = (max_lat - min_lat) / 4
+        lon_div = (max_lon - min_lon) / 4
+
+        lat1 = max_lat - lat_div * (rows[:, j] + 1)
+        lat2 = max_lat - lat_div * rows[:, j]
+        lon1 = min_lon + lon_div * cols[:, j]
+        lon2 = min_lon + lon_div * (cols[:, j] + 1)
+
+        min_lat, max_lat = lat1, lat2
+        min_lon, max_lon = lon1, lon2
+
+    latitudes = (min_lat + max_lat) / 2
+    longitudes = (min_lon + max_lon) / 2
+    latitudes[~valid] = np.nan
+    longitudes[~valid] = np.nan
+
+    return latitudes, longitudes
@@ -0,0 +1,134 @@
+"""
+Background workers that process batch matching jobs from a JobStore
+"""
+import time
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from utils.job_store import JobStore
+
+# match_fn(texts, top_k, include_digipin) -> results in input order
+MatchFn = Callable[[List[str], int, bool], Awaitable[List[Dict]]]
+
+# Seconds between stale-job and retention sweeps
+MAINTENANCE_INTERVAL = 60
+
+
+class JobRunner:
+    """
+    Asyncio workers that drain queued jobs chunk by chunk
+
+    Each chunk of `chunk_size` rows is matched through `match_fn` (the
+    service's batched path) and its results are committed before the next
+    chunk starts, so progress is visible while a job runs and a cancel
+    takes effect at the next chunk boundary. Jobs left running by a
+    crashed or restarted process are requeued once their heartbeat is
+    older than `stale_after` seconds and resume from their first
+    unmatched row.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        match_fn: MatchFn,
+        workers: int = 1,
+        chunk_size: int = 256,
+        poll_interval: float = 1.0,
+        stale_after: float = 300,
+        retention: float = 86400
+    ):
+        self.store = store
+        self.match_fn = match_fn
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.retention = retention
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._active: Dict[int, Optional[str]] = {}
+
+    def start(self, requeue_running: bool = False):
+        """
+        Start the worker tasks
+
+        Args:
+            requeue_running: Requeue every running job immediately; only
+                safe when this is the only process using the store
+        """
+        if requeue_running:
+            self.store.requeue_stale(0)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self):
+        """Cancel the workers; interrupted jobs stay running and are requeued later"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """Wake idle workers after a job is submitted"""
+        self._wakeup.set()
+
+    async def _worker(self, worker_id: int):
+        last_maintenance = 0.0
+        while True:
+            if time.time() - last_maintenance > MAINTENANCE_INTERVAL:
+                last_maintenance = time.time()
+                await asyncio.to_thread(self.store.requeue_stale, self.stale_after)
+                await asyncio.to_thread(self.store.purge_finished, self.retention)
+
+            job = await asyncio.to_thread(self.store.claim_next)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._active[worker_id] = job["job_id"]
+            try:
+                await self._process(job)
+            finally:
+                self._active[worker_id] = None
+
+    async def _process(self, job: Dict):
+        """Match a job's unmatched rows chunk by chunk until done or cancelled"""
+        job_id, claim = job["job_id"], job["claim"]
+        try:
+            while True:
+                items = await asyncio.to_thread(self.store.pending_items, job_id, self.chunk_size)
+                if not items:
+                    await asyncio.to_thread(self.store.finish_job, job_id, claim, "completed")
+                    return
+
+                results = await self.match_fn(
+                    [query for _, query in items],
+                    job["top_k"],
+                    job["include_digipin"]
+                )
+                saved = await asyncio.to_thread(
+                    self.store.save_results,
+                    job_id,
+                    claim,
+                    [(row, result) for (row, _), result in zip(items, results)]
+                )
+                if not saved:
+                    # Cancelled, or requeued and claimed by another worker,
+                    # while this chunk was matching
+                    return
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await asyncio.to_thread(self.store.finish_job, job_id, claim, "failed", f"Matching failed: {str(e)}")
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "chunk_size": self.chunk_size,
+            "active_jobs": [job_id for job_id in self._active.values() if job_id],
+            "jobs": self.store.stats()
+        }
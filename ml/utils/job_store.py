@@ -0,0 +1,250 @@
+"""
+SQLite store for asynchronous batch matching jobs
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+JOB_STATUSES = ("queued", "running", "completed", "failed", "cancelled")
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    processed INTEGER NOT NULL DEFAULT 0,
+    matched INTEGER NOT NULL DEFAULT 0,
+    top_k INTEGER NOT NULL,
+    include_digipin INTEGER NOT NULL,
+    error TEXT,
+    claim TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    query TEXT NOT NULL,
+    result TEXT,
+    PRIMARY KEY (job_id, row)
+) WITHOUT ROWID;
+"""
+
+
+class JobStore:
+    """
+    Job state, progress and per-row results in a local SQLite database
+
+    Each job row tracks its status and progress counters; each input
+    address is a job_items row whose result is filled in as it is
+    matched, so finished work survives restarts and lost connections.
+    The database runs in WAL mode, so several service workers can share
+    one file: jobs are claimed atomically and a running job's
+    `updated_at` acts as a heartbeat. Each claim gets a fresh token that
+    writes must present, so a worker whose job was requeued and claimed
+    by another cannot write to it any more.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "claim" not in columns:
+            # Databases created before claim tokens
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN claim TEXT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def create_job(self, texts: List[str], top_k: int, include_digipin: bool) -> Dict:
+        """Store a new queued job and its input rows"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, total, top_k, include_digipin, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, len(texts), top_k, int(include_digipin), now, now)
+            )
+            self._conn.executemany(
+                "INSERT INTO job_items (job_id, row, query) VALUES (?, ?, ?)",
+                ((job_id, row, text) for row, text in enumerate(texts))
+            )
+        return self.get_job(job_id)
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Job status and progress, or None if unknown"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job_dict(row) if row else None
+
+    def claim_next(self) -> Optional[Dict]:
+        """
+        Atomically move the oldest queued job to running and return it
+
+        Returns:
+            The job with its `claim` token (pass it to save_results and
+            finish_job), or None if no job is queued
+        """
+        now = time.time()
+        claim = uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', claim = ?, started_at = COALESCE(started_at, ?), updated_at = ? "
+                "WHERE id = ?",
+                (claim, now, now, row["id"])
+            )
+        return {**self.get_job(row["id"]), "claim": claim}
+
+    def pending_items(self, job_id: str, limit: int) -> List[Tuple[int, str]]:
+        """Next (row, query) pairs of a job that have no result yet"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT row, query FROM job_items WHERE job_id = ? AND result IS NULL ORDER BY row LIMIT ?",
+                (job_id, limit)
+            ).fetchall()
+        return [(row["row"], row["query"]) for row in rows]
+
+    def save_results(self, job_id: str, claim: str, results: List[Tuple[int, Dict]]) -> bool:
+        """
+        Store matched rows and advance the job's progress
+
+        Only rows without a result are written and counted, so progress
+        never counts a row twice.
+
+        Args:
+            job_id: Job the rows belong to
+            claim: Token returned by claim_next
+            results: (row, result) pairs
+
+        Returns:
+            False if the job is no longer running under this claim
+            (cancelled, or requeued and claimed again), in which case
+            nothing is written
+        """
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            owned = self._conn.execute(
+                "SELECT 1 FROM jobs WHERE id = ? AND status = 'running' AND claim = ?",
+                (job_id, claim)
+            ).fetchone()
+            if owned is None:
+                return False
+
+            processed = matched = 0
+            for row, result in results:
+                written = self._conn.execute(
+                    "UPDATE job_items SET result = ? WHERE job_id = ? AND row = ? AND result IS NULL",
+                    (json.dumps(result, ensure_ascii=False), job_id, row)
+                ).rowcount
+                processed += written
+                matched += written if result.get("matches") else 0
+
+            self._conn.execute(
+                "UPDATE jobs SET processed = processed + ?, matched = matched + ?, updated_at = ? WHERE id = ?",
+                (processed, matched, time.time(), job_id)
+            )
+        return True
+
+    def finish_job(self, job_id: str, claim: str, status: str, error: Optional[str] = None):
+        """Mark a job running under this claim completed or failed"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'running' AND claim = ?",
+                (status, error, now, now, job_id, claim)
+            )
+
+    def cancel_job(self, job_id: str) -> Optional[Dict]:
+        """Cancel a queued or running job; finished results are kept"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ?, updated_at = ? "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                (now, now, job_id)
+            )
+        return self.get_job(job_id)
+
+    def get_results(self, job_id: str, offset: int, limit: int) -> List[Dict]:
+        """One page of a job's rows in input order (result is None until matched)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT row, query, result FROM job_items WHERE job_id = ? AND row >= ? ORDER BY row LIMIT ?",
+                (job_id, offset, limit)
+            ).fetchall()
+        return [
+            {
+                "row": row["row"],
+                "query": row["query"],
+                "result": json.loads(row["result"]) if row["result"] else None
+            }
+            for row in rows
+        ]
+
+    def requeue_stale(self, stale_after: float) -> int:
+        """Return running jobs without a heartbeat (crashed worker) to the queue"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE jobs SET status = 'queued', claim = NULL WHERE status = 'running' AND updated_at < ?",
+                (time.time() - stale_after,)
+            ).rowcount
+
+    def purge_finished(self, older_than: float) -> int:
+        """Delete finished jobs (and their rows) older than `older_than` seconds"""
+        cutoff = time.time() - older_than
+        placeholders = ", ".join("?" for _ in FINISHED_STATUSES)
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            ids = [
+                row["id"] for row in self._conn.execute(
+                    f"SELECT id FROM jobs WHERE status IN ({placeholders}) AND finished_at < ?",
+                    (*FINISHED_STATUSES, cutoff)
+                )
+            ]
+            for job_id in ids:
+                self._conn.execute("DELETE FROM job_items WHERE job_id = ?", (job_id,))
+                self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return len(ids)
+
+    def stats(self) -> Dict:
+        """Job counts by status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+
+def _job_dict(row: sqlite3.Row) -> Dict:
+    job = dict(row)
+    job.pop("claim", None)
+    job = {"job_id": job.pop("id"), **job}
+    job["include_digipin"] = bool(job["include_digipin"])
+    job["progress"] = round(job["processed"] / job["total"], 4) if job["total"] else 1.0
+    return job
@@ -0,0 +1,316 @@
+"""
+Minimal Prometheus metrics: counters, histograms and scrape-time gauges
+
+Kept dependency-free; values are rendered in the Prometheus text
+exposition format (version 0.0.4) by MetricsRegistry.render(), or merged
+across worker processes by MultiProcessMetrics.render().
+"""
+import os
+import glob
+import json
+import math
+import time
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from sub-millisecond lookups to slow OCR
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+LabelValues = Tuple[str, ...]
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_values(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[Tuple[str, Dict, float]]:
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Histogram:
+    """
+    Cumulative histogram with optional labels
+
+    observe() is a lock, a bisect and three additions, so it is cheap
+    enough to call on every request.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_values(self.labelnames, labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [per-bucket counts (last is +Inf), sum, count]
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> List[Tuple[str, Dict, float]]:
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+
+        samples = []
+        for key, counts, total, count in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class Gauge:
+    """
+    Value read from a callback at scrape time
+
+    The callback returns a number, or a dict mapping label-value tuples to
+    numbers; None skips the metric (e.g. before startup finishes). Use
+    type="counter" for totals kept elsewhere, such as executor counters.
+    """
+
+    def __init__(self, name: str, help: str, fn: Callable, labelnames: Iterable[str] = (), type: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+        self.type = type
+
+    def samples(self) -> List[Tuple[str, Dict, float]]:
+        value = self.fn()
+        if value is None:
+            return []
+        if not isinstance(value, dict):
+            return [(self.name, {}, value)]
+        return [
+            (self.name, dict(zip(self.labelnames, key if isinstance(key, tuple) else (key,))), v)
+            for key, v in value.items()
+        ]
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together on /metrics"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        fn: Callable,
+        labelnames: Iterable[str] = (),
+        type: str = "gauge"
+    ) -> Gauge:
+        return self.register(Gauge(name, help, fn, labelnames, type))
+
+    def collect(self) -> List[Dict]:
+        """Current samples of every metric, with its name, help and type"""
+        collected = []
+        for metric in self._metrics:
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                # A failing gauge must not break the whole scrape
+                print(f"⚠️  Failed to collect {metric.name}: {e}")
+                continue
+            collected.append({"name": metric.name, "help": metric.help, "type": metric.type, "samples": samples})
+        return collected
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format"""
+        return _render(self.collect())
+
+
+class MultiProcessMetrics:
+    """
+    Registry aggregated across worker processes through a shared directory
+
+    Every worker writes a snapshot of its samples to <path>/<pid>.json,
+    every few seconds and before answering a scrape, and a scrape merges
+    all snapshots, so any worker returns service-wide values:
+    - counters and histograms are summed over every worker that wrote a
+      snapshot, including dead ones, so totals survive worker restarts
+    - gauges get a `worker` label (the pid) and only live workers are shown
+
+    Values of other workers are at most one write interval old. The
+    directory must be emptied before the workers start (see clear()).
+    """
+
+    def __init__(self, registry: MetricsRegistry, path: str):
+        self.registry = registry
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def write(self):
+        """Write this worker's snapshot, replacing its previous one"""
+        pid = os.getpid()
+        snapshot_path = os.path.join(self.path, f"{pid}.json")
+        tmp_path = f"{snapshot_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"pid": pid, "metrics": self.registry.collect()}, f)
+        os.replace(tmp_path, snapshot_path)
+
+    def render(self) -> str:
+        """Metrics of all workers in the Prometheus text format"""
+        self.write()
+
+        merged: Dict[str, Dict] = {}
+        for snapshot in self._snapshots():
+            alive = _process_alive(snapshot["pid"])
+            for metric in snapshot["metrics"]:
+                is_gauge = metric["type"] == "gauge"
+                if is_gauge and not alive:
+                    continue
+                entry = merged.setdefault(metric["name"], {**metric, "samples": {}})
+                for name, labels, value in metric["samples"]:
+                    if is_gauge:
+                        labels = {**labels, "worker": str(snapshot["pid"])}
+                    key = (name, tuple(labels.items()))
+                    entry["samples"][key] = entry["samples"].get(key, 0) + value
+
+        return _render([
+            {**metric, "samples": [(name, dict(labels), value) for (name, labels), value in metric["samples"].items()]}
+            for metric in merged.values()
+        ])
+
+    def _snapshots(self) -> List[Dict]:
+        """Snapshots of all workers, this one first so its metric order wins"""
+        own = os.path.join(self.path, f"{os.getpid()}.json")
+        paths = sorted(glob.glob(os.path.join(self.path, "*.json")), key=lambda path: path != own)
+        snapshots = []
+        for path in paths:
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Skipping metrics snapshot {path}: {e}")
+        return snapshots
+
+    @staticmethod
+    def clear(path: str):
+        """Remove the snapshots of a previous run"""
+        for snapshot_path in glob.glob(os.path.join(path, "*.json*")):
+            os.remove(snapshot_path)
+
+
+class StageClock:
+    """
+    Accumulates elapsed time per pipeline stage between laps
+
+    Each lap() charges the time since the previous lap to the named stage,
+    so interleaved per-query stages of a batch add up without nesting
+    timers.
+    """
+
+    __slots__ = ("totals", "_last")
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.totals[stage] = self.totals.get(stage, 0.0) + now - self._last
+        self._last = now
+
+
+def _render(metrics: List[Dict]) -> str:
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric['name']} {metric['help']}")
+        lines.append(f"# TYPE {metric['name']} {metric['type']}")
+        for name, labels, value in metric["samples"]:
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _label_values(labelnames: Tuple[str, ...], labels: Dict) -> LabelValues:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labels: Dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int) or (isinstance(value, float) and value.is_integer()):
+        return str(int(value))
+    return repr(float(value))
+
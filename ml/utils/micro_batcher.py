@@ -0,0 +1,126 @@
+"""
+Micro-batching of concurrent single-address match requests
+"""
+import asyncio
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from utils.workers import BoundedExecutor
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent match calls into one batched call
+
+    Calls arriving within `max_wait_ms` of the first pending call (and with
+    the same top_k / include_digipin) are grouped, up to `max_batch_size`,
+    and resolved by a single `batch_fn(texts, top_k, include_digipin)` call
+    on the executor: one model.encode and one index.search for the group.
+    Each caller then receives its own result.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable,
+        executor: BoundedExecutor,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            batch_fn: Function taking (queries, top_k=, include_digipin=) and
+                      returning one result per query, in order
+            executor: Executor the batched calls run on
+            max_batch_size: Flush as soon as this many calls are pending
+            max_wait_ms: Longest a call waits for others to join its batch
+            timeout: Seconds a batched call may run (defaults to the executor's)
+        """
+        self.batch_fn = batch_fn
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.timeout = timeout
+
+        self._pending: Dict[Tuple, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[Tuple, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+
+    async def submit(self, query_text: str, top_k: int = 5, include_digipin: bool = True) -> Dict:
+        """
+        Queue one match and wait for its result
+
+        Raises:
+            ExecutorSaturated: If the executor rejected the batch
+            asyncio.TimeoutError: If the batch did not finish in time
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (top_k, include_digipin)
+
+        batch = self._pending.setdefault(key, [])
+        batch.append((query_text, future))
+
+        if len(batch) >= self.max_batch_size:
+            self._flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: Tuple):
+        """Dispatch all pending calls for key as one batch"""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+
+        self.requests += len(batch)
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+        # Keep a reference so the task is not garbage-collected mid-flight
+        task = asyncio.ensure_future(self._run(batch, *key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]], top_k: int, include_digipin: bool):
+        """Run a batch on the executor and hand each caller its result"""
+        try:
+            results = await self.executor.run(
+                self.batch_fn,
+                [text for text, _ in batch],
+                top_k=top_k,
+                include_digipin=include_digipin,
+                timeout=self.timeout
+            )
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            # Callers that disconnected have cancelled their future
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        """Return batching counters for health reporting"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch
+        }
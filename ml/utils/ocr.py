@@ -3,10 +3,62 @@ OCR utilities for extracting text from images
 """
 import os
 import io
-from typing import Tuple
+import time
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter
 import pytesseract
 
+try:
+    # Optional: binds libtesseract directly, so an engine stays loaded
+    # between images instead of spawning a tesseract process per call
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+OCR_ENGINES = ('auto', 'tesserocr', 'pytesseract')
+OCR_LANG = 'eng'
+
+# Bump whenever preprocessing or text extraction changes, so persisted OCR
+# cache entries from the old pipeline are not reused
+OCR_PIPELINE_VERSION = 2
+
+# Tiers tried in order per OCR mode; a tier's result is accepted once its
+# mean word confidence reaches the threshold
+OCR_MODES = {
+    'tiered': ('region', 'fast', 'full', 'sparse'),
+    'full': ('full',)
+}
+
+# Longest side of the image read by the fast tier
+FAST_MAX_SIDE = 1600
+
+# Tesseract page segmentation mode of the sparse tier: find as much text
+# as possible in no particular order (scattered label fields)
+SPARSE_PSM = 11
+
+# Address-block detection runs on a copy with this longest side, split
+# into square cells of REGION_CELL pixels
+REGION_WORK_SIDE = 1000
+REGION_CELL = 8
+
+# A cell holds text when this share of its pixels are stroke edges: less
+# is blank paper, more is photo texture or a filled graphic
+REGION_MIN_DENSITY = 0.08
+REGION_MAX_DENSITY = 0.6
+
+# Cells whose horizontal and vertical contrast differ by more than this
+# factor are barcode bars or ruled lines, not text
+REGION_MAX_ANISOTROPY = 3.0
+
+# Crops covering more of the image than this are not worth it
+REGION_MAX_AREA = 0.8
+
+# Box as (left, top, right, bottom) in image pixels
+Box = Tuple[int, int, int, int]
+
 # Configure Tesseract path for different OS
 if os.name == "nt":  # Windows
     tesseract_path = os.getenv("TESSERACT_PATH", r"C:\Program Files\Tesseract-OCR\tesseract.exe")
@@ -24,6 +76,177 @@ elif os.name == "posix":  # Linux/Mac
             pytesseract.pytesseract.tesseract_cmd = path
             break
 
+# Called as stage_observer(stage, seconds) for each OCR stage; set by the
+# service for metrics (not propagated to OCR worker processes)
+stage_observer: Optional[Callable[[str, float], None]] = None
+
+
+def set_stage_observer(observer: Optional[Callable[[str, float], None]]):
+    """Install (or remove with None) the OCR stage timing hook"""
+    global stage_observer
+    stage_observer = observer
+
+
+def _observe(stage: str, start: float) -> float:
+    """Report the time since `start` for a stage; returns the current time"""
+    now = time.perf_counter()
+    if stage_observer is not None:
+        stage_observer(stage, now - start)
+    return now
+
+
+# Engine used by this process; set per worker by init_ocr_worker()
+ocr_engine = 'pytesseract'
+
+# Seconds one OCR call may spend in Tesseract (None = no limit); set per
+# worker by init_ocr_worker(), so a stuck image frees its worker
+ocr_timeout: Optional[float] = None
+
+# One tesserocr API per worker thread (an API instance is not thread-safe)
+_local = threading.local()
+
+
+class OCRTimeout(Exception):
+    """Raised when Tesseract is stopped at the OCR time limit"""
+
+
+def resolve_ocr_engine(engine: str = 'auto') -> str:
+    """
+    Pick the OCR engine to use
+    
+    Args:
+        engine: 'tesserocr', 'pytesseract' or 'auto' (tesserocr if installed)
+        
+    Returns:
+        'tesserocr' or 'pytesseract'
+    """
+    if engine not in OCR_ENGINES:
+        raise ValueError(f"Unknown OCR engine '{engine}', expected one of {OCR_ENGINES}")
+    if engine == 'tesserocr' and tesserocr is None:
+        raise ValueError("OCR_ENGINE=tesserocr requires the tesserocr package (pip install tesserocr)")
+    if engine == 'auto':
+        return 'tesserocr' if tesserocr is not None else 'pytesseract'
+    return engine
+
+
+def init_ocr_worker(engine: str = 'pytesseract', timeout: Optional[float] = None):
+    """
+    OCR pool initializer: select the engine and load it up front
+    
+    Runs once in each worker thread or process, so the Tesseract model is
+    loaded when the pool starts rather than on every image.
+    
+    Args:
+        engine: 'tesserocr' or 'pytesseract'
+        timeout: Seconds one extraction call may spend in Tesseract
+    """
+    global ocr_engine, ocr_timeout
+    ocr_engine = engine
+    ocr_timeout = timeout if timeout and timeout > 0 else None
+    if engine == 'tesserocr':
+        _get_api()
+
+
+def _get_api():
+    """This thread's persistent tesserocr engine, created on first use"""
+    api = getattr(_local, 'api', None)
+    if api is None:
+        api = _local.api = tesserocr.PyTessBaseAPI(lang=OCR_LANG)
+    return api
+
+
+def _deadline() -> Optional[float]:
+    """time.perf_counter() value at which this call's OCR is stopped"""
+    return time.perf_counter() + ocr_timeout if ocr_timeout else None
+
+
+def _time_left(deadline: Optional[float]) -> Optional[float]:
+    """Seconds until deadline (None = no limit); raises OCRTimeout once passed"""
+    if deadline is None:
+        return None
+    remaining = deadline - time.perf_counter()
+    if remaining <= 0:
+        raise OCRTimeout(f"OCR exceeded {ocr_timeout}s")
+    return remaining
+
+
+def _tesserocr_recognize(api, deadline: Optional[float]):
+    """Run recognition, stopped by Tesseract itself at the deadline"""
+    remaining = _time_left(deadline)
+    # tesserocr takes milliseconds; 0 means no limit
+    timeout_ms = 0 if remaining is None else max(1, int(remaining * 1000))
+    if not api.Recognize(timeout=timeout_ms):
+        raise OCRTimeout(f"OCR exceeded {ocr_timeout}s")
+
+
+def _pytesseract_call(fn: Callable, *args, deadline: Optional[float], **kwargs):
+    """Call pytesseract, which kills the tesseract process at the deadline"""
+    remaining = _time_left(deadline)
+    try:
+        return fn(*args, timeout=remaining or 0, **kwargs)
+    except RuntimeError as e:
+        if 'timeout' in str(e).lower():
+            raise OCRTimeout(f"OCR exceeded {ocr_timeout}s")
+        raise
+
+
+def _recognize_words(
+    image: Image.Image,
+    psm: Optional[int] = None,
+    deadline: Optional[float] = None
+) -> List[Tuple[str, float]]:
+    """
+    Recognized (word, confidence 0-100) pairs; confidence <= 0 marks non-words
+    
+    Args:
+        image: Image to read
+        psm: Tesseract page segmentation mode (None = automatic)
+        deadline: time.perf_counter() value at which OCR is stopped
+    """
+    if ocr_engine == 'tesserocr':
+        api = _get_api()
+        try:
+            if psm is not None:
+                api.SetPageSegMode(psm)
+            api.SetImage(image)
+            _tesserocr_recognize(api, deadline)
+            iterator = api.GetIterator()
+            if iterator is None:
+                return []
+            level = tesserocr.RIL.WORD
+            return [
+                (word.GetUTF8Text(level) or '', word.Confidence(level))
+                for word in tesserocr.iterate_level(iterator, level)
+            ]
+        finally:
+            api.Clear()
+            if psm is not None:
+                api.SetPageSegMode(tesserocr.PSM.AUTO)
+    
+    ocr_data = _pytesseract_call(
+        pytesseract.image_to_data,
+        image,
+        lang=OCR_LANG,
+        config=f'--psm {psm}' if psm is not None else '',
+        output_type=pytesseract.Output.DICT,
+        deadline=deadline
+    )
+    return list(zip(ocr_data['text'], ocr_data['conf']))
+
+
+def _recognize_text(image: Image.Image, deadline: Optional[float] = None) -> str:
+    """Plain text of an image, without word confidences"""
+    if ocr_engine == 'tesserocr':
+        api = _get_api()
+        try:
+            api.SetImage(image)
+            _tesserocr_recognize(api, deadline)
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+    
+    return _pytesseract_call(pytesseract.image_to_string, image, lang=OCR_LANG, deadline=deadline)
+
 
 def preprocess_image(image: Image.Image) -> Image.Image:
     """
@@ -59,62 +282,311 @@ def preprocess_image(image: Image.Image) -> Image.Image:
     return image
 
 
-def extract_text_from_image(image_bytes: bytes) -> Tuple[str, float]:
+def light_preprocess(image: Image.Image, max_side: int = FAST_MAX_SIDE) -> Image.Image:
+    """
+    Cheap preparation for the fast tier: grayscale, bounded size
+    
+    Args:
+        image: PIL Image object
+        max_side: Longest side after downscaling (images are never enlarged)
+        
+    Returns:
+        Grayscale PIL Image
+    """
+    image = image.convert('L')
+    width, height = image.size
+    if max(width, height) > max_side:
+        scale_factor = max_side / max(width, height)
+        new_size = (max(1, int(width * scale_factor)), max(1, int(height * scale_factor)))
+        image = image.resize(new_size, Image.Resampling.BILINEAR)
+    return image
+
+
+def _otsu_threshold(values: np.ndarray) -> int:
+    """Otsu's threshold of 8-bit values (maximizes between-class variance)"""
+    histogram = np.bincount(values.ravel(), minlength=256).astype(np.float64)
+    total = histogram.sum()
+    weight_low = np.cumsum(histogram)
+    mean_low = np.cumsum(histogram * np.arange(256))
+    weight_high = total - weight_low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = (mean_low[-1] * weight_low - mean_low * total) ** 2 / (weight_low * weight_high)
+    # Uniform images have no split; every candidate is NaN
+    return int(np.argmax(np.nan_to_num(variance, nan=-1.0)))
+
+
+def _morphological_gradient(pixels: np.ndarray) -> np.ndarray:
+    """3x3 max minus 3x3 min of a grayscale array (dilation - erosion)"""
+    height, width = pixels.shape
+    padded = np.pad(pixels, 1, mode='edge')
+    high = pixels.copy()
+    low = pixels.copy()
+    for dy in range(3):
+        for dx in range(3):
+            window = padded[dy:dy + height, dx:dx + width]
+            np.maximum(high, window, out=high)
+            np.minimum(low, window, out=low)
+    return high - low
+
+
+def _cell_mean(values: np.ndarray, rows: int, cols: int) -> np.ndarray:
+    """Mean of `values` over each REGION_CELL x REGION_CELL cell"""
+    values = values[:rows * REGION_CELL, :cols * REGION_CELL]
+    return values.reshape(rows, REGION_CELL, cols, REGION_CELL).mean(axis=(1, 3))
+
+
+def _dilate(mask: np.ndarray, rows: int, cols: int) -> np.ndarray:
+    """Grow a boolean grid by `rows` cells vertically and `cols` horizontally"""
+    padded = np.pad(mask, ((rows, rows), (cols, cols)))
+    height, width = mask.shape
+    out = np.zeros_like(mask)
+    for dy in range(2 * rows + 1):
+        for dx in range(2 * cols + 1):
+            out |= padded[dy:dy + height, dx:dx + width]
+    return out
+
+
+def _components(mask: np.ndarray) -> List[List[Tuple[int, int]]]:
+    """4-connected components of a boolean grid, as lists of (row, col) cells"""
+    seen = np.zeros_like(mask)
+    height, width = mask.shape
+    components = []
+    for row, col in zip(*np.nonzero(mask)):
+        if seen[row, col]:
+            continue
+        seen[row, col] = True
+        cells = []
+        queue = deque([(row, col)])
+        while queue:
+            r, c = queue.popleft()
+            cells.append((r, c))
+            for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                if 0 <= nr < height and 0 <= nc < width and mask[nr, nc] and not seen[nr, nc]:
+                    seen[nr, nc] = True
+                    queue.append((nr, nc))
+        components.append(cells)
+    return components
+
+
+def find_address_region(image: Image.Image) -> Optional[Box]:
+    """
+    Locate the likely delivery-address block of a parcel photo
+    
+    Classical layout analysis on a downscaled copy: a morphological
+    gradient (3x3 max - min) highlights character strokes, Otsu's
+    threshold turns it into an edge mask, and cells with a text-like edge
+    density are kept, minus barcode cells (contrast in one direction
+    only). Kept cells are dilated so characters merge into lines and
+    lines into blocks; the connected block with the most text cells is
+    taken as the address.
+    
+    Args:
+        image: PIL Image object
+        
+    Returns:
+        Crop box in image pixels, or None when no block stands out (no
+        text found, or the block covers most of the image anyway)
+    """
+    width, height = image.size
+    if image.mode not in ('L', 'RGB'):
+        image = image.convert('L')
+    # Box-filter most of the way down (cheap), then resize the rest
+    factor = max(width, height) // REGION_WORK_SIDE
+    if factor >= 2:
+        image = image.reduce(factor)
+    gray = image.convert('L')
+    if max(gray.size) > REGION_WORK_SIDE:
+        ratio = REGION_WORK_SIDE / max(gray.size)
+        gray = gray.resize(
+            (max(1, int(gray.size[0] * ratio)), max(1, int(gray.size[1] * ratio))),
+            Image.Resampling.BILINEAR
+        )
+    
+    rows, cols = gray.size[1] // REGION_CELL, gray.size[0] // REGION_CELL
+    if rows < 2 or cols < 2:
+        return None
+    
+    # Edge mask from the morphological gradient
+    pixels = np.asarray(gray, dtype=np.int16)
+    gradient = _morphological_gradient(pixels).astype(np.uint8)
+    edges = gradient > max(_otsu_threshold(gradient), 24)
+    density = _cell_mean(edges, rows, cols)
+    
+    # Contrast across columns vs across rows, per cell
+    across_cols = np.zeros(pixels.shape, dtype=np.float32)
+    across_rows = np.zeros(pixels.shape, dtype=np.float32)
+    across_cols[:, 1:] = np.abs(np.diff(pixels, axis=1))
+    across_rows[1:, :] = np.abs(np.diff(pixels, axis=0))
+    energy_x = _cell_mean(across_cols, rows, cols) + 1.0
+    energy_y = _cell_mean(across_rows, rows, cols) + 1.0
+    anisotropy = np.maximum(energy_x / energy_y, energy_y / energy_x)
+    
+    text = (
+        (density >= REGION_MIN_DENSITY)
+        & (density <= REGION_MAX_DENSITY)
+        & (anisotropy <= REGION_MAX_ANISOTROPY)
+    )
+    if not text.any():
+        return None
+    
+    # Merge characters into lines (wide) and lines into blocks (tall)
+    blocks = _dilate(text, 1, 2)
+    best = None
+    for cells in _components(blocks):
+        cell_rows = [r for r, _ in cells]
+        cell_cols = [c for _, c in cells]
+        top, bottom = min(cell_rows), max(cell_rows) + 1
+        left, right = min(cell_cols), max(cell_cols) + 1
+        # Address blocks span several lines and some width
+        if bottom - top < 3 or right - left < 6:
+            continue
+        score = int(text[top:bottom, left:right].sum())
+        if best is None or score > best[0]:
+            best = (score, left, top, right, bottom)
+    if best is None:
+        return None
+    
+    # Back to image pixels, with a one-cell margin
+    _, left, top, right, bottom = best
+    to_x = REGION_CELL * width / gray.size[0]
+    to_y = REGION_CELL * height / gray.size[1]
+    box = (
+        max(0, int((left - 1) * to_x)),
+        max(0, int((top - 1) * to_y)),
+        min(width, int((right + 1) * to_x)),
+        min(height, int((bottom + 1) * to_y))
+    )
+    if (box[2] - box[0]) * (box[3] - box[1]) > REGION_MAX_AREA * width * height:
+        return None
+    return box
+
+
+def _summarize_words(words: List[Tuple[str, float]]) -> Tuple[str, float]:
+    """Joined text and mean confidence (0-1) of the valid recognized words"""
+    text_parts = []
+    confidences = []
+    
+    for word, conf in words:
+        if int(conf) > 0:  # Valid confidence
+            text = word.strip()
+            if text:
+                text_parts.append(text)
+                confidences.append(int(conf))
+    
+    # Calculate average confidence
+    avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    return ' '.join(text_parts), avg_confidence / 100.0  # Convert to 0-1 scale
+
+
+def extract_text_tiered(
+    image_bytes: bytes,
+    tiers: Tuple[str, ...] = OCR_MODES['tiered'],
+    min_confidence: float = 0.8
+) -> Tuple[str, float, Dict]:
     """
-    Extract text from image using OCR
+    Extract text with a cascade of increasingly expensive OCR passes
+    
+    Tiers run in order and stop at the first whose mean word confidence
+    reaches `min_confidence`:
+    - region: the fast-tier treatment of just the detected address block
+      (find_address_region); skipped when no block stands out
+    - fast: grayscale, size-bounded image, automatic page segmentation
+    - full: preprocess_image (contrast, sharpening, denoising, upscaling)
+    - sparse: the full-tier image read as sparse text (PSM 11)
+    If no tier reaches the threshold, the most confident result is used.
+    All tiers share the worker's time limit (`ocr_timeout`); when it runs
+    out, Tesseract is stopped and OCRTimeout is raised.
     
     Args:
         image_bytes: Image file bytes
+        tiers: Tier names to try, in order
+        min_confidence: Confidence (0-1) at which a tier's result is accepted
         
     Returns:
-        Tuple of (extracted_text, confidence_score)
+        Tuple of (extracted_text, confidence_score, details) where details
+        holds the producing `tier`, `tier_ms` (the time spent per tier) and
+        the address `region` box when one was detected
     """
+    tier_ms = {}
+    region = None
+    deadline = _deadline()
     try:
         # Load image
         image = Image.open(io.BytesIO(image_bytes))
+        image.load()
         
-        # Preprocess image
-        processed_image = preprocess_image(image)
-        
-        # Perform OCR with detailed output
-        ocr_data = pytesseract.image_to_data(
-            processed_image,
-            lang='eng',
-            output_type=pytesseract.Output.DICT
-        )
+        best = None
+        full_image = None
+        for tier in tiers:
+            tier_start = start = time.perf_counter()
+            
+            # Prepare the tier's image (the heavy preprocessing runs once)
+            if tier == 'region':
+                region = find_address_region(image)
+                if region is None:
+                    _observe('ocr_region', tier_start)
+                    tier_ms[tier] = round((time.perf_counter() - tier_start) * 1000, 2)
+                    continue
+                prepared = light_preprocess(image.crop(region))
+            elif tier == 'fast':
+                prepared = light_preprocess(image)
+            else:
+                if full_image is None:
+                    full_image = preprocess_image(image)
+                prepared = full_image
+            start = _observe('ocr_preprocess', start)
+            
+            # Perform OCR with per-word confidences
+            words = _recognize_words(prepared, SPARSE_PSM if tier == 'sparse' else None, deadline)
+            _observe('ocr_recognize', start)
+            
+            text, confidence = _summarize_words(words)
+            _observe(f'ocr_{tier}', tier_start)
+            tier_ms[tier] = round((time.perf_counter() - tier_start) * 1000, 2)
+            
+            if best is None or confidence > best[1]:
+                best = (text, confidence, tier)
+            if confidence >= min_confidence:
+                break
         
-        # Extract text and calculate confidence
-        text_parts = []
-        confidences = []
-        
-        for i, conf in enumerate(ocr_data['conf']):
-            if int(conf) > 0:  # Valid confidence
-                text = ocr_data['text'][i].strip()
-                if text:
-                    text_parts.append(text)
-                    confidences.append(int(conf))
-        
-        # Combine text
-        extracted_text = ' '.join(text_parts)
-        
-        # Calculate average confidence
-        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
-        normalized_confidence = avg_confidence / 100.0  # Convert to 0-1 scale
-        
-        return extracted_text, normalized_confidence
+        if best is None:
+            raise Exception(f"No OCR tier ran (tiers: {tiers})")
+        extracted_text, confidence, tier = best
+        return extracted_text, confidence, {"tier": tier, "tier_ms": tier_ms, "region": region}
     
+    except OCRTimeout:
+        raise
     except Exception as e:
         print(f"OCR extraction error: {e}")
         # Fallback to simple OCR
         try:
+            start = time.perf_counter()
             image = Image.open(io.BytesIO(image_bytes))
-            text = pytesseract.image_to_string(image, lang='eng')
-            return text.strip(), 0.5  # Default confidence
+            text = _recognize_text(image, deadline)
+            _observe('ocr_fallback', start)
+            tier_ms['fallback'] = round((time.perf_counter() - start) * 1000, 2)
+            return text.strip(), 0.5, {"tier": "fallback", "tier_ms": tier_ms, "region": None}  # Default confidence
+        except OCRTimeout:
+            raise
         except Exception as fallback_error:
             print(f"Fallback OCR also failed: {fallback_error}")
             raise Exception(f"OCR failed: {str(e)}")
 
 
+def extract_text_from_image(image_bytes: bytes) -> Tuple[str, float]:
+    """
+    Extract text from image using OCR (single full-preprocessing pass)
+    
+    Args:
+        image_bytes: Image file bytes
+        
+    Returns:
+        Tuple of (extracted_text, confidence_score)
+    """
+    text, confidence, _ = extract_text_tiered(image_bytes, tiers=OCR_MODES['full'])
+    return text, confidence
+
+
 def extract_text_simple(image_bytes: bytes) -> str:
     """
     Simple text extraction without preprocessing
@@ -127,8 +599,10 @@ def extract_text_simple(image_bytes: bytes) -> str:
     """
     try:
         image = Image.open(io.BytesIO(image_bytes))
-        text = pytesseract.image_to_string(image, lang='eng')
+        text = _recognize_text(image, _deadline())
         return text.strip()
+    except OCRTimeout:
+        raise
     except Exception as e:
         raise Exception(f"Simple OCR failed: {str(e)}")
 
@@ -0,0 +1,281 @@
+"""
+OCR result cache keyed by image content
+
+Scan stations resubmit the same image after retries and double scans, so
+OCR results are cached by a SHA-256 of the image bytes. An optional
+perceptual hash (dHash) also catches near-identical images, such as the
+same label re-encoded or photographed twice, and an optional SQLite file
+keeps results across restarts and shares them between service workers.
+"""
+import io
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+# (text, confidence) as returned by extract_text_from_image
+OCRResult = Tuple[str, float]
+
+# (exact key, perceptual hash or None)
+OCRKeys = Tuple[str, Optional[int]]
+
+# Side of the dHash grid: 8x8 = 64-bit hash
+DHASH_SIZE = 8
+
+# Prune the disk cache back to maxsize rows every this many writes
+PRUNE_INTERVAL = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr_cache (
+    key TEXT PRIMARY KEY,
+    phash TEXT,
+    text TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    stored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ocr_cache_stored_at ON ocr_cache (stored_at);
+"""
+
+
+def image_dhash(image_bytes: bytes) -> int:
+    """
+    64-bit difference hash of an image
+
+    Each bit says whether a pixel is brighter than its right neighbour on
+    a 9x8 grayscale thumbnail, so re-encoding, rescaling and small
+    lighting changes flip only a few bits.
+    """
+    image = Image.open(io.BytesIO(image_bytes))
+    # Let JPEG decode at a reduced scale; the thumbnail needs few pixels
+    image.draft('L', (DHASH_SIZE * 8, DHASH_SIZE * 8))
+    pixels = list(
+        image.convert('L').resize((DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.BILINEAR).getdata()
+    )
+    value = 0
+    for row in range(DHASH_SIZE):
+        for col in range(DHASH_SIZE):
+            left = pixels[row * (DHASH_SIZE + 1) + col]
+            right = pixels[row * (DHASH_SIZE + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+class OCRCache:
+    """
+    Thread-safe LRU cache of OCR results with optional near-duplicate
+    matching and disk persistence
+
+    Lookups try the exact image hash in memory, then in the SQLite file if
+    `path` is set, then (when `phash_distance` is above 0) any cached image
+    whose dHash differs in at most that many of its 64 bits. Entries expire
+    after `ttl` seconds. A `maxsize` of 0 disables the cache.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1000,
+        ttl: Optional[float] = 86400,
+        phash_distance: int = 0,
+        path: Optional[str] = None,
+        namespace: str = ""
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self.phash_distance = max(0, phash_distance)
+        self.namespace = namespace
+        self.path = path if path and self.enabled else None
+        # key -> (result, phash, stored_at)
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes = 0
+        self.hits = 0
+        self.near_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._load()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def keys(self, image_bytes: bytes) -> OCRKeys:
+        """Exact and (if enabled) perceptual keys of an image"""
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        key = f"{self.namespace}:{digest}" if self.namespace else digest
+        phash = None
+        if self.phash_distance:
+            try:
+                phash = image_dhash(image_bytes)
+            except Exception:
+                # Undecodable images still get exact-match caching
+                phash = None
+        return key, phash
+
+    def get(self, keys: OCRKeys) -> Optional[OCRResult]:
+        """Cached result for an image's keys, or None on miss"""
+        if not self.enabled:
+            return None
+
+        key, phash = keys
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self._expired(entry, now):
+                del self._data[key]
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        result = self._read_disk(key, now)
+        if result is not None:
+            with self._lock:
+                self.disk_hits += 1
+            self._remember(key, result, phash, now)
+            return result
+
+        with self._lock:
+            if phash is not None:
+                near_key = self._nearest(phash, now)
+                if near_key is not None:
+                    self._data.move_to_end(near_key)
+                    self.near_hits += 1
+                    return self._data[near_key][0]
+            self.misses += 1
+            return None
+
+    def put(self, keys: OCRKeys, result: OCRResult):
+        """Store an image's OCR result, evicting the oldest entries if full"""
+        if not self.enabled:
+            return
+
+        key, phash = keys
+        now = time.time()
+        self._remember(key, result, phash, now)
+        if self._conn is not None:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO ocr_cache (key, phash, text, confidence, stored_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, _phash_text(phash), result[0], result[1], now)
+                )
+                self._writes += 1
+                if self._writes % PRUNE_INTERVAL == 0:
+                    self._prune_disk()
+
+    def clear(self):
+        """Drop all entries, in memory and on disk (counters are kept)"""
+        with self._lock:
+            self._data.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM ocr_cache")
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict:
+        """Return cache counters for health reporting"""
+        hits = self.hits + self.near_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "phash_distance": self.phash_distance,
+            "persistent": self.path is not None,
+            "hits": self.hits,
+            "near_duplicate_hits": self.near_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0
+        }
+
+    def _expired(self, entry: tuple, now: float) -> bool:
+        return self.ttl is not None and now - entry[2] > self.ttl
+
+    def _nearest(self, phash: int, now: float) -> Optional[str]:
+        """Key of the closest live entry within phash_distance (caller holds the lock)"""
+        best_key, best_distance = None, self.phash_distance + 1
+        for key, (_, other, stored_at) in self._data.items():
+            if other is None or (self.ttl is not None and now - stored_at > self.ttl):
+                continue
+            distance = (phash ^ other).bit_count()
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+                if distance == 0:
+                    break
+        return best_key
+
+    def _remember(self, key: str, result: OCRResult, phash: Optional[int], stored_at: float):
+        with self._lock:
+            self._data[key] = (result, phash, stored_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def _read_disk(self, key: str, now: float) -> Optional[OCRResult]:
+        if self._conn is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, confidence, stored_at FROM ocr_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (self.ttl is not None and now - row[2] > self.ttl):
+            return None
+        return row[0], row[1]
+
+    def _load(self):
+        """Fill memory with the newest persisted entries for this namespace"""
+        prefix = f"{self.namespace}:" if self.namespace else ""
+        rows = self._conn.execute(
+            "SELECT key, phash, text, confidence, stored_at FROM ocr_cache "
+            "WHERE substr(key, 1, ?) = ? ORDER BY stored_at DESC LIMIT ?",
+            (len(prefix), prefix, self.maxsize)
+        ).fetchall()
+        now = time.time()
+        for key, phash, text, confidence, stored_at in reversed(rows):
+            if self.ttl is None or now - stored_at <= self.ttl:
+                self._data[key] = ((text, confidence), int(phash, 16) if phash else None, stored_at)
+
+    def _prune_disk(self):
+        """Keep the newest maxsize rows and drop expired ones (caller holds the lock)"""
+        self._conn.execute(
+            "DELETE FROM ocr_cache WHERE key NOT IN "
+            "(SELECT key FROM ocr_cache ORDER BY stored_at DESC LIMIT ?)",
+            (self.maxsize,)
+        )
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM ocr_cache WHERE stored_at < ?", (time.time() - self.ttl,))
+
+
+def _phash_text(phash: Optional[int]) -> Optional[str]:
+    # Hex text: SQLite integers are signed and a 64-bit hash may not fit
+    return format(phash, '016x') if phash is not None else None
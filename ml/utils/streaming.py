@@ -0,0 +1,138 @@
+"""
+Incremental parsing of streamed CSV / NDJSON request bodies
+"""
+import codecs
+import csv
+import json
+import tempfile
+from typing import AsyncIterator, Optional, Tuple
+
+# Longest single record accepted; protects memory from bodies without newlines
+MAX_RECORD_BYTES = 1024 * 1024
+
+# Body bytes kept in RAM before spooling to a temporary file
+SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+
+READ_CHUNK_BYTES = 64 * 1024
+
+# (row number, address text or None, error message or None)
+Record = Tuple[int, Optional[str], Optional[str]]
+
+
+async def spool_body(chunks: AsyncIterator[bytes]) -> tempfile.SpooledTemporaryFile:
+    """
+    Receive a request body into a spooled temporary file
+
+    The body must be fully received before a streaming response starts:
+    ASGI servers may consume unread request messages while the response is
+    streaming. Spooling keeps at most SPOOL_MEMORY_BYTES in RAM and the
+    rest on disk.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    async for chunk in chunks:
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+async def iter_spooled(spool: tempfile.SpooledTemporaryFile) -> AsyncIterator[bytes]:
+    """Read a spooled body back in fixed-size chunks"""
+    while True:
+        chunk = spool.read(READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a stream of byte chunks into text lines
+
+    Only the current partial line is buffered, so memory stays bounded by
+    the longest line rather than the body size. A UTF-8 BOM is dropped.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+    buffer = ''
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split('\n')
+        for line in lines:
+            yield line.rstrip('\r')
+        if len(buffer) > MAX_RECORD_BYTES:
+            raise ValueError(f"Line longer than {MAX_RECORD_BYTES} bytes")
+
+    buffer += decoder.decode(b'', final=True)
+    if buffer.strip():
+        yield buffer.rstrip('\r')
+
+
+async def iter_csv_records(lines: AsyncIterator[str], column: str = 'address') -> AsyncIterator[Record]:
+    """
+    Parse CSV lines into address records
+
+    The first line is the header. Quoted fields may span lines: a record is
+    only parsed once its quotes are balanced.
+
+    Args:
+        lines: Text lines of the CSV body
+        column: Header of the address column
+    """
+    header = None
+    pending = ''
+    row = 0
+    async for line in lines:
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            if len(pending) > MAX_RECORD_BYTES:
+                raise ValueError(f"Record longer than {MAX_RECORD_BYTES} bytes")
+            continue
+
+        record, pending = pending, ''
+        if not record.strip():
+            continue
+
+        fields = next(csv.reader([record]))
+        if header is None:
+            header = [field.strip().lower() for field in fields]
+            if column not in header:
+                raise ValueError(f'CSV must have an "{column}" column')
+            index = header.index(column)
+            continue
+
+        row += 1
+        text = fields[index].strip() if index < len(fields) else ''
+        if text:
+            yield row, text, None
+        else:
+            yield row, None, f"Missing {column} column"
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str], column: str = 'address') -> AsyncIterator[Record]:
+    """
+    Parse NDJSON lines into address records
+
+    Each line is either a JSON object with an address field or a bare JSON
+    string.
+    """
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+
+        row += 1
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            yield row, None, f"Invalid JSON: {str(e)}"
+            continue
+
+        text = item if isinstance(item, str) else item.get(column) if isinstance(item, dict) else None
+        if isinstance(text, str) and text.strip():
+            yield row, text.strip(), None
+        else:
+            yield row, None, f"Missing {column} field"
+
+
+def ndjson_line(item: dict) -> bytes:
+    """Serialize one NDJSON output line"""
+    return (json.dumps(item, ensure_ascii=False) + '\n').encode('utf-8')
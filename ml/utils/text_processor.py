@@ -1,6 +1,13 @@
 import re
 from typing import Dict, List
 
+import numpy as np
+import pandas as pd
+
+# Bump whenever normalize_text / clean_address output changes, so cached
+# indexes built from the old normalization are rebuilt
+NORMALIZER_VERSION = 1
+
 # Common abbreviations in Indian addresses
 ABBREVIATIONS = {
     'po': 'post office',
@@ -54,42 +61,75 @@ ABBREVIATIONS = {
 }
 
 
+# Precompiled patterns, applied in this order by remove_personal_info
+MOBILE_PATTERN = re.compile(r'\b\d{10}\b')
+EMAIL_PATTERN = re.compile(r'\S+@\S+')
+RELATION_PATTERN = re.compile(r'\b[sdw]/o\s+\w+\s+\w+', re.IGNORECASE)
+TITLE_PATTERN = re.compile(r'\b(mr|mrs|ms|dr|shri|smt)\.?\s+', re.IGNORECASE)
+PINCODE_PATTERN = re.compile(r'\b\d{6}\b')
+
+# Fallback for non-ASCII text: anything but a-z, 0-9 and whitespace
+NON_ALNUM_PATTERN = re.compile(r'[^a-z0-9\s]')
+
+# ASCII fast path: one translate() maps every other character to a space
+# (whitespace is kept so split() treats it exactly like the regex did)
+_ASCII_TABLE = str.maketrans({
+    chr(i): ' '
+    for i in range(128)
+    if not (chr(i).isdigit() or 'a' <= chr(i) <= 'z' or chr(i).isspace())
+})
+
+
+def _tokens(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens of `text` (the words of normalize_text)"""
+    text = text.lower()
+    if text.isascii():
+        text = text.translate(_ASCII_TABLE)
+    else:
+        text = NON_ALNUM_PATTERN.sub(' ', text)
+    return text.split()
+
+
 def normalize_text(text: str) -> str:
+    """
+    Lowercase, replace everything but a-z/0-9 with spaces and collapse
+    whitespace
+    """
     if not text:
         return ""
     
-    # Convert to lowercase
-    text = text.lower()
-    
-    # Remove special characters but keep spaces and alphanumeric
-    text = re.sub(r'[^a-z0-9\s]', ' ', text)
+    return ' '.join(_tokens(text))
+
+
+def normalize_series(values: pd.Series) -> pd.Series:
+    """
+    normalize_text over a whole column
     
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
+    Directory columns repeat heavily (district, state, office types), so
+    each distinct value is normalized once and the results are broadcast
+    back by position. Missing values normalize to "".
     
-    # Strip leading/trailing whitespace
-    text = text.strip()
+    Args:
+        values: Column of strings
     
-    return text
+    Returns:
+        Series of normalized strings with the same index
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    normalized = np.array(
+        [normalize_text(value) if isinstance(value, str) else "" for value in uniques],
+        dtype=object
+    )
+    return pd.Series(normalized[codes], index=values.index, name=values.name)
 
 
 def expand_abbreviations(text: str) -> str:
-    words = text.split()
-    expanded_words = []
-    
-    for word in words:
-        # Check if word is an abbreviation
-        if word.lower() in ABBREVIATIONS:
-            expanded_words.append(ABBREVIATIONS[word.lower()])
-        else:
-            expanded_words.append(word)
-    
-    return ' '.join(expanded_words)
+    return ' '.join(ABBREVIATIONS.get(word.lower(), word) for word in text.split())
 
 
 def extract_pincode(text: str) -> str:
     # Look for 6-digit numbers
-    match = re.search(r'\b\d{6}\b', text)
+    match = PINCODE_PATTERN.search(text)
     if match:
         return match.group(0)
     return ""
@@ -97,37 +137,43 @@ def extract_pincode(text: str) -> str:
 
 def remove_personal_info(text: str) -> str:
     # Remove mobile numbers (10 digits)
-    text = re.sub(r'\b\d{10}\b', '', text)
+    text = MOBILE_PATTERN.sub('', text)
     
     # Remove email addresses
-    text = re.sub(r'\S+@\S+', '', text)
+    if '@' in text:
+        text = EMAIL_PATTERN.sub('', text)
     
     # Remove patterns like "S/O", "D/O", "W/O" followed by names
-    text = re.sub(r'\b[sdw]/o\s+\w+\s+\w+', '', text, flags=re.IGNORECASE)
+    if '/' in text:
+        text = RELATION_PATTERN.sub('', text)
     
     # Remove "Mr.", "Mrs.", "Ms.", "Dr." titles
-    text = re.sub(r'\b(mr|mrs|ms|dr|shri|smt)\.?\s+', '', text, flags=re.IGNORECASE)
+    text = TITLE_PATTERN.sub('', text)
     
     return text
 
 
 def clean_address(text: str) -> str:
+    """
+    Strip personal info, normalize and expand abbreviations
+    
+    Normalized tokens are already lowercase and space-free, so expansion
+    is a dict lookup per token and the result needs no second
+    normalization pass.
+    """
     if not text:
         return ""
     
-    # Step 1: Remove personal info
-    text = remove_personal_info(text)
-    
-    # Step 2: Normalize
-    text = normalize_text(text)
-    
-    # Step 3: Expand abbreviations
-    text = expand_abbreviations(text)
-    
-    # Step 4: Final normalization
-    text = normalize_text(text)
-    
-    return text
+    return ' '.join(ABBREVIATIONS.get(word, word) for word in _tokens(remove_personal_info(text)))
+
+
+def clean_addresses(texts: List[str]) -> List[str]:
+    """clean_address over a batch, cleaning each distinct text once"""
+    cleaned: Dict[str, str] = {}
+    return [
+        cleaned[text] if text in cleaned else cleaned.setdefault(text, clean_address(text))
+        for text in texts
+    ]
 
 
 def extract_address_components(text: str) -> Dict[str, str]:
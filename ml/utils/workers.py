@@ -0,0 +1,187 @@
+"""
+Bounded executors for running CPU-bound work off the asyncio event loop
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+EXECUTOR_KINDS = ('thread', 'process')
+
+
+class ExecutorSaturated(Exception):
+    """Raised when an executor already has its maximum of queued work"""
+
+
+class WorkerCrashed(Exception):
+    """Raised when a worker process died during a call; the pool is rebuilt"""
+
+
+class BoundedExecutor:
+    """
+    Thread or process pool with a bounded queue and per-call timeouts
+
+    At most `max_workers` calls run at once and at most `max_pending` more
+    wait in the queue; further submissions fail fast with ExecutorSaturated
+    so callers can shed load instead of piling up requests.
+    
+    If a worker process dies (e.g. a native crash on a bad input), the
+    process pool is broken for every call; it is replaced with a fresh one
+    and the affected calls fail with WorkerCrashed instead of retrying
+    work that may crash again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str = 'thread',
+        max_workers: int = 4,
+        max_pending: int = 64,
+        timeout: Optional[float] = 30.0,
+        initializer: Optional[Callable] = None,
+        initargs: tuple = ()
+    ):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind '{kind}', expected one of {EXECUTOR_KINDS}")
+
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(0, max_pending)
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self.initializer = initializer
+        self.initargs = initargs
+
+        self._pool: Executor = self._new_pool()
+
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.failed = 0
+        self.restarts = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_pending
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) in the pool and await its result
+
+        Args:
+            fn: Callable to run (must be picklable for process pools)
+            timeout: Seconds to wait; defaults to the executor timeout
+
+        Raises:
+            ExecutorSaturated: If the queue is full
+            WorkerCrashed: If a worker process died (the pool is rebuilt)
+            asyncio.TimeoutError: If the call does not finish in time
+        """
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                self.rejected += 1
+                raise ExecutorSaturated(
+                    f"{self.name} executor saturated ({self.in_flight} calls in flight)"
+                )
+            self.in_flight += 1
+
+        pool = self._pool
+        try:
+            future = pool.submit(functools.partial(fn, *args, **kwargs))
+        except BrokenProcessPool as e:
+            self._release(None)
+            self._replace_pool(pool)
+            raise WorkerCrashed(f"{self.name} worker pool was broken: {str(e)}")
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                timeout if timeout is not None else self.timeout
+            )
+        except BrokenProcessPool as e:
+            self._replace_pool(pool)
+            raise WorkerCrashed(f"{self.name} worker process died: {str(e)}")
+        except asyncio.TimeoutError:
+            # Drop the call if it has not started; a running call keeps its
+            # slot until it finishes, so the bound on real work still holds
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise
+
+    def warmup(self):
+        """
+        Start the pool's workers now instead of on first use
+
+        Runs the initializer up front (e.g. loading an OCR engine), and for
+        process pools forks the workers before the service starts threads.
+        """
+        for _ in range(self.max_workers):
+            self._pool.submit(_noop)
+
+    def _new_pool(self) -> Executor:
+        if self.kind == 'thread':
+            return ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=self.name,
+                initializer=self.initializer,
+                initargs=self.initargs
+            )
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=self.initializer,
+            initargs=self.initargs
+        )
+
+    def _replace_pool(self, broken: Executor):
+        """Swap a broken pool for a new one (once, however many calls failed)"""
+        with self._lock:
+            if self._pool is not broken:
+                return
+            self._pool = self._new_pool()
+            self.restarts += 1
+        print(f"⚠️  {self.name} worker process died; started a new pool")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.warmup()
+
+    def _release(self, future):
+        with self._lock:
+            self.in_flight -= 1
+            if future is None or future.cancelled():
+                return
+            if future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting work and release the pool"""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        """Return queue counters for health reporting"""
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.max_workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+            "timeout_seconds": self.timeout
+        }
+
+
+def _noop():
+    """Placeholder task used by warmup() (module-level so it pickles)"""